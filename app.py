@@ -1,17 +1,26 @@
+import datetime
+
 import streamlit as st
-import pandas as pd
 from utils.styles import apply_custom_css, add_keyboard_shortcuts
 from utils.avatar_manager import display_3d_avatar, get_sentiment_message
 from utils.visualizations import (
     create_sentiment_gauge,
     create_aspect_analysis_chart,
-    create_sentiment_distribution
+    create_sentiment_distribution,
+    create_sentiment_trend_chart,
+    create_aspect_trend_chart
 )
-from utils.aspect_analyzer import AspectAnalyzer
+from utils.lexicon import available_packs
 from utils.animations import show_analysis_animation
-from config import COLORS, PRODUCT_ASPECTS
+from utils.history_store import HistoryStore, with_pending_row
+from utils.snapshot import load_snapshot, snapshot_figures, snapshot_signature
+from config import (
+    COLORS, BULK_UPLOAD_CHUNK_SIZE, BULK_UPLOAD_MAX_ROWS, HISTORY_PAGE_SIZE,
+    TREND_SAVE_INTERVAL_SECONDS
+)
 import sys
 import os
+import uuid
 import sentiment # Import our refactored module
 
 # Page Configuration
@@ -33,37 +42,135 @@ if 'analysis_done' not in st.session_state:
     st.session_state.analysis_done = False
 if 'review_text' not in st.session_state:
     st.session_state.review_text = ""
-if 'aspect_analyzer' not in st.session_state:
-    st.session_state.aspect_analyzer = AspectAnalyzer()
-if 'review_history' not in st.session_state:
-    st.session_state.review_history = []
+if 'product_category' not in st.session_state:
+    st.session_state.product_category = None
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'analysis_id' not in st.session_state:
+    st.session_state.analysis_id = None
+if 'recorded_analysis_id' not in st.session_state:
+    st.session_state.recorded_analysis_id = None
+if 'history_cleared_at' not in st.session_state:
+    st.session_state.history_cleared_at = None
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 1
+if 'bulk_results' not in st.session_state:
+    st.session_state.bulk_results = None
+
+# Review recorded in this run, shown in the sidebar even before the history writer commits it
+pending_history_row = None
+
+# Model registry - versions are loaded and validated on a background thread and
+# swapped in atomically, so sessions never wait on a model load after startup
+@st.cache_resource(show_spinner="Loading sentiment analysis model...")
+def load_model_registry():
+    """Loads the newest published model once per process and starts watching for new ones."""
+    from utils.inference_context import InferenceContext
+    from utils.model_registry import ModelRegistry, publish_version
+    from utils.drift_monitor import build_baseline
+
+    registry = ModelRegistry()
+    registry.check_for_updates()
+    if registry.active is None:
+        # Nothing published yet: train on the bundled dataset and publish it as the first version
+        try:
+            df = sentiment.load_data()
+        except FileNotFoundError:
+            st.error("Error: 'Customer_Sentiment_filtered_amazon.csv' not found. Please ensure the file is in the directory.")
+            return None
+        context = InferenceContext.from_dataframe(df)
+        publish_version(context, registry.registry_dir, drift_baseline=build_baseline(context, df))
+        registry.check_for_updates()
+    registry.start()
+    return registry
 
-# Load Model - Ensure it's trained every time to avoid cache issues
-@st.cache_resource(show_spinner="Training sentiment analysis model...")
-def load_and_train_model():
-    """Loads data and trains/loads the model. Cached for performance."""
-    try:
-        df = sentiment.load_data()
-        # Train the model - this sets the global variables in sentiment.py
-        model, vectorizer, scaler, label_encoder, accuracy = sentiment.train_model(df)
-        # Return the artifacts so they're cached
-        return df, model, vectorizer, scaler, label_encoder, accuracy, True
-    except FileNotFoundError:
-        st.error("Error: 'Customer_Sentiment_filtered_amazon.csv' not found. Please ensure the file is in the directory.")
-        return None, None, None, None, None, None, False
+# Static overview of the bundled dataset, precomputed by `python -m utils.snapshot`
+@st.cache_resource(max_entries=1)
+def _load_dashboard_snapshot(signature):
+    """Reads the snapshot and rebuilds its charts (None if there is no current snapshot)."""
+    snapshot = load_snapshot()
+    if snapshot is None:
+        return None
+    return snapshot, snapshot_figures(snapshot)
 
-# Load the model and artifacts
-df, model, vectorizer, scaler, label_encoder, accuracy, model_loaded = load_and_train_model()
+def load_dashboard_snapshot():
+    """Cached per file signature: a rebuilt snapshot or an edited CSV is picked up without a restart."""
+    return _load_dashboard_snapshot(snapshot_signature())
 
-# Ensure model is loaded before proceeding
-if not model_loaded or df is None:
-    st.stop()
+# Review history - one SQLite store per process; writes are batched on a background thread
+@st.cache_resource
+def load_history_store():
+    return HistoryStore()
 
-# Set the global variables in sentiment module (in case cache cleared them)
-sentiment._model = model
-sentiment._vectorizer = vectorizer
-sentiment._scaler = scaler
-sentiment._label_encoder = label_encoder
+history_store = load_history_store()
+
+# Sentiment trends - minute/hour/day ring buffers shared by every session, saved to disk periodically
+@st.cache_resource
+def load_trend_store():
+    from utils.trends import TrendStore
+    return TrendStore.load()
+
+# Per-request limits (text length, ML deadline) and shed statistics, shared by every session
+@st.cache_resource
+def load_request_budget():
+    from utils.request_budget import RequestBudget
+    return RequestBudget()
+
+# Drift statistics of live traffic - one monitor per model version, shared by every session
+@st.cache_resource(max_entries=2)
+def load_drift_monitor(_context, model_version):
+    from utils.drift_monitor import DriftMonitor
+    return DriftMonitor.from_context(_context)
+
+# The landing page is served from the static snapshot; the live model, pandas
+# and the analyzer subsystems are only imported and loaded (or trained) once a
+# visitor opens the analyzer
+registry = active_model = context = drift_monitor = trend_store = request_budget = None
+if st.session_state.gender is not None:
+    import pandas as pd
+    from utils.corpus import query_corpus, SORTABLE_COLUMNS
+    from utils.batch_scoring import score_dataframe, summarize_scores
+    from utils.hybrid import OVERRIDE_DESCRIPTIONS
+    from utils.similarity_index import similar_reviews
+    from utils.model_registry import load_drift_baseline
+    from utils.trends import polarity
+    from utils.drift_monitor import compare as compare_drift
+    from utils.request_budget import SHED_DESCRIPTIONS
+
+    trend_store = load_trend_store()
+    request_budget = load_request_budget()
+    registry = load_model_registry()
+    
+    # Ensure model is loaded before proceeding
+    if registry is None or registry.active is None:
+        st.error("No valid model version could be loaded.")
+        st.stop()
+    
+    # One model per script run: a swap mid-run never mixes two model versions
+    active_model = registry.active
+    context = active_model.context
+    drift_monitor = load_drift_monitor(context, active_model.version)
+
+# Scored corpus for the explorer - computed once per process, persisted to disk
+@st.cache_resource(show_spinner="Scoring review corpus...", max_entries=2)
+def load_corpus_scores(_context, model_version):
+    """Scores the whole dataset once. Shared read-only by every session."""
+    from utils.corpus import load_scored_corpus
+    return load_scored_corpus(sentiment.load_data(), _context)
+
+# Per-term explanations of the linear model (scaler folded into the weights)
+@st.cache_resource(max_entries=2)
+def load_explainer(_context, model_version):
+    from utils.explanations import LinearExplainer
+    return LinearExplainer.from_context(_context)
+
+# Nearest-neighbour index over the corpus TF-IDF vectors for "reviews like this one"
+@st.cache_resource(show_spinner="Building similar-review index...", max_entries=2)
+def load_similarity_index(_context, model_version):
+    """Indexes the scored corpus once per process. Shared read-only by every session."""
+    from utils.similarity_index import SimilarityIndex
+    corpus = load_corpus_scores(_context, model_version)
+    return SimilarityIndex(_context.vectorizer, corpus['review_text']), corpus
 
 # ============================================
 # LANDING PAGE - GENDER SELECTION
@@ -100,6 +207,32 @@ if st.session_state.gender is None:
             if st.button("Female Avatar", key="female_btn", use_container_width=True):
                 st.session_state.gender = "female"
                 st.rerun()
+    
+    # Dataset overview from the static snapshot - no model needed
+    dashboard_snapshot = load_dashboard_snapshot()
+    if dashboard_snapshot is not None:
+        snapshot, snapshot_charts = dashboard_snapshot
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown('<h2 style="text-align: center; color: #DFD0B8;">📊 Dataset Overview</h2>', unsafe_allow_html=True)
+        st.markdown(
+            f'<p style="text-align: center; color: {COLORS["accent"]};">{snapshot["summary"]["count"]:,} reviews scored '
+            f'({snapshot["summary"]["override_count"]:,} adjusted by the rule-based safety net) · '
+            f'snapshot of {snapshot["created_at"][:10]}</p>',
+            unsafe_allow_html=True
+        )
+        chart_col1, chart_col2 = st.columns(2)
+        with chart_col1:
+            st.plotly_chart(snapshot_charts['sentiment_distribution'], use_container_width=True)
+        with chart_col2:
+            if 'aspect_analysis' in snapshot_charts:
+                st.plotly_chart(snapshot_charts['aspect_analysis'], use_container_width=True)
+        if snapshot['categories']:
+            category_rows = [
+                {'Category': category.title(), 'Reviews': values['count'],
+                 **{label.title(): f"{share:.0%}" for label, share in values['sentiment_share'].items()}}
+                for category, values in snapshot['categories'].items()
+            ]
+            st.dataframe(category_rows, use_container_width=True, hide_index=True)
 
 # ============================================
 # MAIN DASHBOARD - REVIEW INPUT & ANALYSIS
@@ -117,10 +250,215 @@ else:
     
     st.markdown("<hr>", unsafe_allow_html=True)
     
+    dashboard_view = st.radio(
+        "View",
+        options=["Single Review", "Bulk Upload", "Corpus Explorer", "Trends"],
+        horizontal=True,
+        key="dashboard_view",
+        label_visibility="collapsed"
+    )
+    
+    # ============================================
+    # CORPUS EXPLORER
+    # ============================================
+    if dashboard_view == "Corpus Explorer":
+        st.markdown('<h2 style="color: #DFD0B8;">📚 Corpus Explorer</h2>', unsafe_allow_html=True)
+        scored_corpus = load_corpus_scores(context, active_model.version)
+        
+        filter_col1, filter_col2, filter_col3 = st.columns(3)
+        with filter_col1:
+            selected_sentiments = st.multiselect("Sentiment", ["positive", "neutral", "negative"], key="explorer_sentiment")
+        with filter_col2:
+            selected_categories = st.multiselect(
+                "Product Category", sorted(scored_corpus['product_category'].dropna().unique()), key="explorer_category"
+            )
+        with filter_col3:
+            selected_regions = st.multiselect(
+                "Region", sorted(scored_corpus['region'].dropna().unique()), key="explorer_region"
+            )
+        
+        search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+        with search_col:
+            search_text = st.text_input("Search reviews", key="explorer_search")
+        with sort_col:
+            sort_by = st.selectbox("Sort by", SORTABLE_COLUMNS, key="explorer_sort")
+        with order_col:
+            descending = st.toggle("Descending", value=True, key="explorer_desc")
+        with size_col:
+            page_size = st.selectbox("Rows", [25, 50, 100], key="explorer_page_size")
+        
+        # Count matches first so the page selector can be bounded
+        _, total_rows = query_corpus(
+            scored_corpus, selected_sentiments, selected_categories, selected_regions,
+            search_text, sort_by=None, page_size=1
+        )
+        page_count = max((total_rows + page_size - 1) // page_size, 1)
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key="explorer_page")
+        
+        page_frame, total_rows = query_corpus(
+            scored_corpus, selected_sentiments, selected_categories, selected_regions,
+            search_text, sort_by=sort_by, ascending=not descending, page=page, page_size=page_size
+        )
+        
+        first_row = (page - 1) * page_size + 1 if total_rows else 0
+        st.markdown(
+            f'<p style="color: {COLORS["accent"]};">Showing {first_row}-{first_row + len(page_frame) - 1 if total_rows else 0} of {total_rows} reviews (page {page} of {page_count})</p>',
+            unsafe_allow_html=True
+        )
+        display_columns = [
+            'review_text', 'predicted_sentiment', 'sentiment_score', 'rule_score', 'sentiment',
+            'product_category', 'region', 'customer_rating', 'issue_resolved'
+        ] + [column for column in page_frame.columns if column.startswith('aspect_')]
+        st.dataframe(page_frame[display_columns], use_container_width=True, hide_index=True)
+    
+    # ============================================
+    # SENTIMENT TRENDS
+    # ============================================
+    elif dashboard_view == "Trends":
+        st.markdown('<h2 style="color: #DFD0B8;">📈 Sentiment Trends</h2>', unsafe_allow_html=True)
+        trend_ranges = {
+            "Last hour (per minute)": ("minute", 60),
+            "Last 24 hours (per hour)": ("hour", 24),
+            "Last 30 days (per day)": ("day", 30),
+        }
+        trend_range = st.radio(
+            "Range", list(trend_ranges), index=1, horizontal=True, key="trend_range", label_visibility="collapsed"
+        )
+        # Reads at most one pre-aggregated row per bucket, never the raw history
+        trend_window, trend_periods = trend_ranges[trend_range]
+        trend_series = trend_store.series(trend_window, trend_periods)
+        
+        if trend_series['reviews'].sum() == 0:
+            st.info("No reviews analyzed in this time range yet.")
+        else:
+            trend_total = int(trend_series['reviews'].sum())
+            positive_total = int(trend_series['positive'].sum()) if 'positive' in trend_series else 0
+            negative_total = int(trend_series['negative'].sum()) if 'negative' in trend_series else 0
+            metric_col1, metric_col2, metric_col3 = st.columns(3)
+            metric_col1.metric("Reviews", f"{trend_total:,}")
+            metric_col2.metric("Positive", f"{positive_total / trend_total:.0%}")
+            metric_col3.metric("Negative", f"{negative_total / trend_total:.0%}")
+            
+            st.plotly_chart(create_sentiment_trend_chart(trend_series), use_container_width=True)
+            st.plotly_chart(create_aspect_trend_chart(trend_series), use_container_width=True)
+    
+    # ============================================
+    # BULK CSV UPLOAD
+    # ============================================
+    elif dashboard_view == "Bulk Upload":
+        st.markdown('<h2 style="color: #DFD0B8;">📤 Bulk Review Analysis</h2>', unsafe_allow_html=True)
+        uploaded_file = st.file_uploader("Upload a CSV of reviews", type=["csv"], key="bulk_upload")
+        
+        if uploaded_file is not None:
+            try:
+                upload_df = pd.read_csv(uploaded_file)
+            except Exception as e:
+                upload_df = None
+                st.error(f"⚠️ Could not read the CSV file: {e}")
+            
+            if upload_df is not None:
+                text_columns = list(upload_df.columns)
+                column_col, category_col = st.columns(2)
+                with column_col:
+                    text_column = st.selectbox(
+                        "Review text column", text_columns,
+                        index=text_columns.index("review_text") if "review_text" in text_columns else 0,
+                        key="bulk_text_column"
+                    )
+                with category_col:
+                    category_options = ["(none)"] + text_columns
+                    category_column = st.selectbox(
+                        "Product category column (optional)", category_options,
+                        index=category_options.index("product_category") if "product_category" in category_options else 0,
+                        key="bulk_category_column"
+                    )
+                
+                if len(upload_df) > BULK_UPLOAD_MAX_ROWS:
+                    st.warning(f"Only the first {BULK_UPLOAD_MAX_ROWS:,} of {len(upload_df):,} rows will be scored.")
+                    upload_df = upload_df.head(BULK_UPLOAD_MAX_ROWS)
+                
+                dedup_labels = {
+                    "Exact duplicates (identical results)": "exact",
+                    "Exact + near-duplicates (faster, approximate)": "near",
+                    "Off": None,
+                }
+                dedup_choice = st.radio(
+                    "Duplicate handling", list(dedup_labels), horizontal=True, key="bulk_dedup",
+                    help="Duplicate reviews are scored once and the result is copied to every copy."
+                )
+                
+                if st.button(f"🔍 Score {len(upload_df):,} Reviews", use_container_width=True):
+                    progress_text = st.empty()
+                    progress_bar = st.progress(0)
+                    
+                    def update_progress(done, total):
+                        progress_bar.progress(done / total if total else 1.0)
+                        progress_text.markdown(
+                            f"<h4 style='text-align: center; color: #DFD0B8;'>Scored {done:,} of {total:,} reviews...</h4>",
+                            unsafe_allow_html=True
+                        )
+                    
+                    st.session_state.bulk_results = score_dataframe(
+                        upload_df,
+                        context,
+                        text_column=text_column,
+                        category_column=None if category_column == "(none)" else category_column,
+                        chunk_size=BULK_UPLOAD_CHUNK_SIZE,
+                        progress_callback=update_progress,
+                        dedup=dedup_labels[dedup_choice]
+                    )
+                    drift_monitor.update_scored(
+                        upload_df[text_column],
+                        st.session_state.bulk_results,
+                        None if category_column == "(none)" else upload_df[category_column]
+                    )
+                    st.session_state.bulk_file_name = uploaded_file.name
+                    progress_text.empty()
+                    progress_bar.empty()
+        
+        bulk_results = st.session_state.bulk_results
+        if bulk_results is not None:
+            summary = summarize_scores(bulk_results)
+            st.markdown(
+                f'<p style="color: {COLORS["accent"]};">{summary["count"]:,} reviews scored '
+                f'({summary["override_count"]:,} adjusted by the rule-based safety net)</p>',
+                unsafe_allow_html=True
+            )
+            dedup_report = bulk_results.attrs.get('dedup')
+            if dedup_report:
+                st.markdown(
+                    f'<p style="color: {COLORS["accent"]};">{dedup_report["clusters"]:,} distinct reviews scored '
+                    f'({dedup_report["duplicate_ratio"]:.0%} duplicates, '
+                    f'{dedup_report["speedup"]:.1f}× fewer model calls)</p>',
+                    unsafe_allow_html=True
+                )
+            
+            chart_col1, chart_col2 = st.columns(2)
+            with chart_col1:
+                shares = summary['sentiment_share']
+                st.plotly_chart(
+                    create_sentiment_distribution(shares['positive'], shares['neutral'], shares['negative']),
+                    use_container_width=True
+                )
+            with chart_col2:
+                if summary['aspect_means']:
+                    st.plotly_chart(create_aspect_analysis_chart(summary['aspect_means']), use_container_width=True)
+            
+            st.dataframe(bulk_results.head(100), use_container_width=True, hide_index=True)
+            
+            download_name = os.path.splitext(st.session_state.get('bulk_file_name', 'reviews.csv'))[0] + "_scored.csv"
+            st.download_button(
+                "⬇️ Download Scored CSV",
+                data=bulk_results.to_csv(index=False).encode("utf-8"),
+                file_name=download_name,
+                mime="text/csv",
+                use_container_width=True
+            )
+    
     # ============================================
     # INPUT SECTION
     # ============================================
-    if not st.session_state.analysis_done:
+    elif not st.session_state.analysis_done:
         st.markdown('<h2 style="color: #DFD0B8;">Enter Product Review</h2>', unsafe_allow_html=True)
         
         review_text = st.text_area(
@@ -131,6 +469,15 @@ else:
             label_visibility="collapsed"
         )
         
+        # Product category selects the aspect lexicon pack (lexicons/<category>.json)
+        category_options = ["General"] + [pack for pack in available_packs() if pack != "default"]
+        product_category = st.selectbox(
+            "Product Category",
+            options=category_options,
+            format_func=lambda pack: pack.replace("_", " ").title(),
+            key="category_input"
+        )
+        
         st.markdown("<br>", unsafe_allow_html=True)
         
         col1, col2, col3 = st.columns([2, 1, 2])
@@ -140,7 +487,9 @@ else:
         if analyze_button:
             if review_text.strip():
                 st.session_state.review_text = review_text
+                st.session_state.product_category = None if product_category == "General" else product_category
                 st.session_state.analysis_done = True
+                st.session_state.analysis_id = uuid.uuid4().hex
                 st.rerun()
             else:
                 st.error("⚠️ Please enter a review to analyze!")
@@ -152,44 +501,60 @@ else:
     # ============================================
     else:
         review_text = st.session_state.review_text
+        product_category = st.session_state.product_category
         
-        # Perform sentiment analysis
+        # Perform sentiment analysis within the request budget: over-long reviews are
+        # truncated, and a slow ML prediction falls back to the rule-based score
         show_analysis_animation()
-        sentiment_label, probabilities = sentiment.predict_sentiment_with_probabilities(review_text)
-        sentiment_score = probabilities.get(sentiment_label, 0.5)
-        
-        # --- HYBRID SAFETY NET ---
-        # Calculate rule-based score to validate ML prediction
-        rule_based_score = st.session_state.aspect_analyzer.analyze_overall_sentiment(review_text)
-        
-        # Override if ML is Positive but Rules say Negative (Safety Net)
-        if rule_based_score < 0.4 and sentiment_label == 'positive':
-            sentiment_label = 'negative'
-            sentiment_score = rule_based_score # Use the low score
-            # Adjust probabilities for display
-            probabilities = {'positive': 0.1, 'neutral': 0.1, 'negative': 0.8}
-            
-        # Override if ML is Negative but Rules say Strong Positive (Rare case)
-        elif rule_based_score > 0.8 and sentiment_label == 'negative':
-            sentiment_label = 'positive'
-            sentiment_score = rule_based_score
-            probabilities = {'positive': 0.9, 'neutral': 0.05, 'negative': 0.05}
-        # -------------------------
+        # Reruns of the results page re-score but are not counted again in the shed report
+        result = request_budget.score(
+            context, review_text, category=product_category,
+            record=st.session_state.recorded_analysis_id != st.session_state.analysis_id
+        )
+        review_text = result.text
+        ml_label = result.ml_label
+        
+        # Hybrid safety net: rule-based score validates the ML prediction
+        rule_based_score = result.rule_score
+        sentiment_label, sentiment_score = result.label, result.score
+        probabilities, override_reason = result.probabilities, result.override_reason
         
         # Analyze aspects
-        aspect_analyzer = st.session_state.aspect_analyzer
-        aspects_data = aspect_analyzer.analyze_aspects(review_text)
-        
-        # Save to history
-        current_review = {
-            'text': review_text[:100] + '...' if len(review_text) > 100 else review_text,
-            'sentiment': sentiment_label,
-            'score': sentiment_score,
-            'timestamp': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M')
-        }
-        if not any(r['text'] == current_review['text'] for r in st.session_state.review_history):
-            st.session_state.review_history.insert(0, current_review)
-            st.session_state.review_history = st.session_state.review_history[:10]
+        aspect_analyzer = context.analyzer
+        aspects_data = result.aspects
+        
+        # Save to history once per analysis (reruns of the results page don't re-record)
+        if st.session_state.recorded_analysis_id != st.session_state.analysis_id:
+            recorded_at = datetime.datetime.now().isoformat(timespec='milliseconds')
+            if history_store.record(
+                review_text,
+                sentiment_label,
+                score=sentiment_score,
+                session_id=st.session_state.session_id,
+                product_category=product_category,
+                ml_sentiment=ml_label,
+                rule_score=rule_based_score,
+                override_reason=override_reason,
+                model_version=active_model.version,
+                created_at=recorded_at,
+            ):
+                # The write is asynchronous; the sidebar shows this row until it is committed
+                pending_history_row = {
+                    'created_at': recorded_at, 'review_text': review_text,
+                    'sentiment': sentiment_label, 'score': float(sentiment_score),
+                }
+            # Rule-only fallbacks have no ML label to compare with the training baseline
+            if ml_label is not None:
+                drift_monitor.update(
+                    [review_text], [ml_label], [rule_based_score], [override_reason], [product_category]
+                )
+            # 0.5 is the analyzer's score for aspects the review doesn't mention
+            trend_store.record(
+                sentiment_label, polarity(probabilities),
+                {aspect: score for aspect, score in aspects_data.items() if score != 0.5}
+            )
+            trend_store.save_if_due(TREND_SAVE_INTERVAL_SECONDS)
+            st.session_state.recorded_analysis_id = st.session_state.analysis_id
 
         # Display Results Header
         st.markdown('<h2 class="result-header">Analysis Results</h2>', unsafe_allow_html=True)
@@ -211,6 +576,10 @@ else:
                 unsafe_allow_html=True
             )
             st.markdown(f'<p style="text-align: center; color: {COLORS["text"]}; font-size: 18px; margin-top: 10px;">{message}</p>', unsafe_allow_html=True)
+            if override_reason:
+                st.caption(f"🛡️ Safety net applied: {OVERRIDE_DESCRIPTIONS[override_reason]} ({rule_based_score:.2f}).")
+            for reason in result.shed:
+                st.caption(f"⏱️ {SHED_DESCRIPTIONS[reason]}.")
         
         with row1_col2:
             st.markdown('<h3 style="text-align: center; color: #DFD0B8;">Sentiment Metrics</h3>', unsafe_allow_html=True)
@@ -267,7 +636,7 @@ else:
                 for aspect, score in sorted(strengths.items(), key=lambda x: x[1], reverse=True):
                     st.markdown(f"**{aspect}** - Score: {score:.2f}")
                     # Show relevant phrases
-                    phrases = aspect_analyzer.extract_key_phrases(review_text, aspect)
+                    phrases = aspect_analyzer.extract_key_phrases(review_text, aspect, category=product_category)
                     if phrases:
                         with st.expander(f"See mentions of {aspect}"):
                             for phrase in phrases:
@@ -281,7 +650,7 @@ else:
                 for aspect, score in sorted(weaknesses.items(), key=lambda x: x[1]):
                     st.markdown(f"**{aspect}** - Score: {score:.2f}")
                     # Show relevant phrases
-                    phrases = aspect_analyzer.extract_key_phrases(review_text, aspect)
+                    phrases = aspect_analyzer.extract_key_phrases(review_text, aspect, category=product_category)
                     if phrases:
                         with st.expander(f"See mentions of {aspect}"):
                             for phrase in phrases:
@@ -289,6 +658,50 @@ else:
             else:
                 st.markdown("*No significant weaknesses detected*")
         
+        # Why the model decided this: top contributing terms for the ML label
+        # (skipped when the ML stage was shed and the rules decided alone)
+        if ml_label is not None:
+            explanation = load_explainer(context, active_model.version).explain(review_text, top_k=5)[ml_label]
+            with st.expander(f"🧠 Why did the model say {ml_label.upper()}?"):
+                if override_reason:
+                    st.caption(f"The safety net then changed the label to {sentiment_label.upper()}.")
+                support_col, oppose_col = st.columns(2)
+                with support_col:
+                    st.markdown(f"**Pushed towards {ml_label}**")
+                    for term, value in explanation['supporting'] or [("(none)", 0.0)]:
+                        st.markdown(f"- `{term}` {value:+.2f}")
+                with oppose_col:
+                    st.markdown(f"**Pushed away from {ml_label}**")
+                    for term, value in explanation['opposing'] or [("(none)", 0.0)]:
+                        st.markdown(f"- `{term}` {value:+.2f}")
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        
+        # ============================================
+        # ROW 5: Similar Reviews
+        # ============================================
+        st.markdown('<h3 style="color: #DFD0B8;">🔎 Similar Reviews</h3>', unsafe_allow_html=True)
+        similarity_index, corpus = load_similarity_index(context, active_model.version)
+        neighbours = similar_reviews(similarity_index, corpus, review_text, k=5)
+        neighbours = neighbours[neighbours['similarity'] > 0] if not neighbours.empty else neighbours
+        if neighbours.empty:
+            st.markdown("*No similar reviews in the corpus*")
+        else:
+            if 'resolved_share' in neighbours:
+                neighbours = neighbours.assign(resolved_share=neighbours['resolved_share'] * 100)
+            st.dataframe(
+                neighbours,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "review_text": "Review",
+                    "similarity": st.column_config.ProgressColumn("Similarity", min_value=0.0, max_value=1.0, format="%.2f"),
+                    "reviews": "Copies",
+                    "sentiment": "Sentiment",
+                    "resolved_share": st.column_config.ProgressColumn("Issue resolved", min_value=0, max_value=100, format="%.0f%%"),
+                }
+            )
+        
         st.markdown("<br><br>", unsafe_allow_html=True)
         
         # Action Buttons
@@ -298,6 +711,7 @@ else:
             if st.button("🔄 Analyze Another Review", use_container_width=True):
                 st.session_state.analysis_done = False
                 st.session_state.review_text = ""
+                st.session_state.product_category = None
                 st.rerun()
         
 
@@ -307,27 +721,98 @@ else:
                 st.session_state.gender = None
                 st.session_state.analysis_done = False
                 st.session_state.review_text = ""
+                st.session_state.product_category = None
                 st.rerun()
 
 # ============================================
 # SIDEBAR - Multi-Review Analysis
 # ============================================
 with st.sidebar:
+    # Model status needs the live model, which the landing page does not load
+    if active_model is not None:
+        # Active model version (hot-reloaded from the model registry)
+        accuracy = active_model.metadata.get('accuracy')
+        st.markdown(
+            f'<p style="color: {COLORS["accent"]};">🤖 Model <b>{active_model.version}</b>'
+            + (f' · accuracy {accuracy:.2%}' if accuracy is not None else '') + '</p>',
+            unsafe_allow_html=True
+        )
+        for version, error in registry.failed.items():
+            st.warning(f"Model version {version} was rejected: {error}")
+        
+        # Requests that were truncated or fell back to the rules to stay within budget
+        shed_report = request_budget.report()
+        if shed_report['shed_requests']:
+            st.caption(
+                f"⏱️ {shed_report['shed_requests']:,} of {shed_report['requests']:,} analyses shed load: "
+                + ", ".join(f"{reason.replace('_', ' ')} {count:,}" for reason, count in shed_report['reasons'].items())
+            )
+    
+        # Live traffic vs the training baseline stored with the model version
+        drift_baseline = load_drift_baseline(active_model.version, registry.registry_dir)
+        if drift_baseline is not None and drift_monitor.documents:
+            drift = compare_drift(drift_baseline, drift_monitor.snapshot())
+            with st.expander(f"📉 Drift ({drift['documents']:,} reviews since load)"):
+                st.markdown(
+                    f"**OOV tokens:** {drift['oov_rate']['current']:.1%} "
+                    f"(training {drift['oov_rate']['baseline']:.1%})  \n"
+                    f"**Overrides:** {drift['override_rate']['current']:.1%} "
+                    f"(training {drift['override_rate']['baseline']:.1%})  \n"
+                    f"**Class PSI:** {drift['class_psi']:.3f} · **Rule score PSI:** {drift['rule_score_psi']:.3f}"
+                )
+                if not drift['enough_data']:
+                    st.info("Not enough reviews yet to judge drift.")
+                elif drift['retrain_recommended']:
+                    st.warning("Retraining recommended:\n\n" + "\n".join(f"- {alert}" for alert in drift['alerts']))
+                else:
+                    st.success("No significant drift.")
+                if drift['top_oov_tokens']:
+                    st.markdown("**Frequent unseen tokens:** " + ", ".join(
+                        f"{token} ({count})" for token, count in drift['top_oov_tokens'][:10]
+                    ))
+    
     st.markdown(f'<h2 style="color: {COLORS["text"]};">📊 Analysis History</h2>', unsafe_allow_html=True)
     
-    # Display history
-    if st.session_state.review_history:
-        st.markdown(f'<p style="color: {COLORS["accent"]};">Recent analyses:</p>', unsafe_allow_html=True)
-        
-        for i, review in enumerate(st.session_state.review_history):
-            with st.expander(f"Review {i+1} - {review['sentiment'].title()}"):
-                st.markdown(f"**Text:** {review['text']}")
+    # History of this session, paged from the persistent store
+    history_rows, history_total = history_store.query(
+        page=st.session_state.history_page,
+        page_size=HISTORY_PAGE_SIZE,
+        session_id=st.session_state.session_id,
+        since=st.session_state.history_cleared_at,
+    )
+    history_rows, history_total = with_pending_row(
+        history_rows, history_total, pending_history_row, st.session_state.history_page, HISTORY_PAGE_SIZE
+    )
+    if history_total:
+        page_count = (history_total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+        st.markdown(f'<p style="color: {COLORS["accent"]};">{history_total:,} analyses this session:</p>', unsafe_allow_html=True)
+        
+        first_number = (st.session_state.history_page - 1) * HISTORY_PAGE_SIZE
+        for i, review in enumerate(history_rows):
+            with st.expander(f"Review {first_number + i + 1} - {review['sentiment'].title()}"):
+                text = review['review_text']
+                st.markdown(f"**Text:** {text[:100] + '...' if len(text) > 100 else text}")
                 st.markdown(f"**Sentiment:** {review['sentiment'].title()}")
                 st.markdown(f"**Score:** {review['score']:.2f}")
-                st.markdown(f"**Time:** {review['timestamp']}")
-        
+                st.markdown(f"**Time:** {review['created_at'][:16].replace('T', ' ')}")
+        
+        if page_count > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                if st.button("◀", disabled=st.session_state.history_page <= 1, key="history_prev"):
+                    st.session_state.history_page -= 1
+                    st.rerun()
+            with page_col:
+                st.markdown(f"<p style='text-align: center;'>Page {st.session_state.history_page} of {page_count}</p>", unsafe_allow_html=True)
+            with next_col:
+                if st.button("▶", disabled=st.session_state.history_page >= page_count, key="history_next"):
+                    st.session_state.history_page += 1
+                    st.rerun()
+        
+        # Clearing only hides this session's entries; the audit trail is kept
         if st.button("🗑️ Clear History"):
-            st.session_state.review_history = []
+            st.session_state.history_cleared_at = datetime.datetime.now().isoformat(timespec='milliseconds')
+            st.session_state.history_page = 1
             st.rerun()
 
     else:
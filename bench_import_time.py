@@ -0,0 +1,106 @@
+"""
+Import-time benchmark for the app's modules.
+
+Runs each module import in a fresh interpreter with `python -X importtime`
+and reports the cumulative import time plus the heaviest dependencies.
+Named groups in IMPORT_GROUPS import several modules together, e.g.
+`app:landing` for everything app.py imports before the landing page renders
+(app.py itself only runs under Streamlit).
+
+Usage:
+    python bench_import_time.py [module or group ...] [--top N] [--repeat N] [--output bench_output.txt]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Module-level imports of app.py, i.e. the cold-start cost of the landing page
+IMPORT_GROUPS = {
+    'app:landing': [
+        'streamlit', 'utils.styles', 'utils.avatar_manager', 'utils.visualizations', 'utils.lexicon',
+        'utils.animations', 'utils.history_store', 'utils.snapshot', 'config', 'sentiment',
+    ],
+}
+
+DEFAULT_MODULES = [
+    'app:landing',
+    'sentiment',
+    'utils.inference_context',
+    'utils.batch_scoring',
+    'utils.visualizations',
+    'utils.aspect_analyzer',
+]
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def profile_import(module):
+    """
+    Import `module` (or an IMPORT_GROUPS group) in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (cumulative microseconds for `module`, list of (cumulative_us, name) for its direct imports)
+    """
+    modules = IMPORT_GROUPS.get(module, [module])
+    # The module and its parent packages; interpreter startup (site, encodings) is not counted
+    targets = {'.'.join(name.split('.')[:depth]) for name in modules for depth in range(1, name.count('.') + 2)}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', '; '.join(f'import {name}' for name in modules)],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing '{module}' failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    total_us = 0
+    dependencies = []
+    # A module's own imports are listed before it, one level deeper
+    children = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        # Top-level imports are indented by 1 space, their direct imports by 3
+        if indent == 1:
+            if name in targets:
+                total_us += cumulative_us
+                dependencies.extend(children)
+            children = []
+        elif indent == 3:
+            children.append((cumulative_us, name))
+
+    return total_us, sorted(dependencies, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--top', type=int, default=5, help='heaviest dependencies to list per module')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per module (median is reported)')
+    parser.add_argument('--output', help='also write the report to this file')
+    args = parser.parse_args()
+
+    lines = [f"{'Module':<28} | {'Median import (ms)':>18} | Heaviest dependencies"]
+    lines.append('-' * 100)
+
+    for module in args.modules:
+        runs = [profile_import(module) for _ in range(max(args.repeat, 1))]
+        median_ms = statistics.median(total for total, _ in runs) / 1000
+        heaviest = ', '.join(f"{name} {us / 1000:.0f}ms" for us, name in runs[-1][1][:args.top])
+        lines.append(f"{module:<28} | {median_ms:>18.1f} | {heaviest}")
+
+    report = '\n'.join(lines)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,8 @@
 # Configuration file for the application
+import json
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Color Palette
 COLORS = {
@@ -32,20 +36,115 @@ GENERIC_LOTTIE = {
     "sad": "https://assets5.lottiefiles.com/packages/lf20_sad.json"
 }
 
+# Total seconds for the avatar animation downloads (specific, then generic) before falling back to the emoji
+AVATAR_REQUEST_TIMEOUT_SECONDS = 3
+
 # Sentiment Thresholds
 SENTIMENT_THRESHOLDS = {
     'positive': 0.6,
     'negative': 0.4
 }
 
-# Product Aspects to Analyze
-PRODUCT_ASPECTS = [
-    'Battery Life',
-    'Performance',
-    'Shipping',
-    'Build Quality',
-    'Value for Money',
-    'Customer Service',
-    'Design',
-    'Ease of Use'
-]
+# Hybrid safety net: the rule-based score overrides the ML label when they
+# strongly disagree (see utils/hybrid.py). The overridden review gets the rule
+# score as its sentiment score and these fixed display probabilities.
+HYBRID_OVERRIDE = {
+    # ML says positive but the rule score is below this -> negative
+    'negative_below': 0.4,
+    # ML says negative but the rule score is above this -> positive
+    'positive_above': 0.8,
+    'negative_probabilities': {'positive': 0.1, 'neutral': 0.1, 'negative': 0.8},
+    'positive_probabilities': {'positive': 0.9, 'neutral': 0.05, 'negative': 0.05},
+}
+
+# Rule-based scorer behind the overall rule score and the aspect scores:
+# 'lexicon' (sentence-level keyword matching) or 'clause' (utils/clause_scorer.py:
+# one pass with negation scope and contrast clauses)
+RULE_SCORER = 'lexicon'
+CLAUSE_SCORER = {
+    # A negation flips the sentiment words in this many following tokens (until punctuation)
+    'negation_window': 3,
+    # Words that start a new clause, and how much more the clause after one weighs
+    'contrast_words': ('but', 'however', 'yet'),
+    'contrast_weight': 2.0,
+    # Positive clauses with a qualifier ("still", "just") lose this much
+    'qualifier_damping': 0.15,
+}
+
+# Text normalization (utils/text_normalizer.py) used by the TF-IDF model and the
+# rule-based analyzer. Models trained with it record it in their vectorizer.
+TEXT_NORMALIZATION = True
+# Memoized normalizations: at most this many, of reviews up to this many characters
+TEXT_NORMALIZER_CACHE_SIZE = 8192
+TEXT_NORMALIZER_CACHE_MAX_CHARS = 1000
+
+# Lexicon packs for aspect analysis (one JSON/YAML file per product category).
+LEXICON_DIR = os.path.join(BASE_DIR, 'lexicons')
+DEFAULT_LEXICON = 'default'
+
+
+def _pack_aspects(name):
+    """Aspect names of a JSON lexicon pack, in pack order"""
+    with open(os.path.join(LEXICON_DIR, name + '.json'), encoding='utf-8') as f:
+        return list(json.load(f)['aspects'])
+
+
+# Product Aspects to Analyze: the default pack's aspects
+PRODUCT_ASPECTS = _pack_aspects(DEFAULT_LEXICON)
+
+# On-disk cache for precomputed results (scored corpus, etc.)
+CACHE_DIR = os.path.join(BASE_DIR, '.cache')
+
+# Per-request resource limits of the scoring path (utils/request_budget.py).
+# Longer reviews are truncated; an ML prediction that misses its deadline is
+# replaced by the rule-only score, and aspects are skipped once the whole
+# request is over budget.
+REQUEST_BUDGET = {
+    'max_chars': 20000,
+    'max_tokens': 4000,
+    'ml_seconds': 1.0,
+    'total_seconds': 2.0,
+    # Threads running ML predictions; while all are busy (even with timed-out ones), the ML stage is shed
+    'ml_workers': 2,
+    # Display probabilities of a neutral rule-only result (positive/negative use HYBRID_OVERRIDE's)
+    'neutral_probabilities': {'positive': 0.1, 'neutral': 0.8, 'negative': 0.1},
+    # Shed requests kept for the report
+    'recent_events': 100,
+}
+
+# Static landing-page snapshot of the bundled dataset (python -m utils.snapshot)
+SNAPSHOT_PATH = os.path.join(BASE_DIR, 'dashboard_snapshot.json')
+
+# Bulk CSV upload
+BULK_UPLOAD_CHUNK_SIZE = 200
+BULK_UPLOAD_MAX_ROWS = 100000
+
+# Model registry: one sub-directory per published model version. The app
+# polls it in the background and swaps in new versions that pass validation.
+MODEL_REGISTRY_DIR = os.path.join(BASE_DIR, 'models')
+MODEL_POLL_INTERVAL_SECONDS = 30
+MODEL_MIN_ACCURACY = 0.9
+
+# Persistent review history (SQLite audit trail of every analyzed review)
+HISTORY_DB_PATH = os.path.join(BASE_DIR, 'review_history.sqlite3')
+HISTORY_PAGE_SIZE = 10
+
+# Sentiment trends: ring buffers of pre-aggregated buckets, name -> (seconds per bucket, buckets kept)
+TREND_STORE_PATH = os.path.join(BASE_DIR, 'sentiment_trends.npz')
+TREND_WINDOWS = {
+    'minute': (60, 24 * 60),       # last 24 hours
+    'hour': (3600, 30 * 24),       # last 30 days
+    'day': (86400, 365),           # last year
+}
+TREND_SAVE_INTERVAL_SECONDS = 10
+
+# Drift monitoring: live traffic vs the training baseline stored with each model
+# version. PSI above 0.2 is the usual "significant shift" mark; rates are absolute changes.
+DRIFT_THRESHOLDS = {
+    'class_psi': 0.2,
+    'rule_score_psi': 0.2,
+    'aspect_rate_change': 0.1,
+    'oov_rate_increase': 0.05,
+    'override_rate_increase': 0.05,
+    'min_documents': 200,
+}
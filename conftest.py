@@ -0,0 +1,49 @@
+"""
+Shared pytest fixtures.
+
+The model is trained once per test session, persisted with
+sentiment.save_artifacts() and loaded back, so every test module scores with
+the same artifacts and the save/load path is exercised too.
+"""
+import os
+import sys
+from collections import namedtuple
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import sentiment
+from utils.inference_context import InferenceContext
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data')
+
+PersistedModel = namedtuple('PersistedModel', ['path', 'accuracy'])
+
+
+@pytest.fixture(scope="session")
+def df():
+    """The bundled review CSV"""
+    return sentiment.load_data()
+
+
+@pytest.fixture(scope="session")
+def persisted_model(df, tmp_path_factory):
+    """The model trained on `df`, saved once for this session"""
+    model, vectorizer, scaler, label_encoder, accuracy = sentiment.fit_artifacts(df)
+    path = str(tmp_path_factory.mktemp("model") / "artifacts.pkl")
+    sentiment.save_artifacts(path, model, vectorizer, scaler, label_encoder)
+    return PersistedModel(path, accuracy)
+
+
+@pytest.fixture(scope="session")
+def context(persisted_model):
+    """Read-only InferenceContext over the persisted session model"""
+    return InferenceContext(*sentiment.load_artifacts(persisted_model.path), accuracy=persisted_model.accuracy)
+
+
+@pytest.fixture(scope="session")
+def binary_artifacts(df):
+    """(model, vectorizer, scaler, label_encoder) of a 2-class model trained without the neutral reviews"""
+    return sentiment.fit_artifacts(df[df['sentiment'] != 'neutral'])[:4]
@@ -1,14 +1,10 @@
 # -*- coding: utf-8 -*-
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import matplotlib.pyplot as plt
-import seaborn as sns
+# Only numpy is imported at module level. The inference path additionally
+# needs scipy's softmax (imported on first prediction), and fitted sklearn
+# objects bring their own imports. pandas and the sklearn training stack are
+# imported lazily where used, so batch workers and CLI jobs don't pay for
+# them at startup.
 import numpy as np
-from scipy.special import softmax
 
 # Global variables to store the trained artifacts
 _model = None
@@ -17,22 +13,48 @@ _scaler = None
 _label_encoder = None
 
 def load_data(filepath='Customer_Sentiment_filtered_amazon.csv'):
+    import pandas as pd
+
     return pd.read_csv(filepath)
 
-def train_model(df):
-    global _model, _vectorizer, _scaler, _label_encoder
-    
+def build_vectorizer():
+    """
+    The TF-IDF vectorizer used for training. With config.TEXT_NORMALIZATION
+    the shared text normalizer is its preprocessor, so it travels with the
+    pickled vectorizer and every transform() applies it.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from config import TEXT_NORMALIZATION
+
+    if TEXT_NORMALIZATION:
+        from utils.text_normalizer import normalize_text
+
+        return TfidfVectorizer(preprocessor=normalize_text)
+    return TfidfVectorizer()
+
+def fit_artifacts(df):
+    """
+    Trains the model on `df` without touching the module globals.
+
+    Returns:
+        tuple: (model, vectorizer, scaler, label_encoder, accuracy)
+    """
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+    from sklearn.model_selection import train_test_split
+    from sklearn.svm import SVC
+    from sklearn.metrics import accuracy_score
+
     print("Preparing data...")
     X = df['review_text']
     y = df['sentiment']
 
     # Encode labels
-    _label_encoder = LabelEncoder()
-    y_encoded = _label_encoder.fit_transform(y)
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(y)
 
     # Vectorize text
-    _vectorizer = TfidfVectorizer()
-    X_vectorized = _vectorizer.fit_transform(X)
+    vectorizer = build_vectorizer()
+    X_vectorized = vectorizer.fit_transform(X)
 
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X_vectorized, y_encoded, test_size=0.2, random_state=42)
@@ -46,68 +68,70 @@ def train_model(df):
         X_test_dense = X_test
 
     # Scale features
-    _scaler = StandardScaler(with_mean=False)
-    X_train_scaled = _scaler.fit_transform(X_train_dense)
-    X_test_scaled = _scaler.transform(X_test_dense)
+    scaler = StandardScaler(with_mean=False)
+    X_train_scaled = scaler.fit_transform(X_train_dense)
+    X_test_scaled = scaler.transform(X_test_dense)
 
     # Train Model (using the best params found previously: C=0.1, kernel='linear')
     print("Training SVM model...")
-    _model = SVC(kernel='linear', C=0.1, random_state=42)
-    _model.fit(X_train_scaled, y_train)
+    model = SVC(kernel='linear', C=0.1, random_state=42)
+    model.fit(X_train_scaled, y_train)
     
     print("Model training complete.")
     
     # Evaluate
-    y_pred = _model.predict(X_test_scaled)
+    y_pred = model.predict(X_test_scaled)
     accuracy = accuracy_score(y_test, y_pred)
     print(f"Model Accuracy: {accuracy:.4f}")
     
+    return model, vectorizer, scaler, label_encoder, accuracy
+
+def train_model(df):
+    """Trains the model and stores the artifacts in the module globals."""
+    global _model, _vectorizer, _scaler, _label_encoder
+    
+    _model, _vectorizer, _scaler, _label_encoder, accuracy = fit_artifacts(df)
+    
     return _model, _vectorizer, _scaler, _label_encoder, accuracy
 
-def predict_sentiment(text_input):
-    """Predicts sentiment for a single text input."""
-    if _model is None:
-        raise ValueError("Model not trained. Call train_model() first.")
-        
-    text_vectorized = _vectorizer.transform([text_input])
+def _transform(text_input, vectorizer, scaler):
+    """Vectorizes and scales a single text input."""
+    text_vectorized = vectorizer.transform([text_input])
     
     if hasattr(text_vectorized, 'toarray'):
         text_dense = text_vectorized.toarray()
     else:
         text_dense = text_vectorized
 
-    text_scaled = _scaler.transform(text_dense)
-    prediction = _model.predict(text_scaled)
-    predicted_sentiment = _label_encoder.inverse_transform(prediction)
+    return scaler.transform(text_dense)
+
+def predict_with_artifacts(text_input, model, vectorizer, scaler, label_encoder):
+    """Predicts the sentiment label using explicitly passed artifacts."""
+    text_scaled = _transform(text_input, vectorizer, scaler)
+    prediction = model.predict(text_scaled)
+    predicted_sentiment = label_encoder.inverse_transform(prediction)
     
     return predicted_sentiment[0]
 
-def predict_sentiment_with_probabilities(text_input):
+def predict_with_probabilities_from_artifacts(text_input, model, vectorizer, scaler, label_encoder):
     """
-    Enhanced prediction function that returns probabilities
+    Predicts label and probabilities using explicitly passed artifacts.
+    Nothing global is read or written, so this is safe to call from many threads.
     
     Returns:
         tuple: (predicted_label, probabilities_dict)
     """
-    if _model is None:
-        raise ValueError("Model not trained. Call train_model() first.")
+    from scipy.special import softmax
 
-    text_vectorized = _vectorizer.transform([text_input])
-    
-    if hasattr(text_vectorized, 'toarray'):
-        text_dense = text_vectorized.toarray()
-    else:
-        text_dense = text_vectorized
-    
-    text_scaled = _scaler.transform(text_dense)
+    text_scaled = _transform(text_input, vectorizer, scaler)
     
     # Get prediction
-    prediction = _model.predict(text_scaled)
-    predicted_sentiment = _label_encoder.inverse_transform(prediction)[0]
+    prediction = model.predict(text_scaled)
+    predicted_sentiment = label_encoder.inverse_transform(prediction)[0]
     
     # Get decision function scores (for SVM)
-    if hasattr(_model, 'decision_function'):
-        decision_scores = _model.decision_function(text_scaled)
+    if hasattr(model, 'decision_function'):
+        decision_scores = model.decision_function(text_scaled)
         
         # Simple softmax approximation for decision scores
         if decision_scores.ndim == 1:
@@ -119,7 +143,7 @@ def predict_sentiment_with_probabilities(text_input):
         # Map to sentiment labels
         prob_dict = {
             label: float(prob) 
-            for label, prob in zip(_label_encoder.classes_, probabilities)
+            for label, prob in zip(label_encoder.classes_, probabilities)
         }
     else:
         # Fallback if decision_function not available
@@ -131,19 +155,180 @@ def predict_sentiment_with_probabilities(text_input):
     
     return predicted_sentiment, prob_dict
 
+def predict_batch_from_artifacts(texts, model, vectorizer, scaler, label_encoder, chunk_size=512):
+    """
+    Vectorized prediction for many texts at once.
+    
+    Texts are vectorized in one call; only `chunk_size` rows are densified at
+    a time for the scaler and SVM, which keeps memory bounded for big batches.
+    
+    Returns:
+        tuple: (labels array, probabilities array of shape (n, n_classes), class names)
+    """
+    from scipy.special import softmax
+
+    texts = list(texts)
+    classes = list(label_encoder.classes_)
+    if not texts:
+        return np.array([], dtype=object), np.zeros((0, len(classes))), classes
+
+    X = vectorizer.transform(texts)
+    labels = []
+    probabilities = []
+
+    for start in range(0, X.shape[0], chunk_size):
+        chunk = X[start:start + chunk_size]
+        chunk_scaled = scaler.transform(chunk.toarray() if hasattr(chunk, 'toarray') else chunk)
+        labels.append(label_encoder.inverse_transform(model.predict(chunk_scaled)))
+
+        if hasattr(model, 'decision_function'):
+            decision_scores = model.decision_function(chunk_scaled)
+            if decision_scores.ndim == 1:
+                decision_scores = np.column_stack([-decision_scores, decision_scores])
+            probabilities.append(softmax(decision_scores, axis=1))
+        else:
+            probabilities.append(np.full((chunk_scaled.shape[0], len(classes)), 1.0 / len(classes)))
+
+    return np.concatenate(labels), np.vstack(probabilities), classes
+
+def predict_sentiment(text_input):
+    """Predicts sentiment for a single text input."""
+    if _model is None:
+        raise ValueError("Model not trained. Call train_model() first.")
+        
+    return predict_with_artifacts(text_input, _model, _vectorizer, _scaler, _label_encoder)
+
+def predict_sentiment_with_probabilities(text_input):
+    """
+    Enhanced prediction function that returns probabilities
+    
+    Returns:
+        tuple: (predicted_label, probabilities_dict)
+    """
+    if _model is None:
+        raise ValueError("Model not trained. Call train_model() first.")
+
+    return predict_with_probabilities_from_artifacts(text_input, _model, _vectorizer, _scaler, _label_encoder)
+
+def predict_sentiment_batch(texts, chunk_size=512):
+    """
+    Batch version of predict_sentiment_with_probabilities()
+    
+    Returns:
+        tuple: (labels array, probabilities array of shape (n, n_classes), class names)
+    """
+    if _model is None:
+        raise ValueError("Model not trained. Call train_model() first.")
+
+    return predict_batch_from_artifacts(texts, _model, _vectorizer, _scaler, _label_encoder, chunk_size)
+
 def get_artifacts():
     """Returns the trained model and transformers."""
     return _model, _vectorizer, _scaler, _label_encoder
 
+def save_artifacts(path, model, vectorizer, scaler, label_encoder):
+    """Pickles the fitted artifacts to `path` (written to a temp file, then renamed)."""
+    import os
+    import pickle
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump((model, vectorizer, scaler, label_encoder), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def load_artifacts(path):
+    """
+    Loads artifacts written by save_artifacts(). Only load files you trust:
+    unpickling can execute code.
+
+    Returns:
+        tuple: (model, vectorizer, scaler, label_encoder)
+    """
+    import pickle
+
+    with open(path, 'rb') as f:
+        artifacts = pickle.load(f)
+    if not isinstance(artifacts, tuple) or len(artifacts) != 4:
+        raise ValueError(f"'{path}' does not contain (model, vectorizer, scaler, label_encoder).")
+    return artifacts
+
+def _stream_context(data_path, registry_dir, model_path=None):
+    """
+    The model for the stream command: the artifacts at `model_path` if given,
+    else the newest valid registry version, else one trained on `data_path`.
+
+    Returns:
+        InferenceContext
+    """
+    from utils.inference_context import InferenceContext
+    from utils.model_registry import ModelRegistry
+
+    if model_path:
+        return InferenceContext(*load_artifacts(model_path))
+
+    registry = ModelRegistry(registry_dir)
+    registry.check_for_updates()
+    if registry.active is not None:
+        return registry.active.context
+    return InferenceContext.from_dataframe(load_data(data_path))
+
+def _run_stream(args):
+    """Score JSON lines from a file or stdin and write enriched JSON lines"""
+    import contextlib
+    import sys
+
+    from utils.streaming import read_jsonl, score_stream, write_jsonl
+
+    # Loading and training progress goes to stderr so stdout carries only JSON lines
+    with contextlib.redirect_stdout(sys.stderr):
+        context = _stream_context(args.data, args.registry, args.model)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        records = read_jsonl(source, skip_invalid=args.skip_invalid)
+        scored = score_stream(records, context, args.text_field, args.category_field, args.batch_size)
+        count = write_jsonl(scored, sink, flush_every=args.batch_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    print(f"Scored {count} reviews.", file=sys.stderr)
+
 if __name__ == "__main__":
-    # This block only runs when executing the script directly
+    import argparse
+
+    from config import MODEL_REGISTRY_DIR
+
+    parser = argparse.ArgumentParser(description="Train the sentiment model and score reviews.")
+    parser.add_argument('--data', default='Customer_Sentiment_filtered_amazon.csv', help='training CSV')
+    subparsers = parser.add_subparsers(dest='command')
+
+    stream_parser = subparsers.add_parser(
+        'stream', help='score JSON lines (objects or bare strings) from a file or stdin'
+    )
+    stream_parser.add_argument('input', nargs='?', default='-', help="input JSONL file ('-' for stdin)")
+    stream_parser.add_argument('-o', '--output', default='-', help="output JSONL file ('-' for stdout)")
+    stream_parser.add_argument('--batch-size', type=int, default=256)
+    stream_parser.add_argument('--text-field', default='review_text')
+    stream_parser.add_argument('--category-field', default='product_category')
+    stream_parser.add_argument('--skip-invalid', action='store_true', help='skip malformed lines instead of failing')
+    stream_parser.add_argument('--model', help='artifacts written by save_artifacts() (default: newest registry version)')
+    stream_parser.add_argument('--registry', default=MODEL_REGISTRY_DIR,
+                               help='model registry to load from; a model is trained on --data only if it is empty')
+    args = parser.parse_args()
+
     try:
-        df = load_data()
-        train_model(df)
-        
-        # Example usage
-        test_review = "This product is amazing!"
-        print(f"Test Review: '{test_review}' -> Sentiment: {predict_sentiment(test_review)}")
-        
-    except FileNotFoundError:
-        print("Error: 'Customer_Sentiment_filtered_amazon.csv' not found.")
\ No newline at end of file
+        if args.command == 'stream':
+            _run_stream(args)
+        else:
+            df = load_data(args.data)
+            train_model(df)
+
+            # Example usage
+            test_review = "This product is amazing!"
+            print(f"Test Review: '{test_review}' -> Sentiment: {predict_sentiment(test_review)}")
+
+    except FileNotFoundError as e:
+        print(f"Error: '{e.filename}' not found.")
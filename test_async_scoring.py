@@ -0,0 +1,159 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.async_scoring import AsyncScoringClient, ScoringQueueFull
+
+
+class RecordingScorer:
+    """Blocking fake scorer that records the batches it receives"""
+
+    def __init__(self, delay=0.0, release=None):
+        self.delay = delay
+        self.release = release
+        self.batches = []
+
+    def __call__(self, texts, categories):
+        if self.release is not None:
+            self.release.wait(5)
+        time.sleep(self.delay)
+        self.batches.append(list(texts))
+        return [{'text': text, 'length': len(text)} for text in texts]
+
+
+def test_concurrent_requests_are_coalesced_into_batches():
+    scorer = RecordingScorer()
+
+    async def run():
+        async with AsyncScoringClient(score_fn=scorer, max_batch_size=50, max_wait=0.05) as client:
+            texts = [f"review {i % 10}" for i in range(40)]
+            results = await client.score_many(texts)
+            return texts, results, client.stats
+
+    texts, results, stats = asyncio.run(run())
+    assert [result['text'] for result in results] == texts
+    assert len(scorer.batches) == 1
+    assert len(scorer.batches[0]) == 10
+    assert stats['coalesced'] == 30
+
+
+def test_queue_limit_applies_backpressure():
+    release = threading.Event()
+    scorer = RecordingScorer(release=release)
+
+    async def run():
+        async with AsyncScoringClient(score_fn=scorer, max_batch_size=1, max_wait=0,
+                                      max_queue_size=2, max_concurrent_batches=1) as client:
+            tasks = [asyncio.create_task(client.score(f"review {i}")) for i in range(4)]
+            await asyncio.sleep(0.05)
+            # One batch in the executor, one held by the batcher, two queued
+            with pytest.raises(ScoringQueueFull):
+                await client.score("one too many", wait=False)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+    assert len(results) == 4
+
+
+def test_deadline_and_cancellation_skip_queued_work():
+    release = threading.Event()
+    scorer = RecordingScorer(release=release)
+
+    async def run():
+        async with AsyncScoringClient(score_fn=scorer, max_batch_size=1, max_wait=0,
+                                      max_concurrent_batches=1) as client:
+            blocker = asyncio.create_task(client.score("blocker"))
+            await asyncio.sleep(0.02)
+            cancelled = asyncio.create_task(client.score("cancel me"))
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            with pytest.raises(asyncio.TimeoutError):
+                await client.score("too slow", timeout=0.05)
+            release.set()
+            await blocker
+            await asyncio.sleep(0.05)
+            return client.stats
+
+    stats = asyncio.run(run())
+    assert scorer.batches == [["blocker"]]
+    assert stats['cancelled'] + stats['expired'] == 2
+
+
+def test_close_fails_a_batch_waiting_for_a_slot():
+    release = threading.Event()
+    scorer = RecordingScorer(release=release)
+
+    async def run():
+        client = AsyncScoringClient(score_fn=scorer, max_batch_size=1, max_wait=0, max_concurrent_batches=1)
+        await client.start()
+        running = asyncio.create_task(client.score("running"))
+        await asyncio.sleep(0.02)
+        # Taken off the queue by the batcher, which is parked waiting for a batch slot
+        waiting = asyncio.create_task(client.score("waiting"))
+        await asyncio.sleep(0.02)
+        assert client.pending == 0
+
+        release.set()
+        await client.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            await asyncio.wait_for(waiting, 1)
+        return await running
+
+    assert asyncio.run(run())['text'] == "running"
+    assert scorer.batches == [["running"]]
+
+
+def test_close_fails_callers_waiting_for_queue_space():
+    release = threading.Event()
+    scorer = RecordingScorer(release=release)
+
+    async def run():
+        client = AsyncScoringClient(score_fn=scorer, max_batch_size=1, max_wait=0,
+                                    max_queue_size=1, max_concurrent_batches=1)
+        await client.start()
+        # One batch in the executor, one held by the batcher, one queued, one waiting for space
+        tasks = [asyncio.create_task(client.score(f"review {i}")) for i in range(4)]
+        await asyncio.sleep(0.05)
+        assert client.pending == 1 and not tasks[3].done()
+
+        release.set()
+        await client.close()
+        return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1)
+
+    results = asyncio.run(run())
+    assert results[0]['text'] == "review 0"
+    assert all(isinstance(result, RuntimeError) for result in results[1:])
+
+
+def test_real_context_scoring_does_not_block_the_loop(context):
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        tick_task = asyncio.create_task(ticker())
+        async with AsyncScoringClient(context, max_batch_size=32) as client:
+            results = await client.score_many(
+                ["absolute garbage", "fast delivery and great packaging."] * 50,
+                categories=[None, "groceries"] * 50,
+            )
+        tick_task.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+    assert results[0]['predicted_sentiment'] == 'negative'
+    assert results[1]['predicted_sentiment'] == 'positive'
+    assert 'aspect_Freshness' in results[1]
+    assert ticks > 0
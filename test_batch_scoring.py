@@ -0,0 +1,94 @@
+import sys
+import os
+import json
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+import sentiment
+from utils.batch_scoring import score_reviews, score_dataframe, summarize_scores
+from utils.aspect_analyzer import AspectAnalyzer
+from utils.corpus import score_corpus, query_corpus, corpus_fingerprint
+from utils.inference_context import InferenceContext
+from utils.lexicon import LEXICON_DIR
+from utils.hybrid import apply_hybrid_override_single
+
+
+def single_review_result(context, text):
+    """The per-review path as the dashboard runs it"""
+    label, probabilities = context.predict_sentiment_with_probabilities(text)
+    rule_score = context.analyze_overall_sentiment(text)
+    label, score, _, _ = apply_hybrid_override_single(label, probabilities, rule_score)
+    return label, score
+
+
+def test_batch_matches_single_review_path(context):
+    texts = list(sentiment.load_data()['review_text'].unique()) + [
+        "worst purchase I've ever made",
+        "absolute garbage",
+    ]
+    progress = []
+    scored = score_reviews(texts, context, chunk_size=64, progress_callback=lambda done, total: progress.append(done))
+
+    assert progress[-1] == len(texts)
+    assert len(scored) == len(texts)
+    for text, (_, row) in zip(texts, scored.iterrows()):
+        label, score = single_review_result(context, text)
+        assert row['predicted_sentiment'] == label
+        assert row['sentiment_score'] == pytest.approx(score)
+        assert row['aspect_Shipping'] == pytest.approx(context.analyze_aspects(text)['Shipping'])
+
+
+def test_query_corpus_filters_sorts_and_paginates(context):
+    df = sentiment.load_data().head(300)
+    scored = score_corpus(df, context)
+
+    page, total = query_corpus(scored, sentiments=['negative'], search='DELIVERY',
+                               sort_by='customer_id', ascending=True, page=2, page_size=5)
+
+    expected = scored[(scored['predicted_sentiment'] == 'negative')
+                      & scored['review_text'].str.contains('delivery')].sort_values('customer_id')
+    assert total == len(expected)
+    assert page['customer_id'].tolist() == expected['customer_id'].iloc[5:10].tolist()
+    assert '_search_text' not in page.columns
+
+    # Pages past the end clamp to the last page
+    last_page, _ = query_corpus(scored, page=10_000, page_size=100)
+    assert len(last_page) == len(scored) - 100 * ((len(scored) - 1) // 100)
+
+
+def test_score_dataframe_and_summary(context):
+    upload = sentiment.load_data()[['review_text', 'product_category']].head(120).rename(columns={'review_text': 'text'})
+    scored = score_dataframe(upload, context, text_column='text', category_column='product_category', chunk_size=50)
+
+    assert list(scored.columns[:2]) == ['text', 'product_category']
+    assert len(scored) == 120
+
+    summary = summarize_scores(scored)
+    assert summary['count'] == 120
+    assert sum(summary['sentiment_share'].values()) == pytest.approx(1.0)
+    assert all(0.0 <= score <= 1.0 for score in summary['aspect_means'].values())
+
+
+def test_corpus_fingerprint_follows_category_packs(context, df, tmp_path):
+    lexicon_dir = tmp_path / "lexicons"
+    lexicon_dir.mkdir()
+    for name in ("default.json", "electronics.json"):
+        with open(os.path.join(LEXICON_DIR, name), encoding='utf-8') as f:
+            (lexicon_dir / name).write_text(f.read(), encoding='utf-8')
+
+    def fingerprint():
+        analyzer = AspectAnalyzer(lexicon_dir=str(lexicon_dir))
+        return corpus_fingerprint(df, InferenceContext(*context.artifacts, analyzer=analyzer))
+
+    before = fingerprint()
+    assert fingerprint() == before
+
+    pack = json.loads((lexicon_dir / "electronics.json").read_text(encoding='utf-8'))
+    pack.setdefault("sentiment", {}).setdefault("negative", []).append("bricked")
+    (lexicon_dir / "electronics.json").write_text(json.dumps(pack), encoding='utf-8')
+    os.utime(lexicon_dir / "electronics.json", ns=(0, 0))
+
+    assert fingerprint() != before
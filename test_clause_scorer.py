@@ -0,0 +1,85 @@
+import sys
+import os
+import time
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.aspect_analyzer import AspectAnalyzer
+from utils.evaluation import compute_rule_scores, rule_labels
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return AspectAnalyzer(scorer='clause')
+
+
+def test_negation_scope_ends_at_punctuation_and_window(analyzer):
+    assert analyzer.analyze_overall_sentiment("not good") == pytest.approx(0.25)
+    # The comma closes the scope: "great" is not negated
+    assert analyzer.analyze_overall_sentiment("not good, great") == pytest.approx((0.25 + 0.9) / 2)
+    # Beyond the window of three tokens
+    assert analyzer.analyze_overall_sentiment("not what i would call really great") == pytest.approx(0.9)
+    assert analyzer.analyze_overall_sentiment("never disappointed") == pytest.approx(0.9)
+    # Whole tokens only: "know" contains "no" but does not negate
+    assert analyzer.analyze_overall_sentiment("i know it is good") == pytest.approx(0.75)
+
+
+def test_contrast_clause_weighs_more_and_splits_aspects(analyzer):
+    overall = analyzer.analyze_overall_sentiment("Nice screen but a weak battery.")
+    assert overall == pytest.approx((0.75 + 2 * 0.2) / 3)
+
+    aspects = analyzer.analyze_aspects("Great battery but awful delivery.")
+    assert aspects['Battery Life'] == pytest.approx(0.9)
+    assert aspects['Shipping'] == pytest.approx(0.1)
+    assert aspects['Design'] == 0.5
+
+    # The lexicon scorer blends the whole sentence into both aspects
+    lexicon_aspects = AspectAnalyzer(scorer='lexicon').analyze_aspects("Great battery but awful delivery.")
+    assert lexicon_aspects['Battery Life'] == lexicon_aspects['Shipping']
+
+
+def test_phrases_and_inflections(analyzer):
+    assert analyzer.analyze_overall_sentiment("performance is below average") == pytest.approx(0.2)
+    assert analyzer.analyze_overall_sentiment("highly recommended") == pytest.approx(0.75)
+    assert analyzer.analyze_aspects("the charger is great")['Battery Life'] == pytest.approx(0.9)
+
+
+@pytest.mark.parametrize("review", [
+    "", "...", "!!!", "The battery life is terrible - it barely lasts 3 hours",
+    "Customer service was completely unhelpful", "Performance has been a nightmare",
+])
+def test_weaknesses_and_empty_input_match_the_lexicon_scorer(analyzer, review):
+    lexicon = AspectAnalyzer(scorer='lexicon')
+    assert analyzer.analyze_overall_sentiment(review) == pytest.approx(lexicon.analyze_overall_sentiment(review))
+    assert analyzer.analyze_aspects(review) == pytest.approx(lexicon.analyze_aspects(review))
+
+
+def test_unknown_scorer_is_rejected():
+    with pytest.raises(ValueError):
+        AspectAnalyzer(scorer='parser')
+
+
+def test_rule_accuracy_does_not_regress(df):
+    truth = df['sentiment'].to_numpy()
+    lexicon = (rule_labels(compute_rule_scores(df, AspectAnalyzer(scorer='lexicon'))) == truth).mean()
+    clause = (rule_labels(compute_rule_scores(df, AspectAnalyzer(scorer='clause'))) == truth).mean()
+    assert clause >= lexicon
+
+
+def test_scoring_time_is_linear_in_review_length(analyzer):
+    sentence = "the battery is not great but the delivery was fast, however support was awful. "
+
+    def best_of(text, runs=5):
+        timings = []
+        for _ in range(runs):
+            # Distinct texts defeat the last-result memo
+            start = time.perf_counter()
+            analyzer.analyze_overall_sentiment(text + str(len(timings)))
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    short, long = best_of(sentence * 200), best_of(sentence * 2000)
+    assert long < 20 * short
@@ -0,0 +1,99 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+import sentiment
+from utils.compact_model import export_mmap_model, export_quantized_model, load_compact_model
+
+
+@pytest.fixture(scope="module")
+def artifacts(context):
+    return context.artifacts
+
+
+@pytest.fixture(scope="module")
+def texts(df):
+    return df['review_text'].tolist() + [
+        "",
+        "zzzz qqqq",
+        "Great BATTERY!!! but the delivery was slow",
+        "unbelievablejust" * 10,
+        "It doesn’t work 👎👎",
+        "Ｓｏｏｏｏ ｇｏｏｄ 😍❤️",
+    ]
+
+
+def test_mmap_model_matches_sklearn_exactly(artifacts, texts, tmp_path):
+    path = export_mmap_model(str(tmp_path / "model.smm"), *artifacts)
+    compact = load_compact_model(path)
+
+    assert isinstance(compact.weights, np.memmap)
+    assert isinstance(compact.vocab_terms, np.memmap)
+
+    expected_labels, expected_probabilities, expected_classes = sentiment.predict_batch_from_artifacts(texts, *artifacts)
+    labels, probabilities, classes = compact.predict_batch(texts)
+
+    assert classes == expected_classes
+    assert (labels == expected_labels).all()
+    assert np.abs(probabilities - expected_probabilities).max() < 1e-9
+
+
+def test_binary_mmap_model_matches_sklearn_exactly(binary_artifacts, texts, tmp_path):
+    compact = load_compact_model(export_mmap_model(str(tmp_path / "binary.smm"), *binary_artifacts))
+
+    expected_labels, expected_probabilities, expected_classes = sentiment.predict_batch_from_artifacts(
+        texts, *binary_artifacts
+    )
+    labels, probabilities, classes = compact.predict_batch(texts)
+
+    assert classes == expected_classes == ['negative', 'positive']
+    assert (labels == expected_labels).all()
+    assert np.abs(probabilities - expected_probabilities).max() < 1e-9
+
+
+# Stated tolerances of the quantized formats against the sklearn pipeline on the CSV sample:
+# (minimum label agreement, maximum absolute probability difference)
+QUANTIZED_TOLERANCES = {
+    'float32': (1.0, 1e-6),
+    'float16': (1.0, 1e-3),
+    'int8': (0.995, 1e-2),
+}
+
+
+@pytest.mark.parametrize("weight_dtype", sorted(QUANTIZED_TOLERANCES))
+def test_quantized_model_agrees_with_sklearn(artifacts, texts, tmp_path, weight_dtype):
+    min_agreement, max_probability_error = QUANTIZED_TOLERANCES[weight_dtype]
+    path = export_quantized_model(str(tmp_path / f"model.{weight_dtype}"), *artifacts, weight_dtype=weight_dtype)
+    compact = load_compact_model(path)
+
+    expected_labels, expected_probabilities, _ = sentiment.predict_batch_from_artifacts(texts, *artifacts)
+    labels, probabilities, _ = compact.predict_batch(texts)
+
+    assert (labels == expected_labels).mean() >= min_agreement
+    assert np.abs(probabilities - expected_probabilities).max() <= max_probability_error
+    assert os.path.getsize(path) < os.path.getsize(export_mmap_model(str(tmp_path / "full.smm"), *artifacts))
+
+
+@pytest.mark.parametrize("weight_dtype", sorted(QUANTIZED_TOLERANCES))
+def test_binary_quantized_model_agrees_with_sklearn(binary_artifacts, texts, tmp_path, weight_dtype):
+    min_agreement, max_probability_error = QUANTIZED_TOLERANCES[weight_dtype]
+    path = export_quantized_model(str(tmp_path / f"binary.{weight_dtype}"), *binary_artifacts, weight_dtype=weight_dtype)
+    compact = load_compact_model(path)
+
+    expected_labels, expected_probabilities, _ = sentiment.predict_batch_from_artifacts(texts, *binary_artifacts)
+    labels, probabilities, _ = compact.predict_batch(texts)
+
+    assert (labels == expected_labels).mean() >= min_agreement
+    assert np.abs(probabilities - expected_probabilities).max() <= max_probability_error
+
+
+def test_mmap_model_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_model.bin"
+    path.write_bytes(b"pickle?" * 10)
+    with pytest.raises(ValueError):
+        load_compact_model(str(path))
@@ -0,0 +1,50 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+import sentiment
+from utils.batch_scoring import score_reviews
+from utils.dedup import plan_dedup
+
+
+def test_exact_dedup_is_lossless(context):
+    df = sentiment.load_data()
+    plain = score_reviews(df['review_text'], context, df['product_category'])
+    deduped = score_reviews(df['review_text'], context, df['product_category'], dedup='exact')
+
+    report = deduped.attrs['dedup']
+    assert report['rows'] == len(df)
+    assert report['clusters'] < len(df) / 3
+    pd.testing.assert_frame_equal(deduped[plain.columns], plain)
+
+
+def test_near_duplicates_are_clustered_within_key():
+    texts = [
+        "fast delivery and great packaging.",
+        "fast delivery and great packaging!!",
+        "Fast  delivery and great packaging.",
+        "late delivery and poor packaging.",
+        "good",
+        "very good",
+        "fast delivery and great packaging.",
+    ]
+    keys = ['a', 'a', 'a', 'a', 'a', 'a', 'b']
+
+    representatives, assignment, report = plan_dedup(texts, keys, near_duplicates=True)
+
+    assert assignment[0] == assignment[1] == assignment[2]
+    assert len({assignment[0], assignment[3], assignment[4], assignment[5], assignment[6]}) == 5
+    assert report['exact_unique'] == 7
+    assert report['clusters'] == 5
+    assert report['duplicate_ratio'] == pytest.approx(2 / 7)
+
+    # Without near-duplicate matching only identical (text, key) pairs merge
+    _, exact_assignment, _ = plan_dedup(texts + texts[:1], keys + ['a'])
+    assert exact_assignment[0] == exact_assignment[-1]
+    assert len(np.unique(exact_assignment)) == 7
@@ -0,0 +1,110 @@
+import sys
+import os
+import json
+from collections import Counter
+
+import numpy as np
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.batch_scoring import score_reviews
+from utils.drift_monitor import CountMinSketch, ReservoirSample, DriftMonitor, build_baseline, compare
+from utils.model_registry import publish_version, load_drift_baseline
+from utils.streaming import score_stream
+
+
+@pytest.fixture(scope="module")
+def baseline(context, df):
+    return build_baseline(context, df)
+
+
+def test_count_min_sketch_never_undercounts():
+    rng = np.random.default_rng(0)
+    keys = [f"token{i}" for i in rng.zipf(1.5, size=5000) % 3000]
+    truth = Counter(keys)
+
+    sketch = CountMinSketch(width=256, depth=4)
+    for start in range(0, len(keys), 500):
+        sketch.add(keys[start:start + 500])
+
+    distinct = list(truth)
+    estimates = sketch.estimate(distinct)
+    assert (estimates >= np.array([truth[key] for key in distinct])).all()
+    # The heaviest key stands out despite the tiny table
+    heaviest = max(truth, key=truth.get)
+    assert sketch.estimate([heaviest])[0] - truth[heaviest] < 0.05 * len(keys)
+
+
+def test_reservoir_is_bounded_and_uniform():
+    hits = Counter()
+    for seed in range(200):
+        sample = ReservoirSample(size=10, seed=seed)
+        for item in range(100):
+            sample.add(item)
+        assert len(sample.items) == 10
+        hits.update(item // 50 for item in sample.items)
+    # Each half of the stream holds about half of the sampled items
+    assert abs(hits[0] - hits[1]) < 0.15 * sum(hits.values())
+
+
+def test_training_traffic_does_not_alert(context, df, baseline):
+    monitor = DriftMonitor.from_context(context)
+    sample = df.sample(600, random_state=1)
+    scored = score_reviews(sample['review_text'], context, sample['product_category'])
+    monitor.update_scored(sample['review_text'], scored, sample['product_category'])
+
+    report = compare(baseline, monitor.snapshot())
+    json.loads(json.dumps(report))
+    assert report['enough_data']
+    assert report['alerts'] == []
+    assert report['oov_rate']['current'] == 0.0
+
+
+def test_shifted_traffic_alerts_with_unseen_tokens(context, baseline):
+    texts = ["the zorblax gizmo broke and the seller ignored me"] * 150 + ["great phone"] * 100
+    monitor = DriftMonitor.from_context(context)
+    records = [{'review_text': text} for text in texts]
+    assert len(list(score_stream(records, context, batch_size=64, monitor=monitor))) == len(texts)
+
+    snapshot = monitor.snapshot()
+    assert snapshot['documents'] == len(texts)
+    assert len(snapshot['sample']) <= 50
+    assert ('zorblax', 150) in [tuple(item) for item in snapshot['top_oov_tokens']]
+
+    report = compare(baseline, snapshot)
+    assert report['retrain_recommended']
+    assert any(alert.startswith('oov_rate') for alert in report['alerts'])
+    # Too little traffic is reported but not alerted on
+    assert not compare(baseline, snapshot, {'min_documents': 1000})['alerts']
+
+
+def test_baseline_is_stored_with_the_model_version(context, baseline, tmp_path):
+    version = publish_version(context, str(tmp_path), 'v1', drift_baseline=baseline)
+    assert load_drift_baseline(version, str(tmp_path)) == json.loads(json.dumps(baseline))
+
+    publish_version(context, str(tmp_path), 'v2')
+    assert load_drift_baseline('v2', str(tmp_path)) is None
+
+
+def test_cli_compares_against_the_stored_baseline_without_training(context, baseline, tmp_path, monkeypatch, capsys):
+    import sentiment
+    from utils import drift_monitor
+
+    def no_training(df):
+        raise AssertionError("the drift CLI trained a model")
+
+    monkeypatch.setattr(sentiment, 'fit_artifacts', no_training)
+    registry_dir = str(tmp_path / "registry")
+    publish_version(context, registry_dir, '20240101-000000', drift_baseline=baseline)
+    traffic = tmp_path / "traffic.jsonl"
+    traffic.write_text("\n".join(json.dumps({'review_text': "the zorblax gizmo broke"}) for _ in range(250)))
+
+    monkeypatch.setattr(sys, 'argv', ['drift_monitor', '--data', 'missing.csv', '--registry', registry_dir,
+                                      'compare', str(traffic)])
+    drift_monitor.main()
+
+    report = json.loads(capsys.readouterr().out)
+    assert report['class_share']['baseline'] == baseline['class_share']
+    assert any(alert.startswith('oov_rate') for alert in report['alerts'])
@@ -0,0 +1,41 @@
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.evaluation import evaluate, prepare_folds
+
+
+def test_report_is_consistent_and_machine_readable(df, tmp_path):
+    report = evaluate(df, n_splits=3, n_jobs=1, cache_dir=str(tmp_path))
+    json.loads(json.dumps(report))
+
+    assert report['rows'] == len(df)
+    for name in ('ml', 'rules', 'hybrid'):
+        metrics = report['metrics'][name]
+        matrix = np.array(metrics['confusion_matrix']['matrix'])
+        assert matrix.sum() == len(df)
+        assert metrics['accuracy'] == pytest.approx(np.trace(matrix) / len(df))
+        assert set(metrics['per_class']) == {'negative', 'neutral', 'positive'}
+
+    assert report['metrics']['ml']['accuracy'] > 0.95
+    assert sum(fold['rows'] for fold in report['folds']) == len(df)
+    assert sum(segment['rows'] for segment in report['segments']['region'].values()) == len(df)
+    overrides = report['hybrid_overrides']
+    assert overrides['fixed'] + overrides['broke'] <= overrides['count']
+
+
+def test_folds_are_cached_and_parallel_matches_inline(df, tmp_path):
+    paths = prepare_folds(df, n_splits=3, cache_dir=str(tmp_path))
+    mtimes = [os.path.getmtime(path) for path in paths]
+
+    inline = evaluate(df, n_splits=3, n_jobs=1, cache_dir=str(tmp_path))
+    parallel = evaluate(df, n_splits=3, n_jobs=2, cache_dir=str(tmp_path))
+
+    assert [os.path.getmtime(path) for path in paths] == mtimes
+    assert inline['metrics'] == parallel['metrics']
@@ -0,0 +1,70 @@
+import sys
+import os
+import copy
+
+import numpy as np
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+import sentiment
+from utils.explanations import LinearExplainer, pair_sign_matrix, explain_frame
+
+
+@pytest.fixture(scope="module")
+def explainer(context):
+    return LinearExplainer.from_context(context)
+
+
+def test_evidence_matches_the_svm_decision(context, explainer):
+    texts = list(sentiment.load_data()['review_text'].unique()[:100]) + ["battery is terrible, not worth it"]
+    model = copy.copy(context.model)
+    model.decision_function_shape = 'ovo'
+    X = context.scaler.transform(context.vectorizer.transform(texts).toarray())
+    n_classes = len(model.classes_)
+    pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+
+    expected = model.decision_function(X) @ pair_sign_matrix(pairs, n_classes)
+
+    np.testing.assert_allclose(explainer.evidence(texts), expected, atol=1e-9)
+
+
+def test_binary_evidence_matches_the_svm_decision(df, binary_artifacts):
+    model, vectorizer, scaler, label_encoder = binary_artifacts
+    explainer = LinearExplainer(*binary_artifacts)
+    texts = list(df['review_text'].unique()[:100]) + ["battery is terrible, not worth it", "absolutely love it"]
+    X = scaler.transform(vectorizer.transform(texts).toarray())
+
+    # A positive binary decision_function means classes_[1]
+    decision = model.decision_function(X)
+    np.testing.assert_allclose(explainer.evidence(texts), np.column_stack([-decision, decision]), atol=1e-9)
+
+    predicted = label_encoder.inverse_transform(model.predict(X))
+    strongest = np.array(explainer.classes)[np.argmax(explainer.evidence(texts), axis=1)]
+    assert (strongest == predicted).all()
+    assert explainer.explain("absolutely love it")['positive']['evidence'] > 0
+
+
+def test_top_terms_are_exact_contributions(context, explainer):
+    text = "fast delivery but the battery is terrible and not worth the price"
+    batch = explainer.explain_batch([text, "", "great value for money."], top_k=3)
+    explanation = batch[0]
+
+    X = context.vectorizer.transform([text])
+    for c, label in enumerate(explainer.classes):
+        contributions = X.toarray()[0] * explainer.class_weights[:, c]
+        expected = sorted(contributions[contributions > 0], reverse=True)[:3]
+        assert [value for _, value in explanation[label]['supporting']] == pytest.approx(expected)
+        assert all(value < 0 for _, value in explanation[label]['opposing'])
+        assert explanation[label]['evidence'] == pytest.approx(contributions.sum() + explainer.class_bias[c])
+
+    assert batch[1]['positive']['supporting'] == []
+    assert explanation['negative']['supporting'][0][0] == 'not'
+
+
+def test_explain_frame_uses_each_rows_label(explainer):
+    frame = sentiment.load_data().head(5).assign(ml_sentiment=lambda df: df['sentiment'])
+    explanations = explain_frame(frame, explainer)
+    assert list(explanations.index) == list(frame.index)
+    assert all(explanations.str.len() > 0)
@@ -0,0 +1,172 @@
+"""
+Regression tests against a frozen golden scoring corpus.
+
+test_data/golden_scores.json holds the expected labels, probabilities, rule
+scores and aspect scores for a sample of the bundled CSV plus hand-picked
+tricky reviews. A change that moves any of them fails here. If the change is
+intended, regenerate the file and commit it together with the change:
+
+    python test_golden.py
+"""
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+import sentiment
+from conftest import TEST_DATA_DIR
+from utils.batch_scoring import score_reviews, aspect_columns, ASPECT_PREFIX, PROBABILITY_PREFIX
+from utils.compact_model import export_mmap_model, export_quantized_model, load_compact_model
+from utils.hybrid import apply_hybrid_override_single
+
+GOLDEN_PATH = os.path.join(TEST_DATA_DIR, 'golden_scores.json')
+GOLDEN_SAMPLE_STEP = 10
+GOLDEN_ATOL = 1e-6
+
+TRICKY_REVIEWS = [
+    "",
+    "   ",
+    "worst purchase I've ever made",
+    "absolute garbage",
+    "zero stars if I could",
+    "The battery life is terrible - it barely lasts 3 hours",
+    "Customer service was completely unhelpful",
+    "Performance has been a nightmare",
+    "Not bad at all, the design is not terrible",
+    "Great BATTERY!!! but the delivery was slow",
+    "It doesn’t work 👎👎",
+    "Ｓｏｏｏｏ ｇｏｏｄ 😍❤️",
+    "zzzz qqqq",
+]
+
+
+def golden_inputs(df):
+    """(texts, categories): every GOLDEN_SAMPLE_STEP-th CSV review, then TRICKY_REVIEWS"""
+    sample = df.iloc[::GOLDEN_SAMPLE_STEP]
+    texts = sample['review_text'].tolist() + TRICKY_REVIEWS
+    categories = sample['product_category'].tolist() + [None] * len(TRICKY_REVIEWS)
+    return texts, categories
+
+
+def build_golden(context, df):
+    """Score the golden inputs with today's code"""
+    texts, categories = golden_inputs(df)
+    scored = score_reviews(texts, context, categories)
+    _, ml_probabilities, classes = context.predict_sentiment_batch(texts)
+
+    records = []
+    for i, row in scored.iterrows():
+        records.append({
+            'text': texts[i],
+            'category': categories[i],
+            'ml_sentiment': row['ml_sentiment'],
+            'ml_probabilities': dict(zip(classes, ml_probabilities[i].tolist())),
+            'rule_score': row['rule_score'],
+            'predicted_sentiment': row['predicted_sentiment'],
+            'sentiment_score': row['sentiment_score'],
+            'override_reason': row['override_reason'],
+            'probabilities': {label: row[PROBABILITY_PREFIX + label] for label in classes},
+            'aspects': {
+                column[len(ASPECT_PREFIX):]: row[column]
+                for column in aspect_columns(scored) if not np.isnan(row[column])
+            },
+        })
+    return {'classes': list(classes), 'records': records}
+
+
+@pytest.fixture(scope="module")
+def golden():
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def texts(golden):
+    return [record['text'] for record in golden['records']]
+
+
+def test_golden_inputs_are_current(golden, df):
+    texts, categories = golden_inputs(df)
+    assert [record['text'] for record in golden['records']] == texts
+    assert [record['category'] for record in golden['records']] == categories
+
+
+@pytest.mark.parametrize("dedup", [None, 'exact'])
+def test_batch_scoring_matches_golden(golden, context, texts, dedup):
+    categories = [record['category'] for record in golden['records']]
+    scored = score_reviews(texts, context, categories, chunk_size=64, dedup=dedup)
+
+    for i, record in enumerate(golden['records']):
+        row = scored.iloc[i]
+        assert row['ml_sentiment'] == record['ml_sentiment'], record['text']
+        assert row['predicted_sentiment'] == record['predicted_sentiment'], record['text']
+        assert row['override_reason'] == record['override_reason'], record['text']
+        assert row['rule_score'] == pytest.approx(record['rule_score'], abs=GOLDEN_ATOL)
+        assert row['sentiment_score'] == pytest.approx(record['sentiment_score'], abs=GOLDEN_ATOL)
+        for label, probability in record['probabilities'].items():
+            assert row[PROBABILITY_PREFIX + label] == pytest.approx(probability, abs=GOLDEN_ATOL)
+        present = {
+            column[len(ASPECT_PREFIX):]: row[column]
+            for column in aspect_columns(scored) if not np.isnan(row[column])
+        }
+        assert present == pytest.approx(record['aspects'], abs=GOLDEN_ATOL), record['text']
+
+
+def test_single_review_path_matches_golden(golden, context):
+    for record in golden['records']:
+        text, category = record['text'], record['category']
+        ml_label, probabilities = context.predict_sentiment_with_probabilities(text)
+        rule_score = context.analyze_overall_sentiment(text, category=category)
+        final_label, score, _, reason = apply_hybrid_override_single(ml_label, probabilities, rule_score)
+
+        assert ml_label == record['ml_sentiment'], text
+        assert probabilities == pytest.approx(record['ml_probabilities'], abs=GOLDEN_ATOL)
+        assert rule_score == pytest.approx(record['rule_score'], abs=GOLDEN_ATOL)
+        assert (final_label, reason) == (record['predicted_sentiment'], record['override_reason']), text
+        assert score == pytest.approx(record['sentiment_score'], abs=GOLDEN_ATOL)
+        assert context.analyze_aspects(text, category=category) == pytest.approx(record['aspects'], abs=GOLDEN_ATOL)
+
+
+def expected_ml(golden):
+    labels = np.array([record['ml_sentiment'] for record in golden['records']])
+    probabilities = np.array([
+        [record['ml_probabilities'][label] for label in golden['classes']] for record in golden['records']
+    ])
+    return labels, probabilities
+
+
+def test_compact_models_match_golden(golden, context, texts, tmp_path):
+    expected_labels, expected_probabilities = expected_ml(golden)
+
+    exact = load_compact_model(export_mmap_model(str(tmp_path / "model.smm"), *context.artifacts))
+    labels, probabilities, classes = exact.predict_batch(texts)
+    assert list(classes) == golden['classes']
+    assert (labels == expected_labels).all()
+    np.testing.assert_allclose(probabilities, expected_probabilities, atol=GOLDEN_ATOL)
+
+    int8 = load_compact_model(export_quantized_model(str(tmp_path / "model.int8"), *context.artifacts))
+    labels, probabilities, _ = int8.predict_batch(texts)
+    assert (labels == expected_labels).mean() >= 0.995
+    assert np.abs(probabilities - expected_probabilities).max() <= 1e-2
+
+
+def main():
+    """Regenerate the golden file from a freshly trained model"""
+    from utils.inference_context import InferenceContext
+
+    df = sentiment.load_data()
+    golden = build_golden(InferenceContext.from_dataframe(df), df)
+    os.makedirs(TEST_DATA_DIR, exist_ok=True)
+    with open(GOLDEN_PATH, 'w', encoding='utf-8') as f:
+        json.dump(golden, f, indent=1, ensure_ascii=False)
+        f.write('\n')
+    print(f"Wrote {len(golden['records'])} golden records to {GOLDEN_PATH}")
+
+
+if __name__ == "__main__":
+    main()
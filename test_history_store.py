@@ -0,0 +1,110 @@
+import sys
+import os
+import sqlite3
+import threading
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.history_store import HistoryStore, with_pending_row
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+    yield store
+    store.close()
+
+
+def test_records_are_persisted_and_paged_newest_first(store, tmp_path):
+    for i in range(25):
+        store.record(f"review {i}", 'positive' if i % 2 else 'negative', score=i / 25,
+                     session_id='a' if i < 20 else 'b', created_at=f"2024-01-01T00:00:{i:02d}.000")
+    store.flush()
+
+    rows, total = store.query(page=2, page_size=10, session_id='a')
+    assert total == 20
+    assert [row['review_text'] for row in rows] == [f"review {i}" for i in range(9, -1, -1)]
+
+    rows, total = store.query(sentiment='positive', since='2024-01-01T00:00:20.000')
+    assert total == 2 and {row['review_text'] for row in rows} == {"review 21", "review 23"}
+
+    # Survives a new store instance (e.g. a process restart)
+    reopened = HistoryStore(store.path)
+    assert reopened.query()[1] == 25
+    reopened.close()
+
+    connection = sqlite3.connect(store.path)
+    assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    indexes = {row[1] for row in connection.execute("PRAGMA index_list('review_history')")}
+    assert {'idx_history_created_at', 'idx_history_sentiment', 'idx_history_score'} <= indexes
+    connection.close()
+
+
+def test_concurrent_writers_are_batched_without_loss(store):
+    def write(worker):
+        for i in range(200):
+            store.record(f"worker {worker} review {i}", 'neutral', score=0.5)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+
+    assert store.stats() == {'written': 800, 'failed': 0, 'dropped': 0, 'queued': 0}
+    assert store.query()[1] == 800
+
+
+def test_flush_makes_recorded_rows_visible(store):
+    store.record("just analyzed", 'positive', score=0.9, session_id='s1')
+    assert store.flush(timeout=5)
+    assert store.query(session_id='s1')[1] == 1
+
+
+def test_pending_row_is_listed_until_committed(store):
+    store.record("older", 'negative', score=0.2, session_id='s1')
+    store.flush()
+    pending = {'created_at': '2999-01-01T00:00:00.000', 'review_text': "just analyzed", 'sentiment': 'positive'}
+
+    rows, total = with_pending_row(*store.query(page_size=1, session_id='s1'), pending, page=1, page_size=1)
+    assert [row['review_text'] for row in rows] == ["just analyzed"] and total == 2
+
+    store.record("just analyzed", 'positive', session_id='s1', created_at=pending['created_at'])
+    store.flush()
+    rows, total = with_pending_row(*store.query(page_size=1, session_id='s1'), pending, page=1, page_size=1)
+    assert [row['review_text'] for row in rows] == ["just analyzed"] and total == 2
+    assert with_pending_row(*store.query(page=2, page_size=1, session_id='s1'), pending, 2, 1)[1] == 2
+
+
+def test_flush_times_out_while_the_database_is_locked(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+    blocker = sqlite3.connect(store.path)
+    blocker.execute('BEGIN EXCLUSIVE')
+    try:
+        store.record("waiting", 'neutral')
+        assert not store.flush(timeout=0.05)
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert store.flush(timeout=5)
+    store.close()
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite3'), max_queue_size=1)
+    # Hold the database lock so the writer cannot drain the queue
+    blocker = sqlite3.connect(store.path)
+    blocker.execute('BEGIN EXCLUSIVE')
+    try:
+        results = [store.record(f"review {i}", 'positive') for i in range(50)]
+    finally:
+        blocker.rollback()
+        blocker.close()
+    store.close()
+
+    assert results.count(False) == store.stats()['dropped'] > 0
+    assert store.query()[1] == results.count(True)
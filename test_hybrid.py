@@ -0,0 +1,45 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from config import HYBRID_OVERRIDE
+from utils.hybrid import (
+    apply_hybrid_override, apply_hybrid_override_single, override_counts,
+    NO_OVERRIDE, RULES_NEGATIVE, RULES_POSITIVE,
+)
+
+CLASSES = ['negative', 'neutral', 'positive']
+
+
+def test_thresholds_are_strict_and_reasons_reported():
+    labels = ['positive', 'positive', 'negative', 'negative', 'neutral', 'neutral']
+    rule_scores = [0.39, 0.4, 0.81, 0.8, 0.0, 1.0]
+    probabilities = np.tile([0.2, 0.1, 0.7], (len(labels), 1))
+
+    final, scores, final_probabilities, reasons = apply_hybrid_override(labels, probabilities, CLASSES, rule_scores)
+
+    assert list(final) == ['negative', 'positive', 'positive', 'negative', 'neutral', 'neutral']
+    assert list(reasons) == [RULES_NEGATIVE, NO_OVERRIDE, RULES_POSITIVE, NO_OVERRIDE, NO_OVERRIDE, NO_OVERRIDE]
+    assert scores[0] == 0.39 and scores[2] == 0.81
+    assert scores[1] == pytest.approx(0.7)
+    assert list(final_probabilities[0]) == [HYBRID_OVERRIDE['negative_probabilities'][c] for c in CLASSES]
+    assert override_counts(reasons) == {RULES_NEGATIVE: 1, RULES_POSITIVE: 1, 'total': 2}
+
+
+def test_single_review_matches_batch_and_honours_settings():
+    probabilities = {'negative': 0.2, 'neutral': 0.1, 'positive': 0.7}
+    label, score, overridden, reason = apply_hybrid_override_single('positive', probabilities, 0.3)
+    batch = apply_hybrid_override(['positive'], [[0.2, 0.1, 0.7]], CLASSES, [0.3])
+
+    assert (label, score, reason) == (batch[0][0], batch[1][0], batch[3][0])
+    assert overridden == HYBRID_OVERRIDE['negative_probabilities']
+
+    stricter = dict(HYBRID_OVERRIDE, negative_below=0.2)
+    assert apply_hybrid_override_single('positive', probabilities, 0.3, stricter) == (
+        'positive', pytest.approx(0.7), probabilities, NO_OVERRIDE
+    )
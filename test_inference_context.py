@@ -0,0 +1,35 @@
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+import sentiment
+
+
+def test_context_is_immutable(context):
+    with pytest.raises(AttributeError):
+        context.model = None
+    with pytest.raises(AttributeError):
+        del context.analyzer
+
+
+def test_context_does_not_touch_module_globals(context):
+    before = [id(artifact) for artifact in sentiment.get_artifacts()]
+    label, probabilities = context.predict_sentiment_with_probabilities("absolute garbage, very disappointed")
+    assert [id(artifact) for artifact in sentiment.get_artifacts()] == before
+    assert label == "negative"
+    assert abs(sum(probabilities.values()) - 1.0) < 1e-9
+
+
+def test_context_is_consistent_across_threads(context):
+    texts = sentiment.load_data()['review_text'].head(200).tolist()
+    expected = [context.predict_sentiment_with_probabilities(text) for text in texts]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        actual = list(pool.map(context.predict_sentiment_with_probabilities, texts))
+
+    assert actual == expected
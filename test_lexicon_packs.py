@@ -0,0 +1,68 @@
+import sys
+import os
+import json
+
+# Add the current directory to sys.path to make sure we can import the modules
+sys.path.append(os.getcwd())
+
+from config import PRODUCT_ASPECTS
+from utils import lexicon
+from utils.aspect_analyzer import AspectAnalyzer
+
+
+def test_default_pack_matches_config_aspects():
+    assert lexicon.load_lexicon().aspects == PRODUCT_ASPECTS
+
+
+def test_category_selects_pack():
+    analyzer = AspectAnalyzer()
+    scores = analyzer.analyze_aspects("The bread was stale.", category="groceries")
+
+    assert "Freshness" in scores and "Battery Life" not in scores
+    assert scores["Freshness"] < 0.45
+
+
+def test_unknown_category_falls_back_to_default():
+    assert lexicon.load_lexicon("home & kitchen").name == "default"
+    assert lexicon.category_to_pack_name("home & kitchen") == "home_kitchen"
+
+
+def test_compiled_lexicon_is_shared_between_analyzers():
+    assert AspectAnalyzer().lexicon is AspectAnalyzer().lexicon
+
+
+def test_yaml_pack_extends(tmp_path):
+    lexicon_dir = tmp_path / "lexicons"
+    lexicon_dir.mkdir()
+    with open(os.path.join(lexicon.LEXICON_DIR, "default.json")) as f:
+        (lexicon_dir / "default.json").write_text(f.read())
+    (lexicon_dir / "pets.yaml").write_text(
+        "extends: default\n"
+        "aspects:\n"
+        "  Pet Approval: [dog, cat, pet]\n"
+        "sentiment:\n"
+        "  negative: [refused]\n"
+    )
+
+    compiled = lexicon.compile_pack("pets", str(lexicon_dir))
+    assert compiled.aspects == ["Pet Approval"]
+    assert compiled.matches("negative", "my dog refused it")
+    assert compiled.matches("negative", "total garbage")
+    assert compiled.mentions("Pet Approval", "the cat loves it")
+    assert len(compiled.source_files) == 2
+
+
+def test_edited_pack_is_recompiled(tmp_path):
+    lexicon_dir = tmp_path / "lexicons"
+    lexicon_dir.mkdir()
+    pack = {"aspects": {"Fit": ["fit"]}, "sentiment": {"negative": ["tight"]}}
+    (lexicon_dir / "default.json").write_text(json.dumps(pack))
+
+    first = lexicon.load_lexicon(None, str(lexicon_dir))
+    pack["aspects"]["Fabric"] = ["cotton"]
+    (lexicon_dir / "default.json").write_text(json.dumps(pack))
+    os.utime(lexicon_dir / "default.json", ns=(0, 0))
+
+    second = lexicon.load_lexicon(None, str(lexicon_dir))
+    assert first is not second
+    assert second.aspects == ["Fit", "Fabric"]
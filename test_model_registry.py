@@ -0,0 +1,69 @@
+import sys
+import os
+import json
+import time
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.model_registry import ModelRegistry, publish_version, list_versions, ARTIFACTS_FILE, METADATA_FILE
+
+
+def test_registry_swaps_to_newer_valid_versions(context, tmp_path):
+    registry = ModelRegistry(str(tmp_path), poll_interval=0.01)
+    assert registry.check_for_updates() is False
+
+    publish_version(context, str(tmp_path), version='20240101-000000')
+    assert registry.check_for_updates() is True
+    first = registry.active
+    assert first.version == '20240101-000000'
+    assert first.metadata['accuracy'] == pytest.approx(context.accuracy)
+
+    text = "fast delivery and great packaging."
+    assert first.context.predict_sentiment(text) == context.predict_sentiment(text)
+
+    publish_version(context, str(tmp_path), version='20240102-000000')
+    assert registry.check_for_updates() is True
+    assert registry.active.version == '20240102-000000'
+    # A snapshot taken earlier is untouched by the swap
+    assert first.version == '20240101-000000'
+    assert registry.check_for_updates() is False
+    assert list_versions(str(tmp_path)) == ['20240101-000000', '20240102-000000']
+
+
+def test_invalid_versions_are_rejected_and_not_retried(context, tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    publish_version(context, str(tmp_path), version='v1')
+    registry.check_for_updates()
+
+    publish_version(context, str(tmp_path), version='v2')
+    with open(os.path.join(tmp_path, 'v2', ARTIFACTS_FILE), 'ab') as f:
+        f.write(b'corrupt')
+    publish_version(context, str(tmp_path), version='v3')
+    metadata_path = os.path.join(tmp_path, 'v3', METADATA_FILE)
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    with open(metadata_path, 'w') as f:
+        json.dump(dict(metadata, accuracy=0.5), f)
+
+    assert registry.check_for_updates() is False
+    assert 'v3' in registry.failed and 'accuracy' in registry.failed['v3']
+    assert registry.check_for_updates() is False
+    assert 'v2' in registry.failed and 'checksum' in registry.failed['v2']
+    assert registry.active.version == 'v1'
+
+
+def test_background_thread_picks_up_new_versions(context, tmp_path):
+    registry = ModelRegistry(str(tmp_path), poll_interval=0.01)
+    registry.start()
+    try:
+        publish_version(context, str(tmp_path), version='v1')
+        for _ in range(500):
+            if registry.active is not None:
+                break
+            time.sleep(0.01)
+    finally:
+        registry.stop()
+    assert registry.active.version == 'v1'
@@ -0,0 +1,58 @@
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.inference_context import InferenceContext
+from utils.explanations import LinearExplainer
+from utils.parallel_training import (
+    AveragedLinearSVC, compare_with_baseline, featurize_split, fit_sharded_artifacts, train_sharded,
+)
+
+
+@pytest.fixture(scope="module")
+def split(df):
+    return featurize_split(df)
+
+
+def test_single_model_average_reproduces_the_svc(split):
+    from sklearn.svm import SVC
+
+    svc = SVC(kernel='linear', C=0.1, random_state=42).fit(split.X_train, split.y_train)
+    averaged = AveragedLinearSVC.from_models([svc])
+
+    np.testing.assert_array_equal(averaged.predict(split.X_test), svc.predict(split.X_test))
+    np.testing.assert_allclose(averaged.decision_function(split.X_test), svc.decision_function(split.X_test),
+                               atol=1e-12)
+
+
+def test_parallel_shards_match_inline_and_stay_close_to_baseline(df, split):
+    inline, timing = train_sharded(split.X_train, split.y_train, n_shards=3, n_jobs=1)
+    parallel, _ = train_sharded(split.X_train, split.y_train, n_shards=3, n_jobs=2)
+
+    np.testing.assert_allclose(parallel.coef_, inline.coef_)
+    assert sum(timing['shard_rows']) == split.X_train.shape[0]
+
+    report = compare_with_baseline(df, n_shards=3, n_jobs=1)
+    json.loads(json.dumps(report))
+    assert report['sharded']['accuracy'] >= report['baseline']['accuracy'] - 0.02
+    assert report['label_agreement'] > 0.95
+
+
+def test_sharded_artifacts_plug_into_inference(df):
+    *artifacts, accuracy = fit_sharded_artifacts(df, n_shards=2, n_jobs=1)
+    context = InferenceContext(*artifacts, accuracy=accuracy)
+
+    labels, probabilities, classes = context.predict_sentiment_batch(
+        ["excellent product! exceeded expectations.", "product stopped working after few days."]
+    )
+    assert list(labels) == ['positive', 'negative']
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+
+    evidence = LinearExplainer.from_context(context).evidence(["excellent product!"])
+    assert classes[int(np.argmax(evidence[0]))] == 'positive'
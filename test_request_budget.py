@@ -0,0 +1,122 @@
+import sys
+import os
+import time
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.batch_scoring import score_reviews
+from utils.hybrid import apply_hybrid_override_single
+from utils.request_budget import (
+    RequestBudget, truncate_review, TRUNCATED_CHARS, TRUNCATED_TOKENS, ML_TIMEOUT, ML_BUSY, ASPECTS_SKIPPED
+)
+
+
+class SlowContext:
+    """An InferenceContext whose ML prediction takes `delay` seconds"""
+
+    def __init__(self, context, delay):
+        self._context = context
+        self._delay = delay
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+    def predict_sentiment_with_probabilities(self, text_input):
+        time.sleep(self._delay)
+        return self._context.predict_sentiment_with_probabilities(text_input)
+
+
+@pytest.fixture
+def budget():
+    budget = RequestBudget()
+    yield budget
+    budget.shutdown()
+
+
+def test_truncate_review_cuts_at_word_boundaries():
+    assert truncate_review("short review", 100, 10) == ("short review", [])
+    assert truncate_review("great battery life", 15, 10) == ("great battery", [TRUNCATED_CHARS])
+    assert truncate_review("one two three four", 100, 2) == ("one two", [TRUNCATED_TOKENS])
+    assert truncate_review("x" * 50, 10, 10) == ("x" * 10, [TRUNCATED_CHARS])
+
+
+def test_within_budget_matches_the_unbudgeted_path(budget, context):
+    review = "The battery is great but shipping was a nightmare."
+    result = budget.score(context, review)
+
+    ml_label, probabilities = context.predict_sentiment_with_probabilities(review)
+    rule_score = context.analyze_overall_sentiment(review)
+    expected = apply_hybrid_override_single(ml_label, probabilities, rule_score)
+
+    assert result.shed == ()
+    assert (result.label, result.score, result.probabilities, result.override_reason) == expected
+    assert result.ml_label == ml_label
+    assert result.aspects == context.analyze_aspects(review)
+    assert budget.report()['requests'] == 1
+    assert budget.report()['shed_requests'] == 0
+
+
+def test_slow_ml_falls_back_to_the_rules_and_is_reported(context):
+    budget = RequestBudget({'ml_seconds': 0.05})
+    try:
+        result = budget.score(SlowContext(context, delay=0.5), "absolute garbage, a total disaster")
+    finally:
+        budget.shutdown()
+
+    assert result.shed == (ML_TIMEOUT,)
+    assert result.ml_label is None
+    assert result.label == 'negative'
+    assert result.score == result.rule_score
+    assert sum(result.probabilities.values()) == pytest.approx(1.0)
+    assert result.timings['ml'] < 0.4
+
+    report = budget.report()
+    assert report['shed_requests'] == 1
+    assert report['reasons'] == {ML_TIMEOUT: 1}
+    assert report['recent'][0]['reasons'] == [ML_TIMEOUT]
+
+
+def test_saturated_pool_sheds_at_once_instead_of_queueing(context):
+    budget = RequestBudget({'ml_seconds': 0.05, 'ml_workers': 1})
+    slow = SlowContext(context, delay=0.5)
+    try:
+        assert budget.score(slow, "battery died after a week").shed == (ML_TIMEOUT,)
+        # The timed-out prediction still holds the only worker
+        start = time.perf_counter()
+        busy = budget.score(slow, "great value")
+        assert time.perf_counter() - start < 0.3
+        assert busy.shed == (ML_BUSY,) and busy.ml_label is None
+
+        time.sleep(0.6)
+        assert budget.score(context, "great value").shed == ()
+    finally:
+        budget.shutdown()
+    assert budget.report()['reasons'] == {ML_TIMEOUT: 1, ML_BUSY: 1}
+
+
+def test_aspects_are_skipped_once_the_request_is_over_budget(context):
+    budget = RequestBudget({'total_seconds': 0.0})
+    try:
+        result = budget.score(context, "great battery")
+    finally:
+        budget.shutdown()
+    assert ASPECTS_SKIPPED in result.shed
+    assert set(result.aspects.values()) == {0.5}
+
+
+def test_huge_reviews_are_truncated_and_stay_fast(budget, context):
+    review = "the battery died after a week and support never answered. " * 100_000
+    start = time.perf_counter()
+    result = budget.score(context, review, record=False)
+    assert time.perf_counter() - start < 2.0
+
+    assert TRUNCATED_CHARS in result.shed
+    assert len(result.text) <= budget.settings['max_chars']
+    assert budget.report()['requests'] == 0
+
+    # The batch path applies the same limits
+    scored = score_reviews([review, result.text], context)
+    assert scored.iloc[0].equals(scored.iloc[1])
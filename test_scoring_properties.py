@@ -0,0 +1,88 @@
+"""
+Property tests over randomly generated reviews.
+
+The reviews are built from the CSV vocabulary and the lexicon words with a
+seeded RNG, so every run checks the same cases.
+"""
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.batch_scoring import score_reviews, aspect_columns
+from utils.lexicon import SENTIMENT_GROUPS
+
+SEED = 47
+N_REVIEWS = 300
+
+
+@pytest.fixture(scope="module")
+def reviews(df, context):
+    """Random multi-sentence reviews mixing CSV words and sentiment words"""
+    rng = np.random.default_rng(SEED)
+    vocabulary = sorted({word for text in df['review_text'] for word in text.lower().split()})
+    sentiment_words = sorted({
+        word for group in SENTIMENT_GROUPS for word in context.analyzer.lexicon.sentiment_words[group]
+    })
+    words = np.array(vocabulary + sentiment_words)
+    punctuation = np.array(['.', '!', '?', ',', ''])
+
+    reviews = []
+    for _ in range(N_REVIEWS):
+        sentences = []
+        for _ in range(rng.integers(1, 4)):
+            sentence = ' '.join(rng.choice(words, rng.integers(1, 12)))
+            sentences.append(sentence + rng.choice(punctuation))
+        reviews.append(' '.join(sentences))
+    return reviews
+
+
+def test_scores_stay_in_bounds(context, reviews):
+    scored = score_reviews(reviews, context)
+    columns = ['rule_score', 'sentiment_score'] + aspect_columns(scored)
+    values = scored[columns].to_numpy()
+    assert ((values >= 0.0) & (values <= 1.0)).all()
+
+    probabilities = scored[[f'prob_{label}' for label in context.label_encoder.classes_]].to_numpy()
+    assert ((probabilities >= 0.0) & (probabilities <= 1.0)).all()
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+
+
+def test_batch_equals_single_predictions(context, reviews):
+    labels, probabilities, classes = context.predict_sentiment_batch(reviews, chunk_size=37)
+    for i, review in enumerate(reviews):
+        label, single = context.predict_sentiment_with_probabilities(review)
+        assert label == labels[i]
+        np.testing.assert_allclose([single[c] for c in classes], probabilities[i], atol=1e-9)
+
+
+def test_case_does_not_change_any_score(context, reviews):
+    for case in (str.upper, str.title):
+        changed = [case(review) for review in reviews]
+        original = score_reviews(reviews, context)
+        recased = score_reviews(changed, context)
+        np.testing.assert_allclose(recased.select_dtypes('number'), original.select_dtypes('number'), atol=1e-9)
+        assert (recased['predicted_sentiment'] == original['predicted_sentiment']).all()
+
+
+def test_negation_flips_rule_scores(context):
+    lexicon = context.analyzer.lexicon
+    template, negated_template = "the item was {}", "the item was not {}"
+    assert context.analyze_overall_sentiment(template.format('')) == 0.55
+
+    checked = 0
+    for group in ('strong_positive', 'positive', 'neutral', 'critical', 'negative'):
+        for word in lexicon.sentiment_words[group]:
+            sentence = template.format(word)
+            # Words that already negate or qualify the sentence ("not good", "but") break the symmetry
+            if lexicon.matches('negation_words', sentence) or lexicon.matches('qualifiers', sentence):
+                continue
+            score = context.analyze_overall_sentiment(sentence)
+            negated = context.analyze_overall_sentiment(negated_template.format(word))
+            assert negated == pytest.approx(1.0 - score), word
+            checked += 1
+    assert checked > 50
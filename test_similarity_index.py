@@ -0,0 +1,85 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from utils.similarity_index import LSH_BITS, LSH_TABLES, SimilarityIndex, similar_reviews
+
+
+@pytest.fixture(scope="module")
+def corpus(df):
+    return df
+
+
+def brute_force_scores(index, text):
+    query = index.vectorizer.transform([text])
+    query = query / max(np.sqrt(query.multiply(query).sum()), 1e-12)
+    return np.asarray((query @ index.matrix.T).todense()).ravel()
+
+
+def test_blocked_exact_search_matches_brute_force(context, corpus):
+    index = SimilarityIndex(context.vectorizer, corpus['review_text'], block_size=37)
+    queries = ["late delivery and bad packaging", "the battery died quickly", "great value"]
+
+    entries, scores = index.query(queries, k=5)
+
+    assert len(index) == corpus['review_text'].nunique()
+    for query, row_entries, row_scores in zip(queries, entries, scores):
+        expected = np.sort(brute_force_scores(index, query))[::-1][:5]
+        np.testing.assert_allclose(row_scores, expected, atol=1e-12)
+        assert list(row_scores) == sorted(row_scores, reverse=True)
+
+
+def test_approximate_search_finds_close_neighbours(context, corpus):
+    exact = SimilarityIndex(context.vectorizer, corpus['review_text'])
+    approximate = SimilarityIndex(context.vectorizer, corpus['review_text'], approximate=True)
+    queries = ["fast delivery and great packaging!", "very disappointed with the quality",
+               "product stopped working after a few days"]
+
+    exact_entries, exact_scores = exact.query(queries, k=1)
+    approximate_entries, _ = approximate.query(queries, k=1)
+
+    assert (exact_scores[:, 0] > 0.8).all()
+    assert list(approximate_entries[:, 0]) == list(exact_entries[:, 0])
+
+
+def test_approximate_index_memory_on_a_full_vocabulary(corpus):
+    # A production-sized vocabulary: the corpus terms plus 60k more
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2)).fit(
+        corpus['review_text'].tolist() + [f"term{i} term{i + 1}" for i in range(0, 60000, 2)]
+    )
+    n_features = len(vectorizer.vocabulary_)
+    assert n_features > 50000
+
+    index = SimilarityIndex(vectorizer, corpus['review_text'], approximate=True)
+    exact = SimilarityIndex(vectorizer, corpus['review_text'])
+
+    # Sparse hyperplanes: ~sqrt(n_features) non-zeros per bit instead of n_features
+    dense_bytes = n_features * LSH_TABLES * LSH_BITS * 4
+    assert index.projection_bytes < 2 * 1024 * 1024
+    assert index.projection_bytes < dense_bytes / 50
+
+    queries = ["fast delivery and great packaging!", "very disappointed with the quality"]
+    approximate_entries, _ = index.query(queries, k=1)
+    exact_entries, _ = exact.query(queries, k=1)
+    assert list(approximate_entries[:, 0]) == list(exact_entries[:, 0])
+
+
+def test_similar_reviews_reports_sentiment_and_resolution(context, corpus):
+    index = SimilarityIndex(context.vectorizer, corpus['review_text'])
+    text = "late delivery and poor packaging."
+
+    neighbours = similar_reviews(index, corpus, text, k=3)
+
+    assert len(neighbours) == 3
+    assert text not in neighbours['review_text'].tolist()
+    top = neighbours.iloc[0]
+    rows = corpus[corpus['review_text'] == top['review_text']]
+    assert top['reviews'] == len(rows)
+    assert top['resolved_share'] == pytest.approx((rows['issue_resolved'] == 'yes').mean())
@@ -0,0 +1,62 @@
+import sys
+import os
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.batch_scoring import summarize_scores
+from utils.corpus import score_corpus
+from utils.snapshot import build_snapshot, write_snapshot, load_snapshot, snapshot_figures, file_sha256, snapshot_signature
+
+
+@pytest.fixture(scope="module")
+def scored(df, context):
+    return score_corpus(df.head(300), context)
+
+
+def test_snapshot_round_trip_matches_live_aggregates(scored, tmp_path):
+    data_path = tmp_path / "reviews.csv"
+    scored[['review_text', 'product_category']].to_csv(data_path, index=False)
+    snapshot = build_snapshot(scored, file_sha256(str(data_path)), model_version='v1', accuracy=0.98)
+    path = write_snapshot(snapshot, str(tmp_path / "snapshot.json"))
+
+    loaded = load_snapshot(path, str(data_path))
+    assert loaded['summary'] == summarize_scores(scored)
+    assert sum(category['count'] for category in loaded['categories'].values()) == len(scored)
+
+    figures = snapshot_figures(loaded)
+    shares = loaded['summary']['sentiment_share']
+    assert list(figures['sentiment_distribution'].data[0].values) == pytest.approx(
+        [shares['positive'], shares['neutral'], shares['negative']], abs=1e-3
+    )
+    assert list(figures['aspect_analysis'].data[0].y) == list(loaded['summary']['aspect_means'])
+
+
+def test_stale_or_missing_snapshots_are_ignored(scored, tmp_path):
+    data_path = tmp_path / "reviews.csv"
+    data_path.write_text("review_text\ngreat\n")
+    path = write_snapshot(build_snapshot(scored, file_sha256(str(data_path))), str(tmp_path / "snapshot.json"))
+    assert load_snapshot(path, str(data_path)) is not None
+
+    data_path.write_text("review_text\nterrible\n")
+    assert load_snapshot(path, str(data_path)) is None
+    assert load_snapshot(path, data_path=None) is not None
+    assert load_snapshot(str(tmp_path / "missing.json")) is None
+
+
+def test_signature_changes_when_the_snapshot_or_csv_changes(scored, tmp_path):
+    data_path = tmp_path / "reviews.csv"
+    data_path.write_text("review_text\ngreat\n")
+    path = str(tmp_path / "snapshot.json")
+
+    missing = snapshot_signature(path, str(data_path))
+    assert missing[0] is None
+
+    write_snapshot(build_snapshot(scored, file_sha256(str(data_path))), path)
+    written = snapshot_signature(path, str(data_path))
+    assert written != missing
+
+    data_path.write_text("review_text\nterrible, really\n")
+    assert snapshot_signature(path, str(data_path)) != written
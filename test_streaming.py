@@ -0,0 +1,74 @@
+import sys
+import os
+import io
+import json
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+import sentiment
+from utils.batch_scoring import score_reviews
+from utils.model_registry import publish_version
+from utils.streaming import read_jsonl, score_stream, write_jsonl
+
+
+def test_stream_output_matches_batch_scoring(context):
+    df = sentiment.load_data().head(50)
+    lines = [json.dumps(record) for record in df[['customer_id', 'review_text', 'product_category']].to_dict('records')]
+
+    out = io.StringIO()
+    count = write_jsonl(score_stream(read_jsonl(lines), context, batch_size=16), out)
+
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    expected = score_reviews(df['review_text'], context, df['product_category'])
+    assert count == len(results) == len(df)
+    for result, (_, row) in zip(results, expected.iterrows()):
+        assert result['predicted_sentiment'] == row['predicted_sentiment']
+        assert result['sentiment_score'] == pytest.approx(row['sentiment_score'])
+        assert result['override'] == (row['predicted_sentiment'] != row['ml_sentiment'])
+        assert set(result['probabilities']) == {'negative', 'neutral', 'positive'}
+    assert results[0]['customer_id'] == int(df['customer_id'].iloc[0])
+
+
+def test_stream_pulls_input_one_batch_at_a_time(context):
+    consumed = []
+
+    def source():
+        for i in range(10000):
+            consumed.append(i)
+            yield {'review_text': f"review number {i} was great"}
+
+    stream = score_stream(source(), context, batch_size=8)
+    first = next(stream)
+
+    assert first['review_text'] == "review number 0 was great"
+    assert len(consumed) == 8
+
+
+def test_read_jsonl_accepts_strings_and_reports_bad_lines():
+    records = list(read_jsonl(['"plain text"', '', '{"review_text": "ok"}']))
+    assert records == [{'review_text': 'plain text'}, {'review_text': 'ok'}]
+
+    with pytest.raises(ValueError, match="Line 2"):
+        list(read_jsonl(['{"review_text": "ok"}', '{not json']))
+    assert len(list(read_jsonl(['[1, 2]', '{"review_text": "ok"}'], skip_invalid=True))) == 1
+
+
+def test_stream_command_loads_a_saved_model_instead_of_training(context, persisted_model, tmp_path, monkeypatch):
+    def no_training(df):
+        raise AssertionError("the stream command trained a model")
+
+    monkeypatch.setattr(sentiment, 'fit_artifacts', no_training)
+    texts = ["absolute garbage", "fast delivery, love it"]
+    expected = list(context.predict_sentiment_batch(texts)[0])
+
+    from_file = sentiment._stream_context('missing.csv', str(tmp_path / "empty"), persisted_model.path)
+    assert list(from_file.predict_sentiment_batch(texts)[0]) == expected
+
+    registry_dir = str(tmp_path / "registry")
+    publish_version(context, registry_dir, version='20240101-000000')
+    from_registry = sentiment._stream_context('missing.csv', registry_dir)
+    assert from_registry.accuracy == context.accuracy
+    assert list(from_registry.predict_sentiment_batch(texts)[0]) == expected
@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.aspect_analyzer import AspectAnalyzer
+from utils.text_normalizer import normalize_text, clear_normalizer_cache, _normalize_cached
+from config import TEXT_NORMALIZER_CACHE_MAX_CHARS
+
+# Cold-cache normalization may cost at most this much over the raw TF-IDF transform
+THROUGHPUT_BUDGET = 2.0
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("It doesn’t work", "it does not work"),
+    ("I won't buy, can't recommend", "i will not buy, can not recommend"),
+    ("it's fine but the battery's weak", "it is fine but the battery's weak"),
+    ("Soooo GOOOD", "soo good"),
+    ("Paid 1000 for this!!!", "paid 1000 for this!!!"),
+    ("Ｇｒｅａｔ ﬁt", "great fit"),
+    ("Love it 😍❤️", "love it  emoji_positive  emoji_positive "),
+    ("👎", " emoji_negative "),
+    ("", ""),
+])
+def test_normalize_text(raw, expected):
+    assert normalize_text(raw) == expected
+
+
+def test_only_short_reviews_are_memoized():
+    clear_normalizer_cache()
+    short = "Sooo GOOD"
+    long = "Great value " * (TEXT_NORMALIZER_CACHE_MAX_CHARS // 12 + 1)
+
+    assert normalize_text(short) == normalize_text(short) == "soo good"
+    assert normalize_text(long) == long.lower()
+    assert _normalize_cached.cache_info().currsize == 1
+
+
+def test_rules_see_normalized_negations_and_emoji():
+    analyzer = AspectAnalyzer()
+
+    curly = analyzer.analyze_overall_sentiment("The charger doesn’t work well.")
+    assert curly == analyzer.analyze_overall_sentiment("The charger does not work well.")
+    assert curly < analyzer.analyze_overall_sentiment("The charger works well.")
+
+    assert analyzer.analyze_overall_sentiment("Arrived today 👎") < 0.4
+    assert analyzer.analyze_overall_sentiment("Arrived today 😍") > 0.6
+
+
+def test_model_vectorizer_applies_the_normalizer(context):
+    vectorizer = context.vectorizer
+    assert vectorizer.preprocessor is normalize_text
+
+    def same(a, b):
+        return (vectorizer.transform([a]) != vectorizer.transform([b])).nnz == 0
+
+    assert same("It DOESN’T work", "it does not work")
+    assert same("ｇｏｏｄ product", "good product")
+    assert same("Sooooo goooood", "soo good")
+
+
+def test_throughput_stays_within_budget_of_the_raw_path(df):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    # Unique texts, so the memoization cannot help
+    texts = [f"{text} #{i}" for i, text in enumerate(df['review_text'].tolist() * 10)]
+    raw = TfidfVectorizer().fit(df['review_text'])
+    normalized = TfidfVectorizer(preprocessor=normalize_text).fit(df['review_text'])
+
+    def best_of(vectorizer, runs=3):
+        timings = []
+        for _ in range(runs):
+            clear_normalizer_cache()
+            start = time.perf_counter()
+            vectorizer.transform(texts)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    assert best_of(normalized) <= THROUGHPUT_BUDGET * best_of(raw)
@@ -0,0 +1,108 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the current directory to sys.path
+sys.path.append(os.getcwd())
+
+from utils.trends import TrendStore, polarity
+from utils.visualizations import create_sentiment_trend_chart, create_aspect_trend_chart
+
+NOW = 1_700_000_000
+WINDOWS = {'minute': (60, 60), 'hour': (3600, 24)}
+
+
+def random_traffic(n=5000, span=2 * 86400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'timestamp': NOW - rng.uniform(0, span, n),
+        'label': rng.choice(['positive', 'neutral', 'negative'], n),
+        'score': rng.uniform(0, 1, n),
+        'shipping': np.where(rng.random(n) < 0.3, rng.uniform(0, 1, n), np.nan),
+    })
+
+
+def test_series_matches_a_raw_rescan(tmp_path):
+    traffic = random_traffic()
+    store = TrendStore(WINDOWS, str(tmp_path / "trends.npz"))
+    aspects = [{} if np.isnan(value) else {'Shipping': value} for value in traffic['shipping']]
+    for start in range(0, len(traffic), 700):
+        chunk = traffic.iloc[start:start + 700]
+        store.record_batch(chunk['label'], chunk['score'], aspects[start:start + 700], chunk['timestamp'])
+
+    series = store.series('hour', now=NOW)
+    assert len(series) == 24
+
+    # Only the last 24 hour buckets are kept; compare with a groupby over the raw rows
+    bucket = (traffic['timestamp'] // 3600).astype(int)
+    recent = traffic[bucket > NOW // 3600 - 24]
+    expected = recent.groupby(pd.to_datetime((recent['timestamp'] // 3600).astype(int) * 3600, unit='s'))
+    pd.testing.assert_series_equal(
+        series['reviews'][series['reviews'] > 0], expected.size(), check_names=False, check_index_type=False,
+        check_dtype=False, check_freq=False,
+    )
+    np.testing.assert_allclose(series['mean_polarity'].dropna(), expected['score'].mean())
+    np.testing.assert_allclose(series['aspect_Shipping'].dropna(), expected['shipping'].mean().dropna())
+    assert (series[['positive', 'neutral', 'negative']].sum(axis=1) == series['reviews']).all()
+
+
+def test_ring_slots_are_reused_and_stale_rows_dropped():
+    store = TrendStore(WINDOWS)
+    store.record('positive', 1.0, timestamp=NOW - 3600)
+    # Same minute slot one hour later (capacity 60): the old bucket is replaced
+    store.record('negative', 0.0, timestamp=NOW)
+    # A late row for the overwritten bucket can no longer be counted
+    store.record('positive', 1.0, timestamp=NOW - 3600)
+
+    minutes = store.series('minute', now=NOW)
+    assert minutes['reviews'].sum() == 1
+    assert minutes['negative'].iloc[-1] == 1
+    assert store.series('hour', now=NOW)['reviews'].sum() == 3
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "trends.npz")
+    store = TrendStore(WINDOWS, path)
+    store.record('neutral', 0.5, {'Battery Life': 0.8}, timestamp=NOW)
+    store.save()
+    store.record('positive', 0.9, {'Design': 0.7}, timestamp=NOW)
+
+    loaded = TrendStore.load(path, WINDOWS)
+    assert loaded.series('hour', now=NOW)['reviews'].sum() == 1
+    loaded.record('positive', 0.9, {'Design': 0.7}, timestamp=NOW)
+    pd.testing.assert_frame_equal(
+        loaded.series('hour', now=NOW).sort_index(axis=1), store.series('hour', now=NOW).sort_index(axis=1)
+    )
+
+    # A changed window configuration starts that window empty
+    resized = TrendStore.load(path, {'minute': (60, 30), 'hour': (3600, 24)})
+    assert resized.series('minute', now=NOW)['reviews'].sum() == 0
+    assert resized.series('hour', now=NOW)['reviews'].sum() == 1
+
+
+def test_trend_charts_build_from_series():
+    store = TrendStore(WINDOWS)
+    store.record('positive', 0.9, {'Shipping': 0.8}, timestamp=NOW)
+    series = store.series('hour', now=NOW)
+
+    assert len(create_sentiment_trend_chart(series).data) == 2
+    assert [trace.name for trace in create_aspect_trend_chart(series).data] == ['Shipping']
+
+
+def test_polarity_separates_confident_negatives_from_positives(tmp_path):
+    assert polarity({'positive': 0.05, 'neutral': 0.05, 'negative': 0.9}) == pytest.approx(0.075)
+    assert polarity({'positive': 0.9, 'neutral': 0.05, 'negative': 0.05}) == pytest.approx(0.925)
+    assert polarity({'positive': 0.1, 'neutral': 0.8, 'negative': 0.1}) == 0.5
+
+    # A file saved in the old layout (score sums) is not mixed into the new polarity
+    path = str(tmp_path / "old.npz")
+    np.savez(path, **{
+        'labels': np.array(['negative']), 'aspects': np.array([], dtype=str),
+        'hour.shape': np.array([3600, 24]), 'hour.bucket_ids': np.full(24, NOW // 3600),
+        'hour.counts': np.ones((24, 1), dtype=np.int64), 'hour.score_sums': np.full(24, 0.9),
+        'hour.aspect_sums': np.zeros((24, 0)), 'hour.aspect_counts': np.zeros((24, 0), dtype=np.int64),
+    })
+    assert TrendStore.load(path, {'hour': (3600, 24)}).series('hour', now=NOW)['reviews'].sum() == 0
@@ -1,61 +1,84 @@
 import re
 from collections import defaultdict
 
+from config import LEXICON_DIR, TEXT_NORMALIZATION, RULE_SCORER
+from utils.clause_scorer import clause_scorer_for
+from utils.lexicon import load_lexicon
+from utils.text_normalizer import normalize_text
+
+# Same normalization as the TF-IDF model (contractions, emoji, elongation); lowercases
+_normalize = normalize_text if TEXT_NORMALIZATION else str.lower
+
 class AspectAnalyzer:
     """Extract and analyze product aspects from reviews with proper sentiment scoring"""
     
-    def __init__(self):
+    SCORERS = ('lexicon', 'clause')
+
+    def __init__(self, category=None, lexicon_dir=LEXICON_DIR, debug=False, scorer=RULE_SCORER):
+        # Aspect keywords and sentiment words come from a lexicon pack
+        # (lexicons/<category>.json). Packs are compiled once per process and
+        # cached, so constructing an analyzer per session is cheap.
+        if scorer not in self.SCORERS:
+            raise ValueError(f"Unknown rule scorer {scorer!r}; expected one of {', '.join(self.SCORERS)}.")
+        self.lexicon_dir = lexicon_dir
+        self.debug = debug
+        # 'lexicon': the sentence-level rules below; 'clause': utils.clause_scorer
+        self.scorer = scorer
+        self.lexicon = load_lexicon(category, lexicon_dir)
+        
         # Define aspect keywords
         self.aspect_keywords = {
-            'Battery Life': ['battery', 'charge', 'charging', 'power', 'lasting'],
-            'Performance': ['fast', 'slow', 'speed', 'performance', 'lag', 'smooth', 'responsive'],
-            'Shipping': ['shipping', 'delivery', 'arrived', 'package', 'delayed'],
-            'Build Quality': ['quality', 'build', 'sturdy', 'durable', 'broken', 'solid', 'plasticky', 'flimsy'],
-            'Value for Money': ['price', 'worth', 'value', 'expensive', 'cheap', 'affordable', 'paid'],
-            'Customer Service': ['service', 'support', 'help', 'response', 'customer', 'helpful', 'unhelpful'],
-            'Design': ['design', 'look', 'aesthetic', 'style', 'beautiful', 'ugly'],
-            'Ease of Use': ['easy', 'simple', 'intuitive', 'complicated', 'user-friendly']
+            aspect: list(keywords) for aspect, keywords in self.lexicon.aspect_keywords.items()
         }
         
         # Sentiment words with intensity levels
-        self.strong_positive = ['great', 'excellent', 'amazing', 'incredible', 'fantastic', 
-                                'love', 'perfect', 'outstanding', 'best', 'superb']
-        
-        self.positive = ['good', 'nice', 'solid', 'reliable', 'pleased', 
-                        'satisfied', 'works', 'clear', 'bright', 'recommend']
-        
-        self.neutral = ['okay', 'fine', 'decent', 'average', 'acceptable', 'standard']
-        
-        self.critical = ['unhelpful', 'questionable', 'mediocre', 'subpar', 'struggles', 
-                        'issues', 'weak', 'below average', 'poor']
-        
-        self.negative = ['terrible', 'awful', 'horrible', 'worst', 'pathetic', 'useless', 
-                        'nightmare', 'garbage', 'disappointed', 'broken', 'failed', 'cheap', 'junk',
-                        'disaster', 'joke', 'zero']
+        words = self.lexicon.sentiment_words
+        self.strong_positive = list(words['strong_positive'])
+        self.positive = list(words['positive'])
+        self.neutral = list(words['neutral'])
+        self.critical = list(words['critical'])
+        self.negative = list(words['negative'])
         
         # Negation words (TRUE negations only - words that flip meaning)
-        self.negation_words = ['not', 'no', 'never', 'neither', 'nor', 'none', "n't"]
+        self.negation_words = list(words['negation_words'])
         
         # Qualifying/contrasting words
-        self.qualifiers = ['but', 'though', 'however', 'although', 'yet', 'still', 'just']
+        self.qualifiers = list(words['qualifiers'])
+    
+    def lexicon_for(self, category):
+        """Lexicon for a review's product category (the analyzer's own pack if None)"""
+        if category is None:
+            return self.lexicon
+        return load_lexicon(category, self.lexicon_dir)
     
-    def analyze_aspects(self, review_text):
+    def analyze_aspects(self, review_text, category=None):
         """
         Analyze review for specific product aspects
         
+        Args:
+            review_text: review to analyze
+            category: optional product category selecting the lexicon pack
+        
         Returns:
             dict: Aspect names with sentiment scores (0-1)
         """
-        review_lower = review_text.lower()
+        lexicon = self.lexicon_for(category)
+        review_lower = _normalize(review_text)
+        if self.scorer == 'clause':
+            return dict(clause_scorer_for(lexicon).score(review_lower).aspects)
         aspect_scores = {}
+        # Split into sentences once, shared by every mentioned aspect
+        sentences = None
         
-        for aspect, keywords in self.aspect_keywords.items():
+        for aspect in lexicon.aspect_keywords:
             # Check if aspect is mentioned
-            aspect_mentioned = any(keyword in review_lower for keyword in keywords)
+            aspect_mentioned = lexicon.mentions(aspect, review_lower)
             
             if aspect_mentioned:
                 # Calculate sentiment for this aspect
-                score = self._calculate_aspect_sentiment(review_lower, keywords, review_text)
+                if sentences is None:
+                    sentences = re.split(r'[.!?]+', review_lower)
+                score = self._calculate_aspect_sentiment(sentences, aspect, lexicon)
                 aspect_scores[aspect] = score
             else:
                 # Default neutral score if not mentioned
@@ -63,13 +86,12 @@ class AspectAnalyzer:
         
         return aspect_scores
     
-    def _calculate_aspect_sentiment(self, review_text, aspect_keywords, original_text):
+    def _calculate_aspect_sentiment(self, sentences, aspect, lexicon):
         """Calculate sentiment score for specific aspect (0.0 = negative, 1.0 = positive)"""
         # Find sentences containing aspect keywords
-        sentences = re.split(r'[.!?]+', review_text)
         relevant_sentences = [
             s.strip() for s in sentences 
-            if any(keyword in s for keyword in aspect_keywords) and s.strip()
+            if lexicon.mentions(aspect, s) and s.strip()
         ]
         
         if not relevant_sentences:
@@ -84,34 +106,34 @@ class AspectAnalyzer:
             sentiment_found = False
             
             # Check for negative words (Strongest signal first)
-            if any(word in sentence for word in self.negative):
+            if lexicon.matches('negative', sentence):
                 sentence_score = 0.1
                 sentiment_found = True
             # Check for critical/qualifying words
-            elif any(word in sentence for word in self.critical):
+            elif lexicon.matches('critical', sentence):
                 sentence_score = 0.2  # Mid-low score
                 sentiment_found = True
             # Check for neutral words
-            elif any(word in sentence for word in self.neutral):
+            elif lexicon.matches('neutral', sentence):
                 sentence_score = 0.55
                 sentiment_found = True
             # Check for strong positive words
-            elif any(word in sentence for word in self.strong_positive):
+            elif lexicon.matches('strong_positive', sentence):
                 sentence_score = 0.9
                 sentiment_found = True
             # Check for positive words
-            elif any(word in sentence for word in self.positive):
+            elif lexicon.matches('positive', sentence):
                 sentence_score = 0.75
                 sentiment_found = True
             
             # Handle negation - flip the score
-            has_negation = any(neg in sentence for neg in self.negation_words)
+            has_negation = lexicon.matches('negation_words', sentence)
             if has_negation and sentiment_found:
                 # Flip around 0.5
                 sentence_score = 1.0 - sentence_score
             
             # Handle qualifiers - reduce score slightly
-            has_qualifier = any(qual in sentence for qual in self.qualifiers)
+            has_qualifier = lexicon.matches('qualifiers', sentence)
             if has_qualifier and sentence_score > 0.5:
                 sentence_score -= 0.15  # Reduce positive scores
             elif has_qualifier and sentence_score < 0.5:
@@ -123,32 +145,38 @@ class AspectAnalyzer:
         # Average the scores
         final_score = total_score / sentence_count if sentence_count > 0 else 0.5
         
-        # DEBUG
-        aspect_name = aspect_keywords[0] if aspect_keywords else "unknown"
-        print(f"DEBUG [{aspect_name}]: final_score={final_score:.2f}, sentences={len(relevant_sentences)}")
-        for i, sent in enumerate(relevant_sentences[:2]):
-            print(f"  Sentence {i+1}: {sent[:80]}")
+        # DEBUG (off by default - it floods stdout when scoring batches)
+        if self.debug:
+            aspect_keywords = lexicon.aspect_keywords.get(aspect, ())
+            aspect_name = aspect_keywords[0] if aspect_keywords else "unknown"
+            print(f"DEBUG [{aspect_name}]: final_score={final_score:.2f}, sentences={len(relevant_sentences)}")
+            for i, sent in enumerate(relevant_sentences[:2]):
+                print(f"  Sentence {i+1}: {sent[:80]}")
         
         # Clamp between 0 and 1
         return max(0.0, min(1.0, final_score))
     
-    def extract_key_phrases(self, review_text, aspect):
+    def extract_key_phrases(self, review_text, aspect, category=None):
         """Extract key phrases related to specific aspect"""
-        keywords = self.aspect_keywords.get(aspect, [])
+        lexicon = self.lexicon_for(category)
         
         sentences = re.split(r'[.!?]+', review_text)
         relevant_phrases = [
             s.strip() for s in sentences 
-            if any(keyword in s.lower() for keyword in keywords) and s.strip()
+            if lexicon.mentions(aspect, _normalize(s)) and s.strip()
         ]
         
         return relevant_phrases[:3]  # Return top 3 relevant phrases
 
-    def analyze_overall_sentiment(self, review_text):
+    def analyze_overall_sentiment(self, review_text, category=None):
         """
         Calculate overall sentiment score based on rules (0.0 = negative, 1.0 = positive).
         Useful for validating/overriding ML model predictions.
         """
+        lexicon = self.lexicon_for(category)
+        if self.scorer == 'clause':
+            return clause_scorer_for(lexicon).score(_normalize(review_text)).overall
+        
         # Treat the whole text as one "aspect" context
         # We pass a dummy keyword list that matches everything to reuse the logic, 
         # or better, just reuse the internal logic.
@@ -158,7 +186,7 @@ class AspectAnalyzer:
         # So we should duplicate the core logic or refactor. 
         # For safety and minimal refactoring risk, I'll adapt the core logic here for the whole text.
         
-        sentences = re.split(r'[.!?]+', review_text)
+        sentences = re.split(r'[.!?]+', _normalize(review_text))
         # Filter empty
         relevant_sentences = [s.strip() for s in sentences if s.strip()]
         
@@ -169,39 +197,38 @@ class AspectAnalyzer:
         sentence_count = 0
         
         for sentence in relevant_sentences:
-            sentence = sentence.lower()
             words = sentence.split()
             sentence_score = 0.55  # Start neutral (updated baseline)
             sentiment_found = False
             
             # Check for negative words (Strongest signal first)
-            if any(word in sentence for word in self.negative):
+            if lexicon.matches('negative', sentence):
                 sentence_score = 0.1
                 sentiment_found = True
             # Check for critical/qualifying words
-            elif any(word in sentence for word in self.critical):
+            elif lexicon.matches('critical', sentence):
                 sentence_score = 0.2
                 sentiment_found = True
             # Check for neutral words
-            elif any(word in sentence for word in self.neutral):
+            elif lexicon.matches('neutral', sentence):
                 sentence_score = 0.55
                 sentiment_found = True
             # Check for strong positive words
-            elif any(word in sentence for word in self.strong_positive):
+            elif lexicon.matches('strong_positive', sentence):
                 sentence_score = 0.9
                 sentiment_found = True
             # Check for positive words
-            elif any(word in sentence for word in self.positive):
+            elif lexicon.matches('positive', sentence):
                 sentence_score = 0.75
                 sentiment_found = True
             
             # Handle negation
-            has_negation = any(neg in sentence for neg in self.negation_words)
+            has_negation = lexicon.matches('negation_words', sentence)
             if has_negation and sentiment_found:
                 sentence_score = 1.0 - sentence_score
             
             # Handle qualifiers
-            has_qualifier = any(qual in sentence for qual in self.qualifiers)
+            has_qualifier = lexicon.matches('qualifiers', sentence)
             if has_qualifier and sentence_score > 0.5:
                 sentence_score -= 0.15
             elif has_qualifier and sentence_score < 0.5:
@@ -0,0 +1,244 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.batch_scoring import score_reviews
+
+
+class ScoringQueueFull(Exception):
+    """Raised by AsyncScoringClient.score(wait=False) when the queue is at its limit"""
+
+
+def score_records(context, texts, categories):
+    """Default blocking scorer: the batch path, one dict per review"""
+    return score_reviews(texts, context, categories, chunk_size=max(len(texts), 1)).to_dict('records')
+
+
+class AsyncScoringClient:
+    """
+    asyncio facade over the blocking, CPU-bound scoring path.
+
+    Concurrent `score()` calls are queued and coalesced into shared batches
+    (identical reviews in a batch are scored once), and each batch runs on a
+    bounded executor so the event loop never blocks.
+
+    - Backpressure: the queue holds at most `max_queue_size` pending reviews;
+      `score()` waits for room (or raises ScoringQueueFull with wait=False),
+      and at most `max_concurrent_batches` batches are in flight.
+    - Cancellation: a cancelled awaiter is dropped before its batch is sent.
+    - Deadlines: `timeout` bounds queueing plus scoring; reviews whose
+      deadline passes while queued are never scored.
+
+    Usage:
+        async with AsyncScoringClient(context) as client:
+            result = await client.score("Fast delivery!", timeout=2.0)
+    """
+
+    def __init__(self, context=None, score_fn=None, max_batch_size=64, max_wait=0.005,
+                 max_queue_size=1024, max_concurrent_batches=2, executor=None):
+        if score_fn is None:
+            if context is None:
+                raise ValueError("Pass either an InferenceContext or a score_fn.")
+            score_fn = lambda texts, categories: score_records(context, texts, categories)
+
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue_size = max_queue_size
+        self.max_concurrent_batches = max_concurrent_batches
+
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue = None
+        self._batch_slots = None
+        self._batcher = None
+        self._closed = False
+        # Reviews taken off the queue by the batcher but not yet handed to a batch task
+        self._collecting = []
+        self._in_flight = set()
+        self.stats = {'submitted': 0, 'scored': 0, 'batches': 0, 'coalesced': 0, 'expired': 0, 'cancelled': 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.close()
+
+    async def start(self):
+        if self._batcher is not None:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent_batches, thread_name_prefix='scoring'
+            )
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._batch_slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._closed = False
+        self._batcher = asyncio.create_task(self._run_batcher())
+
+    async def close(self):
+        """Stop accepting work, fail reviews not yet sent to a batch, wait for in-flight batches and shut the executor down"""
+        if self._batcher is None:
+            return
+        # Callers still waiting for queue space fail themselves once they get in (see score())
+        self._closed = True
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+
+        # Fail anything collected or still queued rather than leaving awaiters hanging
+        pending = self._collecting
+        self._collecting = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("AsyncScoringClient was closed."))
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @property
+    def pending(self):
+        """Reviews queued but not yet sent to a batch"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def score(self, text, category=None, timeout=None, wait=True):
+        """
+        Score one review.
+
+        Args:
+            text: review text
+            category: optional product category (selects the lexicon pack)
+            timeout: seconds allowed for queueing plus scoring (None = no deadline)
+            wait: if False, raise ScoringQueueFull instead of waiting for queue space
+
+        Returns:
+            dict: the scored row (label, probabilities, rule score, aspects)
+        """
+        if self._closed:
+            raise RuntimeError("AsyncScoringClient was closed.")
+        if self._batcher is None:
+            raise RuntimeError("AsyncScoringClient is not started; use 'async with' or await start().")
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        future = loop.create_future()
+        item = (text, category, future, deadline)
+        self.stats['submitted'] += 1
+
+        async def enqueue_and_wait():
+            if wait:
+                await self._queue.put(item)
+            else:
+                try:
+                    self._queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    raise ScoringQueueFull(f"{self.max_queue_size} reviews already queued.")
+            if self._closed and not future.done():
+                # Got queue space from close() draining the queue: nothing will score it
+                future.set_exception(RuntimeError("AsyncScoringClient was closed."))
+            return await future
+
+        try:
+            if timeout is None:
+                return await enqueue_and_wait()
+            return await asyncio.wait_for(enqueue_and_wait(), timeout)
+        finally:
+            # Cancelled or timed out awaiters: make sure the batcher skips the item
+            if not future.done():
+                future.cancel()
+
+    async def score_many(self, texts, categories=None, timeout=None):
+        """Score several reviews concurrently; results keep the input order"""
+        categories = categories if categories is not None else [None] * len(texts)
+        return await asyncio.gather(*(
+            self.score(text, category, timeout=timeout) for text, category in zip(texts, categories)
+        ))
+
+    async def _collect_batch(self):
+        """
+        Wait for one item, then gather more until the batch is full or max_wait passes.
+        The batch is kept in self._collecting until it is sent, so close() can fail it.
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._collecting = []
+        batch.append(await self._queue.get())
+        flush_at = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = flush_at - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run_batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+
+            # Filter after a slot is free: items may be cancelled or expire while we wait
+            await self._batch_slots.acquire()
+            now = loop.time()
+            live = []
+            for text, category, future, deadline in batch:
+                if future.done():
+                    self.stats['cancelled'] += 1
+                elif deadline is not None and deadline <= now:
+                    self.stats['expired'] += 1
+                    future.set_exception(asyncio.TimeoutError())
+                else:
+                    live.append((text, category, future))
+            self._collecting = []
+            if not live:
+                self._batch_slots.release()
+                continue
+
+            task = asyncio.create_task(self._score_batch(live))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _score_batch(self, items):
+        loop = asyncio.get_running_loop()
+        try:
+            # Coalesce identical requests: score each distinct (text, category) once
+            waiters = {}
+            for text, category, future in items:
+                waiters.setdefault((text, category), []).append(future)
+            keys = list(waiters)
+            self.stats['coalesced'] += len(items) - len(keys)
+            self.stats['batches'] += 1
+
+            try:
+                results = await loop.run_in_executor(
+                    self._executor,
+                    self.score_fn,
+                    [text for text, _ in keys],
+                    [category for _, category in keys],
+                )
+            except Exception as e:
+                for futures in waiters.values():
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(e)
+                return
+
+            for key, result in zip(keys, results):
+                for future in waiters[key]:
+                    if not future.done():
+                        # Each awaiter gets its own copy of a shared result
+                        future.set_result(dict(result) if isinstance(result, dict) else result)
+            self.stats['scored'] += len(keys)
+        finally:
+            self._batch_slots.release()
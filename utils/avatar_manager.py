@@ -1,14 +1,39 @@
+import json
+import time
+
 import streamlit as st
-from streamlit_lottie import st_lottie
-import requests
-from config import AVATAR_URLS, GENERIC_LOTTIE
+from config import AVATAR_URLS, GENERIC_LOTTIE, AVATAR_REQUEST_TIMEOUT_SECONDS
+
+# requests and streamlit_lottie are imported on first use so that importing
+# this module (and therefore app.py) stays cheap.
+
+def load_lottie_url(url, deadline=None):
+    """
+    Load Lottie animation from URL
 
-def load_lottie_url(url):
-    """Load Lottie animation from URL"""
+    Args:
+        url: animation URL
+        deadline: time.monotonic() value by which the download must finish
+            (default: AVATAR_REQUEST_TIMEOUT_SECONDS from now)
+    """
+    import requests
+
+    deadline = time.monotonic() + AVATAR_REQUEST_TIMEOUT_SECONDS if deadline is None else deadline
+    remaining = deadline - time.monotonic()
+    if not url or remaining <= 0:
+        return None
     try:
-        r = requests.get(url)
-        if r.status_code == 200:
-            return r.json()
+        # requests' timeout only bounds each connect/read, so the body is read
+        # in chunks against the deadline: a slow asset host can't hang the results page
+        with requests.get(url, timeout=remaining, stream=True) as r:
+            if r.status_code != 200:
+                return None
+            body = bytearray()
+            for chunk in r.iter_content(chunk_size=16384):
+                if time.monotonic() > deadline:
+                    return None
+                body.extend(chunk)
+        return json.loads(body)
     except Exception as e:
         # st.error(f"Error loading avatar: {str(e)}") # Suppress error for cleaner UI
         pass
@@ -50,15 +75,19 @@ def display_3d_avatar(gender, sentiment_label, sentiment_score):
     # Try specific avatar URL
     avatar_url = AVATAR_URLS.get(gender_key, {}).get(emotion)
     lottie_avatar = None
+    # One deadline for both downloads
+    deadline = time.monotonic() + AVATAR_REQUEST_TIMEOUT_SECONDS
     
     if avatar_url:
-        lottie_avatar = load_lottie_url(avatar_url)
+        lottie_avatar = load_lottie_url(avatar_url, deadline)
     
     # Fallback to generic if specific fails
     if not lottie_avatar:
-        lottie_avatar = load_lottie_url(GENERIC_LOTTIE.get(emotion))
+        lottie_avatar = load_lottie_url(GENERIC_LOTTIE.get(emotion), deadline)
         
     if lottie_avatar:
+        from streamlit_lottie import st_lottie
+
         st_lottie(
             lottie_avatar,
             height=350,
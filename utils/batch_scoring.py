@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from utils.hybrid import apply_hybrid_override, override_counts
+from utils.request_budget import truncate_review
+
+ASPECT_PREFIX = 'aspect_'
+PROBABILITY_PREFIX = 'prob_'
+DEFAULT_CHUNK_SIZE = 256
+
+
+def _score_chunk(texts, categories, context):
+    labels, probabilities, classes = context.predict_sentiment_batch(texts, chunk_size=max(len(texts), 1))
+
+    rule_scores = np.array([
+        context.analyze_overall_sentiment(text, category=category)
+        for text, category in zip(texts, categories)
+    ], dtype=float)
+    aspects = [
+        context.analyze_aspects(text, category=category)
+        for text, category in zip(texts, categories)
+    ]
+
+    final_labels, scores, final_probabilities, reasons = apply_hybrid_override(
+        labels, probabilities, classes, rule_scores
+    )
+
+    chunk = pd.DataFrame({
+        'predicted_sentiment': final_labels,
+        'sentiment_score': scores,
+        'ml_sentiment': labels,
+        'rule_score': rule_scores,
+        'override_reason': reasons,
+    })
+    for i, label in enumerate(classes):
+        chunk[PROBABILITY_PREFIX + label] = final_probabilities[:, i]
+
+    aspect_frame = pd.DataFrame.from_records(aspects).add_prefix(ASPECT_PREFIX)
+    return pd.concat([chunk, aspect_frame], axis=1)
+
+
+def score_reviews(texts, context, categories=None, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None,
+                  dedup=None):
+    """
+    Score many reviews through the vectorized batch path.
+
+    With `dedup`, each distinct review is scored once and the result fanned
+    back out to its duplicates (see utils.dedup.plan_dedup). 'exact' gives
+    identical results to no dedup; 'near' also merges near-duplicate texts.
+    The dedup report is stored in `result.attrs['dedup']`.
+
+    Args:
+        texts: sequence of review strings (cut to the limits of config.REQUEST_BUDGET)
+        context: InferenceContext holding the trained artifacts
+        categories: optional per-review product categories (selects lexicon packs)
+        chunk_size: number of reviews scored per chunk
+        progress_callback: optional callable(done, total) invoked after every chunk
+            (counts distinct reviews when dedup is on)
+        dedup: None, 'exact' or 'near'
+
+    Returns:
+        pd.DataFrame: one row per review with the final label, sentiment score,
+        raw ML label, rule score, override reason ('' if none), per-class
+        probabilities and `aspect_*` scores
+    """
+    # Over-long reviews are cut to the request budget's limits, like single reviews
+    texts = [truncate_review('' if pd.isna(text) else str(text))[0] for text in texts]
+    total = len(texts)
+    if categories is None:
+        categories = [None] * total
+    else:
+        categories = [None if pd.isna(category) else category for category in categories]
+
+    if dedup:
+        return _score_deduplicated(texts, categories, context, chunk_size, progress_callback, dedup)
+
+    frames = []
+    for start in range(0, total, chunk_size):
+        end = min(start + chunk_size, total)
+        frames.append(_score_chunk(texts[start:end], categories[start:end], context))
+        if progress_callback is not None:
+            progress_callback(end, total)
+
+    if not frames:
+        return pd.DataFrame(columns=['predicted_sentiment', 'sentiment_score', 'ml_sentiment', 'rule_score',
+                                     'override_reason'])
+
+    # Aspect columns can differ between chunks when categories use different packs
+    return pd.concat(frames, ignore_index=True)
+
+
+def _score_deduplicated(texts, categories, context, chunk_size, progress_callback, dedup):
+    from utils.dedup import plan_dedup
+
+    if dedup not in ('exact', 'near'):
+        raise ValueError(f"dedup must be None, 'exact' or 'near', got {dedup!r}")
+
+    # The lexicon pack changes rule and aspect scores, so it is part of the key
+    keys = [context.analyzer.lexicon_for(category).source_hash for category in categories]
+    representatives, assignment, report = plan_dedup(texts, keys, near_duplicates=(dedup == 'near'))
+
+    unique = score_reviews(
+        [texts[i] for i in representatives],
+        context,
+        [categories[i] for i in representatives],
+        chunk_size,
+        progress_callback,
+    )
+    scored = unique.iloc[assignment].reset_index(drop=True)
+    scored.attrs['dedup'] = report
+    return scored
+
+
+def aspect_columns(scored):
+    """Names of the `aspect_*` columns in a scored frame"""
+    return [column for column in scored.columns if column.startswith(ASPECT_PREFIX)]
+
+
+def score_dataframe(df, context, text_column='review_text', category_column=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None, dedup=None):
+    """
+    Score the reviews in `df[text_column]` and return `df` with the score columns appended.
+
+    Existing columns that clash with score column names are replaced.
+    """
+    categories = df[category_column] if category_column else None
+    scored = score_reviews(df[text_column], context, categories, chunk_size, progress_callback, dedup)
+    scored.index = df.index
+    result = pd.concat([df.drop(columns=[c for c in scored.columns if c in df.columns]), scored], axis=1)
+    result.attrs = dict(scored.attrs)
+    return result
+
+
+def summarize_scores(scored):
+    """
+    Aggregate a scored frame for charts.
+
+    Returns:
+        dict: 'count', 'sentiment_share' (label -> fraction of rows),
+        'override_count', 'override_reasons' (reason -> count) and
+        'aspect_means' (aspect -> mean score where scored)
+    """
+    count = len(scored)
+    shares = scored['predicted_sentiment'].value_counts(normalize=True) if count else pd.Series(dtype=float)
+    aspect_means = scored[aspect_columns(scored)].mean(skipna=True) if count else pd.Series(dtype=float)
+
+    return {
+        'count': count,
+        'sentiment_share': {label: float(shares.get(label, 0.0)) for label in ('positive', 'neutral', 'negative')},
+        'override_count': int((scored['predicted_sentiment'] != scored['ml_sentiment']).sum()) if count else 0,
+        'override_reasons': override_counts(scored['override_reason'] if count else []),
+        'aspect_means': {
+            column[len(ASPECT_PREFIX):]: float(value)
+            for column, value in aspect_means.items() if pd.notna(value)
+        },
+    }
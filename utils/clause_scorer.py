@@ -0,0 +1,251 @@
+"""
+Clause-aware rule scoring in one left-to-right pass over the tokens.
+
+The lexicon scorer in AspectAnalyzer looks at whole sentences: any negation
+anywhere flips the sentence, any qualifier damps it, and the first sentiment
+group hit in a fixed priority order wins. This scorer instead walks the
+tokens once and keeps a little state:
+
+- a negation ("not", "never", "no") flips only the sentiment words in the
+  next `negation_window` tokens, and its scope ends at punctuation or a
+  contrast word ("not bad, great" stays positive)
+- a contrast word ("but", "however", "yet") starts a new clause, and the
+  clause after it weighs `contrast_weight` times as much ("nice screen but
+  a weak battery" leans negative)
+- qualifiers ("still", "just", "though") damp only the clause they are in
+- every sentiment word counts; a clause scores the mean of its hits
+- aspects are scored from the clauses that mention them, so
+  "great battery but awful delivery" scores Battery Life and Shipping apart
+
+Lexicon words match whole tokens (plus simple inflections: "recommended",
+"issues"), not substrings, so "know" is no longer a negation and "goodbye"
+not a positive word. Multi-word entries ("below average") are matched as
+phrases. Each token is looked up in a dict a bounded number of times, so a
+review costs O(tokens) no matter how big the lexicon is.
+
+Select it with config.RULE_SCORER = 'clause' (or AspectAnalyzer(scorer='clause')).
+"""
+import re
+import threading
+from collections import namedtuple
+
+from config import CLAUSE_SCORER
+
+# Score of a single hit of each sentiment group (the lexicon scorer's values)
+GROUP_SCORES = {
+    'negative': 0.1,
+    'critical': 0.2,
+    'neutral': 0.55,
+    'strong_positive': 0.9,
+    'positive': 0.75,
+}
+# When a phrase is in several groups, the lexicon scorer's priority decides
+GROUP_PRIORITY = ('negative', 'critical', 'neutral', 'strong_positive', 'positive')
+
+# Score of a sentence without any sentiment word (overall) and of an aspect without an opinion
+NEUTRAL_SENTENCE_SCORE = 0.55
+NEUTRAL_ASPECT_SCORE = 0.5
+
+# Words, sentence ends and clause punctuation
+_TOKEN_RE = re.compile(r"\w+(?:[-']\w+)*|[.!?]+|[,;:()]")
+_SENTENCE_END = frozenset('.!?')
+_INFLECTIONS = ('s', 'es', 'd', 'ed', 'r', 'er', 'ing', 'ly')
+
+ClauseScores = namedtuple('ClauseScores', ['overall', 'aspects'])
+
+# Phrase entry: sentiment group (or None), negation / qualifier / contrast flags, aspect names
+_Entry = namedtuple('_Entry', ['group', 'negation', 'qualifier', 'contrast', 'aspects'])
+
+_scorers = {}
+_scorers_lock = threading.Lock()
+
+
+def _tokens(phrase):
+    return tuple(_TOKEN_RE.findall(phrase.lower()))
+
+
+class ClauseScorer:
+    """
+    One-pass scorer over a CompiledLexicon. Thread-safe; the last result is
+    memoized because callers ask for the overall and the aspect scores of
+    the same review one after the other.
+    """
+
+    def __init__(self, lexicon, negation_window=None, contrast_weight=None, contrast_words=None,
+                 qualifier_damping=None):
+        settings = CLAUSE_SCORER
+        self.negation_window = settings['negation_window'] if negation_window is None else negation_window
+        self.contrast_weight = settings['contrast_weight'] if contrast_weight is None else contrast_weight
+        contrast_words = settings['contrast_words'] if contrast_words is None else contrast_words
+        self.qualifier_damping = settings['qualifier_damping'] if qualifier_damping is None else qualifier_damping
+        self.aspects = lexicon.aspects
+        self._last = None
+
+        roles = {}
+
+        def role(phrase):
+            tokens = _tokens(phrase)
+            if tokens:
+                return roles.setdefault(tokens, {'group': None, 'flags': set(), 'aspects': []})
+            return None
+
+        for group in reversed(GROUP_PRIORITY):
+            for word in lexicon.sentiment_words[group]:
+                entry = role(word)
+                if entry is not None:
+                    entry['group'] = group
+        for flag, words in (('negation', lexicon.sentiment_words['negation_words']),
+                            ('qualifier', lexicon.sentiment_words['qualifiers']),
+                            ('contrast', contrast_words)):
+            for word in words:
+                entry = role(word)
+                if entry is not None:
+                    entry['flags'].add(flag)
+        for aspect, keywords in lexicon.aspect_keywords.items():
+            for keyword in keywords:
+                entry = role(keyword)
+                if entry is not None and aspect not in entry['aspects']:
+                    entry['aspects'].append(aspect)
+
+        self._entries = {
+            tokens: _Entry(
+                value['group'], 'negation' in value['flags'],
+                'qualifier' in value['flags'] and 'contrast' not in value['flags'],
+                'contrast' in value['flags'], tuple(value['aspects']),
+            )
+            for tokens, value in roles.items()
+        }
+        # First token -> phrase lengths starting with it, longest first
+        lengths = {}
+        for tokens in self._entries:
+            lengths.setdefault(tokens[0], set()).add(len(tokens))
+        self._lengths = {token: sorted(values, reverse=True) for token, values in lengths.items()}
+        # Inflected single tokens only map to sentiment words and aspect keywords:
+        # "nor" must not become the negation "no"
+        self._stems = {
+            tokens[0]: entry for tokens, entry in self._entries.items()
+            if len(tokens) == 1 and (entry.group or entry.aspects)
+        }
+
+    def _match(self, tokens, i):
+        """(entry, length) of the longest lexicon phrase at tokens[i], or (None, 1)"""
+        token = tokens[i]
+        for length in self._lengths.get(token, ()):
+            entry = self._entries.get(tuple(tokens[i:i + length]))
+            if entry is not None:
+                return entry, length
+        if token.endswith("n't"):
+            return _Entry(None, True, False, False, ()), 1
+        for suffix in _INFLECTIONS:
+            if len(token) > len(suffix) + 2 and token.endswith(suffix):
+                entry = self._stems.get(token[:-len(suffix)])
+                if entry is not None:
+                    return entry, 1
+        return None, 1
+
+    def _clause_score(self, hits, qualified):
+        score = sum(hits) / len(hits)
+        if qualified:
+            if score > 0.5:
+                score -= self.qualifier_damping
+            elif score < 0.5:
+                score += 0.05
+        return score
+
+    def _close_sentence(self, clauses, sentence_scores, aspect_totals):
+        """Fold a sentence's clauses ([hits, qualified, aspects, weight]) into the running totals"""
+        weighted_sum = total_weight = 0.0
+        for hits, qualified, aspects, weight in clauses:
+            clause_score = self._clause_score(hits, qualified) if hits else None
+            if clause_score is not None:
+                weighted_sum += clause_score * weight
+                total_weight += weight
+            for aspect in aspects:
+                total = aspect_totals.setdefault(aspect, [0.0, 0])
+                total[0] += NEUTRAL_ASPECT_SCORE if clause_score is None else clause_score
+                total[1] += 1
+        sentence_scores.append(weighted_sum / total_weight if total_weight else NEUTRAL_SENTENCE_SCORE)
+
+    def score(self, text):
+        """
+        Overall and per-aspect scores of an already normalized (lowercase) text.
+
+        Returns:
+            ClauseScores: overall score (0.0 = negative, 1.0 = positive) and
+            {aspect: score} for every aspect of the lexicon (0.5 if not mentioned)
+        """
+        last = self._last
+        if last is not None and last[0] == text:
+            return last[1]
+
+        tokens = _TOKEN_RE.findall(text)
+        sentence_scores = []
+        aspect_totals = {}
+
+        # Clauses of the current sentence; the last one is open
+        clause = [[], False, set(), 1.0]
+        clauses = [clause]
+        negated_until = -1
+        sentence_has_words = False
+
+        i = position = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token[0] in _SENTENCE_END:
+                if sentence_has_words:
+                    self._close_sentence(clauses, sentence_scores, aspect_totals)
+                clause = [[], False, set(), 1.0]
+                clauses = [clause]
+                negated_until = -1
+                sentence_has_words = False
+                i += 1
+                continue
+            if not (token[0].isalnum() or token[0] == '_'):
+                # Clause punctuation ends a negation scope
+                negated_until = -1
+                i += 1
+                continue
+
+            sentence_has_words = True
+            entry, length = self._match(tokens, i)
+            if entry is not None:
+                if entry.contrast:
+                    clause = [[], False, set(), self.contrast_weight]
+                    clauses.append(clause)
+                    negated_until = -1
+                if entry.aspects:
+                    clause[2].update(entry.aspects)
+                if entry.group is not None:
+                    value = GROUP_SCORES[entry.group]
+                    clause[0].append(1.0 - value if position <= negated_until else value)
+                if entry.negation:
+                    negated_until = position + self.negation_window
+                if entry.qualifier:
+                    clause[1] = True
+            i += length
+            position += 1
+
+        if sentence_has_words:
+            self._close_sentence(clauses, sentence_scores, aspect_totals)
+
+        overall = sum(sentence_scores) / len(sentence_scores) if sentence_scores else 0.5
+        aspects = {
+            aspect: min(1.0, max(0.0, aspect_totals[aspect][0] / aspect_totals[aspect][1]))
+            if aspect in aspect_totals else NEUTRAL_ASPECT_SCORE
+            for aspect in self.aspects
+        }
+        scores = ClauseScores(max(0.0, min(1.0, overall)), aspects)
+        self._last = (text, scores)
+        return scores
+
+
+def clause_scorer_for(lexicon):
+    """The ClauseScorer of a lexicon pack, built once per process and pack version"""
+    key = (lexicon.name, lexicon.source_hash)
+    scorer = _scorers.get(key)
+    if scorer is None:
+        with _scorers_lock:
+            scorer = _scorers.get(key)
+            if scorer is None:
+                scorer = _scorers[key] = ClauseScorer(lexicon)
+    return scorer
@@ -0,0 +1,455 @@
+"""
+Flat, memory-mappable and quantized exports of the trained sentiment model.
+
+The TF-IDF vocabulary, IDF weights, StandardScaler and linear SVM are folded
+into a handful of flat NumPy arrays stored in a single file:
+
+    magic (8 bytes) | header length (uint64) | JSON header | aligned array blobs
+
+Arrays are opened with `np.memmap(mode='r')`, so every worker process on a
+host that loads the same file shares the same physical pages through the OS
+page cache instead of unpickling its own copy. The vocabulary is a sorted
+fixed-width byte array searched with `np.searchsorted`, so no per-process
+Python dict is built either.
+
+export_quantized_model() writes the same layout with float16 or per-pair
+int8 weights, float32 IDF and a packed (blob + offsets) vocabulary, with the
+weight rows reordered to vocabulary order so no column index array is
+needed. That is the small artifact for shipping in containers.
+
+Usage:
+    python -m utils.compact_model export model.smm
+    python -m utils.compact_model export model.sq8 --dtype int8
+"""
+import json
+import os
+import re
+import struct
+
+import numpy as np
+
+MAGIC = b'SENTMMAP'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+WEIGHT_DTYPES = ('float64', 'float32', 'float16', 'int8')
+
+# TfidfVectorizer settings the compact predictor reproduces exactly. The
+# preprocessor may also be utils.text_normalizer.normalize_text (see _check_vectorizer)
+SUPPORTED_VECTORIZER_PARAMS = {
+    'analyzer': 'word',
+    'binary': False,
+    'ngram_range': (1, 1),
+    'norm': 'l2',
+    'stop_words': None,
+    'strip_accents': None,
+    'sublinear_tf': False,
+    'tokenizer': None,
+    'use_idf': True,
+}
+
+
+def collapse_linear_svc(model, scaler):
+    """
+    Fold the StandardScaler into the one-vs-one linear SVM weights.
+
+    The scaler (with_mean=False) divides each feature by `scale_`, so
+    `(x / scale) @ coef.T == x @ (coef / scale).T`.
+
+    Every pair (i, j) follows libsvm's sign: a positive decision votes for
+    class i. sklearn negates `coef_` and `intercept_` of a binary SVC (so a
+    positive `decision_function` means `classes_[1]`); that pair is flipped
+    back here.
+
+    Returns:
+        tuple: (weights of shape (n_features, n_pairs), intercepts (n_pairs,), list of class-index pairs)
+    """
+    if getattr(model, 'kernel', None) != 'linear':
+        raise ValueError("Only linear-kernel SVMs can be collapsed into flat weights.")
+    if getattr(scaler, 'with_mean', False):
+        raise ValueError("Only StandardScaler(with_mean=False) can be folded into the weights.")
+
+    coef = model.coef_
+    coef = coef.toarray() if hasattr(coef, 'toarray') else np.asarray(coef)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(coef.shape[1])
+
+    n_classes = len(model.classes_)
+    pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+    weights = (coef / scale[np.newaxis, :]).T
+    intercepts = np.asarray(model.intercept_, dtype=np.float64)
+    if n_classes == 2:
+        weights, intercepts = -weights, -intercepts
+    return np.ascontiguousarray(weights, dtype=np.float64), intercepts, pairs
+
+
+def _check_vectorizer(vectorizer):
+    """
+    Returns:
+        int or None: the text normalizer version the vectorizer applies, None without one
+    """
+    from utils.text_normalizer import NORMALIZER_VERSION, normalize_text
+
+    params = vectorizer.get_params()
+    for name, expected in SUPPORTED_VECTORIZER_PARAMS.items():
+        if params.get(name) != expected:
+            raise ValueError(f"Compact export does not support TfidfVectorizer({name}={params.get(name)!r}).")
+
+    preprocessor = params.get('preprocessor')
+    if preprocessor is None:
+        return None
+    if preprocessor is normalize_text:
+        return NORMALIZER_VERSION
+    raise ValueError(f"Compact export does not support TfidfVectorizer(preprocessor={preprocessor!r}).")
+
+
+def build_arrays(model, vectorizer, scaler, label_encoder):
+    """
+    Flatten the fitted artifacts into plain arrays and header metadata.
+
+    Returns:
+        tuple: (dict of name -> np.ndarray, metadata dict)
+    """
+    normalizer = _check_vectorizer(vectorizer)
+    weights, intercepts, pairs = collapse_linear_svc(model, scaler)
+
+    terms = sorted(vectorizer.vocabulary_)
+    encoded_terms = [term.encode('utf-8') for term in terms]
+    width = max((len(term) for term in encoded_terms), default=1)
+
+    arrays = {
+        'vocab_terms': np.array(encoded_terms, dtype=f'S{width}'),
+        'vocab_columns': np.array([vectorizer.vocabulary_[term] for term in terms], dtype=np.int32),
+        'idf': np.asarray(vectorizer.idf_, dtype=np.float64),
+        'weights': weights,
+        'intercepts': intercepts,
+    }
+    metadata = {
+        'classes': [str(label) for label in label_encoder.classes_],
+        'model_classes': [int(c) for c in model.classes_],
+        'pairs': pairs,
+        'token_pattern': vectorizer.token_pattern,
+        'lowercase': bool(vectorizer.lowercase),
+        'normalizer': normalizer,
+    }
+    return arrays, metadata
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def write_flat_file(path, arrays, metadata):
+    """Write arrays + metadata to a single aligned, memory-mappable file"""
+    header = dict(metadata, format_version=FORMAT_VERSION, arrays={})
+
+    # Offsets are relative to the (aligned) start of the data section
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        header['arrays'][name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset,
+        }
+        offset += array.nbytes
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header['arrays'][name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_flat_file(path, mmap=True):
+    """
+    Open a flat model file.
+
+    Returns:
+        tuple: (dict of name -> array (np.memmap when `mmap`), header dict)
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not a compact sentiment model file.")
+        (header_length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+
+    if header.get('format_version', 0) > FORMAT_VERSION:
+        raise ValueError(f"'{path}' uses format version {header['format_version']}, newer than supported {FORMAT_VERSION}.")
+
+    data_start = _align(len(MAGIC) + 8 + header_length)
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        offset = data_start + spec['offset']
+        if mmap and int(np.prod(shape)) > 0:
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+        else:
+            count = int(np.prod(shape))
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                arrays[name] = np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype).reshape(shape)
+    return arrays, header
+
+
+def quantize_weights(weights, weight_dtype):
+    """
+    Quantize the collapsed weights.
+
+    int8 uses one symmetric scale per one-vs-one pair (column), so every
+    pair keeps its full dynamic range.
+
+    Returns:
+        tuple: (stored weights, per-pair float32 scales or None)
+    """
+    if weight_dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"weight_dtype must be one of {WEIGHT_DTYPES}, got {weight_dtype!r}.")
+
+    if weight_dtype == 'int8':
+        scales = np.abs(weights).max(axis=0) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(weights / scales), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    return weights.astype(weight_dtype), None
+
+
+def pack_vocabulary(terms):
+    """Pack sorted byte strings into one uint8 blob plus uint32 offsets"""
+    lengths = np.fromiter((len(term) for term in terms), dtype=np.uint32, count=len(terms))
+    offsets = np.zeros(len(terms) + 1, dtype=np.uint32)
+    np.cumsum(lengths, out=offsets[1:])
+    return np.frombuffer(b''.join(terms), dtype=np.uint8), offsets
+
+
+def unpack_vocabulary(blob, offsets):
+    """Inverse of pack_vocabulary(): a sorted fixed-width byte array for np.searchsorted"""
+    data = np.asarray(blob).tobytes()
+    offsets = np.asarray(offsets)
+    terms = [data[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+    width = max((len(term) for term in terms), default=1)
+    return np.array(terms, dtype=f'S{width}')
+
+
+def export_mmap_model(path, model, vectorizer, scaler, label_encoder):
+    """Export fitted artifacts to a single memory-mappable file (float64 weights)"""
+    arrays, metadata = build_arrays(model, vectorizer, scaler, label_encoder)
+    write_flat_file(path, arrays, dict(metadata, weight_dtype='float64', vocab_layout='fixed'))
+    return path
+
+
+def export_quantized_model(path, model, vectorizer, scaler, label_encoder, weight_dtype='int8'):
+    """Export fitted artifacts with quantized weights and a packed vocabulary"""
+    arrays, metadata = build_arrays(model, vectorizer, scaler, label_encoder)
+
+    # Reorder feature rows to sorted-vocabulary order: the term's position is its column
+    order = arrays['vocab_columns']
+    weights, scales = quantize_weights(arrays['weights'][order], weight_dtype)
+    blob, offsets = pack_vocabulary(list(arrays['vocab_terms']))
+
+    compact = {
+        'vocab_blob': blob,
+        'vocab_offsets': offsets,
+        'idf': arrays['idf'][order].astype(np.float32),
+        'weights': weights,
+        'intercepts': arrays['intercepts'],
+    }
+    if scales is not None:
+        compact['weight_scales'] = scales
+
+    write_flat_file(path, compact, dict(metadata, weight_dtype=weight_dtype, vocab_layout='packed'))
+    return path
+
+
+def load_compact_model(path, mmap=True):
+    """Load a file written by export_mmap_model() or export_quantized_model()"""
+    arrays, header = read_flat_file(path, mmap=mmap)
+    return CompactSentimentModel(arrays, header)
+
+
+def _softmax(scores):
+    shifted = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+def ovo_votes_and_ovr(decision, pairs, n_classes):
+    """
+    One-vs-one votes (as libsvm's predict counts them) and sklearn's
+    one-vs-rest transform of the decision values.
+
+    Args:
+        decision: one-vs-one decision values, shape (n_samples, n_pairs)
+        pairs: class-index pair (i, j) of each column
+
+    Returns:
+        tuple: (votes, ovr), both of shape (n_samples, n_classes)
+    """
+    votes = np.zeros((decision.shape[0], n_classes))
+    ovr_votes = np.zeros((decision.shape[0], n_classes))
+    confidences = np.zeros((decision.shape[0], n_classes))
+    for k, (i, j) in enumerate(pairs):
+        # libsvm votes for j on an exact tie; sklearn's ovr transform votes for i
+        wins_i = decision[:, k] > 0
+        votes[wins_i, i] += 1
+        votes[~wins_i, j] += 1
+        ovr_wins_i = decision[:, k] >= 0
+        ovr_votes[ovr_wins_i, i] += 1
+        ovr_votes[~ovr_wins_i, j] += 1
+        confidences[:, i] += decision[:, k]
+        confidences[:, j] -= decision[:, k]
+    ovr = ovr_votes + confidences / (3 * (np.abs(confidences) + 1))
+    return votes, ovr
+
+
+class CompactSentimentModel:
+    """
+    NumPy-only predictor over the flat arrays.
+
+    Reproduces TfidfVectorizer -> StandardScaler -> SVC(kernel='linear')
+    including the one-vs-one voting used by `predict` and the
+    one-vs-rest decision values behind the displayed probabilities.
+    """
+
+    def __init__(self, arrays, header):
+        self.arrays = arrays
+        self.header = header
+        self.classes = list(header['classes'])
+        self.pairs = [tuple(pair) for pair in header['pairs']]
+        self._token_re = re.compile(header['token_pattern'])
+        self._lowercase = header.get('lowercase', True)
+        self._normalize = None
+        if header.get('normalizer') is not None:
+            from utils.text_normalizer import NORMALIZER_VERSION, normalize_text
+
+            if header['normalizer'] != NORMALIZER_VERSION:
+                raise ValueError(
+                    f"Model was exported with text normalizer v{header['normalizer']}, "
+                    f"this code has v{NORMALIZER_VERSION}."
+                )
+            self._normalize = normalize_text
+
+        if header.get('vocab_layout') == 'packed':
+            # Feature rows are stored in vocabulary order, so position == column
+            self.vocab_terms = unpack_vocabulary(arrays['vocab_blob'], arrays['vocab_offsets'])
+            self.vocab_columns = None
+        else:
+            self.vocab_terms = arrays['vocab_terms']
+            self.vocab_columns = arrays['vocab_columns']
+        self.idf = arrays['idf']
+        self.weights = arrays['weights']
+        self.weight_scales = arrays.get('weight_scales')
+        self.intercepts = arrays['intercepts']
+        self._term_width = self.vocab_terms.dtype.itemsize
+
+    @property
+    def n_features(self):
+        return int(self.idf.shape[0])
+
+    def _weight_rows(self, columns):
+        """Dequantized weights for the given feature columns, shape (len(columns), n_pairs)"""
+        rows = np.asarray(self.weights[columns], dtype=np.float64)
+        if self.weight_scales is not None:
+            rows *= np.asarray(self.weight_scales, dtype=np.float64)
+        return rows
+
+    def _lookup(self, tokens):
+        """Map tokens to feature columns (-1 when out of vocabulary), vectorized"""
+        if not tokens:
+            return np.zeros(0, dtype=np.int64)
+        encoded = [token.encode('utf-8') for token in tokens]
+        fits = np.fromiter((len(token) <= self._term_width for token in encoded), dtype=bool, count=len(encoded))
+        candidates = np.array([token if ok else b'' for token, ok in zip(encoded, fits)], dtype=self.vocab_terms.dtype)
+
+        positions = np.searchsorted(self.vocab_terms, candidates)
+        positions = np.minimum(positions, len(self.vocab_terms) - 1)
+        found = fits & (self.vocab_terms[positions] == candidates)
+        columns = positions if self.vocab_columns is None else self.vocab_columns[positions]
+        return np.where(found, columns, -1).astype(np.int64)
+
+    def tokenize(self, text):
+        text = '' if text is None else str(text)
+        if self._normalize is not None:
+            # Same as the vectorizer: the preprocessor replaces its lowercasing
+            return self._token_re.findall(self._normalize(text))
+        return self._token_re.findall(text.lower() if self._lowercase else text)
+
+    def decision_pairs(self, texts):
+        """Raw one-vs-one decision values, shape (n_texts, n_pairs)"""
+        texts = list(texts)
+        n_docs = len(texts)
+        n_pairs = len(self.pairs)
+
+        token_lists = [self.tokenize(text) for text in texts]
+        doc_ids = np.repeat(np.arange(n_docs), [len(tokens) for tokens in token_lists])
+        columns = self._lookup([token for tokens in token_lists for token in tokens])
+
+        known = columns >= 0
+        doc_ids, columns = doc_ids[known], columns[known]
+
+        # Term counts per (doc, column) -> tf-idf values
+        keys, counts = np.unique(doc_ids * self.n_features + columns, return_counts=True)
+        key_docs, key_columns = keys // self.n_features, keys % self.n_features
+        values = counts * np.asarray(self.idf[key_columns], dtype=np.float64)
+
+        # L2 normalization per document
+        norms = np.sqrt(np.bincount(key_docs, weights=values * values, minlength=n_docs))
+        norms[norms == 0] = 1.0
+        values = values / norms[key_docs]
+
+        contributions = self._weight_rows(key_columns) * values[:, np.newaxis]
+        decision = np.zeros((n_docs, n_pairs))
+        for k in range(n_pairs):
+            decision[:, k] = np.bincount(key_docs, weights=contributions[:, k], minlength=n_docs)
+        return decision + np.asarray(self.intercepts, dtype=np.float64)
+
+    def predict_batch(self, texts):
+        """
+        Returns:
+            tuple: (labels array, probabilities array of shape (n, n_classes), class names)
+        """
+        decision = self.decision_pairs(texts)
+        votes, ovr = ovo_votes_and_ovr(decision, self.pairs, len(self.classes))
+        labels = np.array(self.classes, dtype=object)[np.argmax(votes, axis=1)]
+        if len(self.classes) == 2:
+            # sklearn's binary decision_function is -d; the app shows softmax([-df, df])
+            ovr = np.column_stack([decision[:, 0], -decision[:, 0]])
+        return labels, _softmax(ovr), list(self.classes)
+
+    def predict_sentiment_with_probabilities(self, text_input):
+        """
+        Returns:
+            tuple: (predicted_label, probabilities_dict)
+        """
+        labels, probabilities, classes = self.predict_batch([text_input])
+        return labels[0], {label: float(p) for label, p in zip(classes, probabilities[0])}
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    sys.path.append(os.getcwd())
+    import sentiment
+
+    parser = argparse.ArgumentParser(description='Export the trained model to the compact memory-mapped format.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export')
+    export_parser.add_argument('output')
+    export_parser.add_argument('--data', default='Customer_Sentiment_filtered_amazon.csv')
+    export_parser.add_argument('--dtype', choices=WEIGHT_DTYPES, default='float64',
+                               help='float64 writes the memory-mapped format; smaller types write the quantized format')
+    args = parser.parse_args()
+
+    artifacts = sentiment.fit_artifacts(sentiment.load_data(args.data))[:4]
+    if args.dtype == 'float64':
+        export_mmap_model(args.output, *artifacts)
+    else:
+        export_quantized_model(args.output, *artifacts, weight_dtype=args.dtype)
+    print(f"Wrote {args.output} ({os.path.getsize(args.output):,} bytes)")
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+from config import CACHE_DIR
+from utils.batch_scoring import score_dataframe
+
+# Bump when the scored columns change so old cache files are ignored
+SCORED_CORPUS_VERSION = 3
+
+SORTABLE_COLUMNS = ['sentiment_score', 'rule_score', 'customer_rating', 'response_time_hours', 'customer_id']
+
+
+def corpus_fingerprint(df, context):
+    """
+    Hash of everything the scored corpus depends on: the dataset, the model
+    artifacts, the lexicon pack of every category in `df`, the rule scorer
+    and its settings, the hybrid override, the text normalizer and the
+    truncation limits
+    """
+    from config import (
+        HYBRID_OVERRIDE, SENTIMENT_THRESHOLDS, CLAUSE_SCORER, TEXT_NORMALIZATION, REQUEST_BUDGET
+    )
+    from utils.text_normalizer import NORMALIZER_VERSION
+
+    digest = hashlib.sha1(f"v{SCORED_CORPUS_VERSION}".encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(pickle.dumps(context.artifacts, protocol=pickle.HIGHEST_PROTOCOL))
+
+    analyzer = context.analyzer
+    categories = df['product_category'].dropna().unique().tolist() if 'product_category' in df.columns else []
+    packs = {analyzer.lexicon.name: analyzer.lexicon.source_hash}
+    for category in categories:
+        lexicon = analyzer.lexicon_for(category)
+        packs[lexicon.name] = lexicon.source_hash
+
+    settings = {
+        'packs': packs,
+        'scorer': analyzer.scorer,
+        'clause_scorer': CLAUSE_SCORER,
+        'hybrid_override': HYBRID_OVERRIDE,
+        'sentiment_thresholds': SENTIMENT_THRESHOLDS,
+        'normalizer': NORMALIZER_VERSION if TEXT_NORMALIZATION else None,
+        'truncation': [REQUEST_BUDGET['max_chars'], REQUEST_BUDGET['max_tokens']],
+    }
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def score_corpus(df, context, chunk_size=256, progress_callback=None):
+    """Score every review of `df` and return `df` with the score columns appended"""
+    category_column = 'product_category' if 'product_category' in df.columns else None
+    # Exact dedup is lossless and the corpus is dominated by repeated texts
+    result = score_dataframe(df, context, 'review_text', category_column, chunk_size, progress_callback, dedup='exact')
+    # Lowercased copy for case-insensitive search without per-query .str.lower()
+    result['_search_text'] = result['review_text'].fillna('').astype(str).str.lower()
+    return result
+
+
+def load_scored_corpus(df, context, cache_dir=CACHE_DIR):
+    """
+    Score the corpus once and persist it.
+
+    The scored frame is pickled under `cache_dir`, keyed by
+    corpus_fingerprint(), so the next process start loads it instead of
+    re-scoring. Any change to the data, the model, a lexicon pack or a scoring
+    setting gives a new key.
+    """
+    cache_file = None
+    if cache_dir:
+        cache_file = os.path.join(cache_dir, f"scored_corpus-{corpus_fingerprint(df, context)[:16]}.pkl")
+        if os.path.isfile(cache_file):
+            try:
+                return pd.read_pickle(cache_file)
+            except Exception:
+                # Corrupt cache - fall through and rescore
+                pass
+
+    scored = score_corpus(df, context)
+
+    if cache_file:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            scored.to_pickle(tmp_file)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
+    return scored
+
+
+def query_corpus(scored, sentiments=None, categories=None, regions=None, search=None,
+                 sort_by='sentiment_score', ascending=False, page=1, page_size=25):
+    """
+    Server-side filter, sort and paginate a scored corpus.
+
+    Only the requested page is materialized and returned, so the dashboard
+    never ships the full frame to the browser.
+
+    Returns:
+        tuple: (page DataFrame, total number of matching rows)
+    """
+    mask = pd.Series(True, index=scored.index)
+    if sentiments:
+        mask &= scored['predicted_sentiment'].isin(sentiments)
+    if categories:
+        mask &= scored['product_category'].isin(categories)
+    if regions:
+        mask &= scored['region'].isin(regions)
+    if search:
+        mask &= scored['_search_text'].str.contains(search.strip().lower(), regex=False)
+
+    matching = scored.index[mask.to_numpy()]
+    total = len(matching)
+
+    page_size = max(int(page_size), 1)
+    page = min(max(int(page), 1), max((total + page_size - 1) // page_size, 1))
+    start = (page - 1) * page_size
+
+    if sort_by:
+        # Sort only the sort key of matching rows, then materialize one page
+        keys = scored.loc[matching, sort_by]
+        order = keys.sort_values(ascending=ascending, kind='stable').index
+        page_index = order[start:start + page_size]
+    else:
+        page_index = matching[start:start + page_size]
+
+    page_frame = scored.loc[page_index].drop(columns=['_search_text'])
+    return page_frame, total
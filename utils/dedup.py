@@ -0,0 +1,195 @@
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+# MinHash/LSH defaults: 16 bands x 4 rows puts the LSH candidate threshold
+# around a Jaccard of 0.5; candidates are then verified against the exact
+# shingle Jaccard, so NEAR_DUPLICATE_THRESHOLD is the effective cut-off.
+NEAR_DUPLICATE_THRESHOLD = 0.85
+NUM_PERM = 64
+NUM_BANDS = 16
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size"""
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+
+def normalize_for_matching(text):
+    """Lowercase and collapse whitespace (used for near-duplicate shingles only)"""
+    return _WHITESPACE.sub(' ', str(text).lower()).strip()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Character shingles of `text`; texts shorter than `size` are one shingle"""
+    text = normalize_for_matching(text)
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(shingle_sets, num_perm=NUM_PERM, seed=1):
+    """
+    MinHash signature per shingle set.
+
+    Shingles are hashed to 32 bits with crc32, then permuted with
+    (a * h + b) mod (2^61 - 1); all products fit in uint64.
+
+    Returns:
+        np.ndarray: (n_sets, num_perm) uint64 signatures
+    """
+    a, b = _permutations(num_perm, seed)
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    for row, items in enumerate(shingle_sets):
+        hashes = np.fromiter((zlib.crc32(item.encode('utf-8')) for item in items), dtype=np.uint64, count=len(items))
+        permuted = (np.outer(a, hashes) + b[:, None]) % _MERSENNE_PRIME
+        signatures[row] = permuted.min(axis=1)
+    return signatures
+
+
+def lsh_candidate_pairs(signatures, bands=NUM_BANDS):
+    """Pairs of rows whose signatures agree on at least one band"""
+    n_rows, num_perm = signatures.shape
+    rows_per_band = num_perm // bands
+    pairs = set()
+    for band in range(bands):
+        buckets = {}
+        block = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        for row in range(n_rows):
+            buckets.setdefault(block[row].tobytes(), []).append(row)
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pairs.add((first, second))
+    return pairs
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def plan_dedup(texts, keys=None, near_duplicates=False, threshold=NEAR_DUPLICATE_THRESHOLD,
+               num_perm=NUM_PERM, bands=NUM_BANDS, shingle_size=SHINGLE_SIZE, seed=1):
+    """
+    Group rows so each distinct piece of content is scored once.
+
+    Rows are first grouped by exact (text, key) match, which is lossless.
+    With `near_duplicates`, the distinct texts are further clustered with
+    MinHash/LSH and merged when their shingle Jaccard is >= `threshold`;
+    every row in a cluster then gets the representative's result.
+
+    Args:
+        texts: sequence of review strings
+        keys: optional per-row values that must also match (e.g. the lexicon
+            pack, since it changes rule and aspect scores)
+        near_duplicates: also merge near-duplicate texts (lossy)
+        threshold: minimum Jaccard similarity for a near-duplicate merge
+
+    Returns:
+        tuple: (representatives: row index to score per cluster,
+                assignment: cluster number for every row,
+                report: dict from duplicate_report())
+    """
+    texts = list(texts)
+    keys = list(keys) if keys is not None else [None] * len(texts)
+
+    # Exact stage: dict lookup on (text, key)
+    exact_index = {}
+    exact_members = []
+    exact_of_row = np.empty(len(texts), dtype=np.intp)
+    for row, item in enumerate(zip(texts, keys)):
+        group = exact_index.get(item)
+        if group is None:
+            group = exact_index[item] = len(exact_members)
+            exact_members.append([])
+        exact_members[group].append(row)
+        exact_of_row[row] = group
+
+    n_exact = len(exact_members)
+    sets = UnionFind(n_exact)
+
+    if near_duplicates and n_exact > 1:
+        # Near-duplicate stage runs over distinct texts only
+        unique_items = list(exact_index)
+        shingle_sets = [shingles(text, shingle_size) for text, _ in unique_items]
+        signatures = minhash_signatures(shingle_sets, num_perm, seed)
+        for i, j in lsh_candidate_pairs(signatures, bands):
+            if unique_items[i][1] == unique_items[j][1] and jaccard(shingle_sets[i], shingle_sets[j]) >= threshold:
+                sets.union(i, j)
+
+    # Each cluster is represented by its most frequent exact text
+    cluster_of_root = {}
+    representatives = []
+    cluster_of_exact = np.empty(n_exact, dtype=np.intp)
+    order = sorted(range(n_exact), key=lambda group: (-len(exact_members[group]), group))
+    for group in order:
+        root = sets.find(group)
+        cluster = cluster_of_root.get(root)
+        if cluster is None:
+            cluster = cluster_of_root[root] = len(representatives)
+            representatives.append(exact_members[group][0])
+        cluster_of_exact[group] = cluster
+
+    assignment = cluster_of_exact[exact_of_row]
+    representatives = np.asarray(representatives, dtype=np.intp)
+    return representatives, assignment, duplicate_report(texts, representatives, assignment, n_exact)
+
+
+def duplicate_report(texts, representatives, assignment, exact_unique, top=5):
+    """
+    Summarize how much of the input is duplicated.
+
+    Returns:
+        dict: rows, exact_unique, clusters, exact_duplicate_ratio,
+        duplicate_ratio (share of rows not scored), speedup and the
+        largest clusters as (representative text, size) pairs
+    """
+    rows = len(assignment)
+    clusters = len(representatives)
+    sizes = Counter(assignment.tolist())
+    return {
+        'rows': rows,
+        'exact_unique': exact_unique,
+        'clusters': clusters,
+        'exact_duplicate_ratio': 1 - exact_unique / rows if rows else 0.0,
+        'duplicate_ratio': 1 - clusters / rows if rows else 0.0,
+        'speedup': rows / clusters if clusters else 1.0,
+        'largest_clusters': [
+            (texts[representatives[cluster]], size) for cluster, size in sizes.most_common(top)
+        ],
+    }
@@ -0,0 +1,413 @@
+"""
+Drift monitoring for scored traffic.
+
+DriftMonitor keeps constant-memory summaries of everything it scores:
+- out-of-vocabulary token rate against the model's TF-IDF vocabulary, with
+  the most frequent unseen tokens tracked in a count-min sketch
+- the ML class distribution and the hybrid override rate
+- a fixed-bin histogram of the rule-based score
+- how often each aspect is mentioned
+- a reservoir sample of reviews for manual inspection
+
+`snapshot()` turns the summaries into JSON; `compare()` checks a live
+snapshot against the baseline snapshot of the training data (stored next to
+the model in the registry) and flags drift past config.DRIFT_THRESHOLDS.
+
+Both commands use the active model registry version (or --version/--model);
+a model is trained on --data only when the registry is empty.
+
+Usage:
+    python -m utils.drift_monitor --data reviews.csv baseline -o drift_baseline.json
+    python -m utils.drift_monitor compare traffic.jsonl             # the version's stored baseline
+    python -m utils.drift_monitor compare traffic.jsonl --baseline drift_baseline.json
+"""
+import json
+import random
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from config import DRIFT_THRESHOLDS
+
+RULE_SCORE_BINS = 10
+SAMPLE_SIZE = 50
+TOP_OOV_TOKENS = 20
+# Same prime as utils.dedup's MinHash: universal hashing (a*x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+# Smoothing for empty buckets in the population stability index
+_PSI_EPSILON = 1e-4
+
+
+def _crc32(tokens):
+    return np.fromiter((zlib.crc32(token.encode('utf-8')) for token in tokens), dtype=np.uint64, count=len(tokens))
+
+
+class CountMinSketch:
+    """
+    Approximate counts for an unbounded set of keys in `depth x width` counters.
+
+    Estimates never undercount; they overcount by at most
+    e / width * total with probability 1 - exp(-depth).
+    """
+
+    def __init__(self, width=2048, depth=4, seed=0):
+        rng = np.random.default_rng(seed)
+        self.width = width
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        # Coefficients below 2^31 keep a * crc32 + b inside uint64
+        self._a = rng.integers(1, 1 << 31, size=depth, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=depth, dtype=np.uint64)
+
+    def _columns(self, keys):
+        hashes = _crc32(keys)
+        hashed = (self._a[:, np.newaxis] * hashes[np.newaxis, :] + self._b[:, np.newaxis]) % np.uint64(_MERSENNE_PRIME)
+        return (hashed % np.uint64(self.width)).astype(np.intp)
+
+    def add(self, keys, counts=None):
+        """Add `counts` (default 1 each) for every key in the list"""
+        if not keys:
+            return
+        counts = np.ones(len(keys), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        for row, columns in enumerate(self._columns(keys)):
+            np.add.at(self.table[row], columns, counts)
+
+    def estimate(self, keys):
+        """Estimated counts for the keys, as an int array"""
+        if not keys:
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(keys)
+        return np.min(self.table[np.arange(self.table.shape[0])[:, np.newaxis], columns], axis=0)
+
+
+class ReservoirSample:
+    """Uniform sample of at most `size` items from a stream of unknown length (algorithm R)"""
+
+    def __init__(self, size=SAMPLE_SIZE, seed=0):
+        self.size = size
+        self.items = []
+        self.seen = 0
+        self._random = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+        else:
+            slot = self._random.randrange(self.seen)
+            if slot < self.size:
+                self.items[slot] = item
+
+
+def population_stability_index(expected, actual):
+    """
+    PSI between two count (or share) vectors over the same buckets.
+
+    Rule of thumb: < 0.1 stable, 0.1-0.2 moderate shift, > 0.2 significant shift.
+    """
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    if expected.sum() == 0 or actual.sum() == 0:
+        return 0.0
+    expected = np.maximum(expected / expected.sum(), _PSI_EPSILON)
+    actual = np.maximum(actual / actual.sum(), _PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class DriftMonitor:
+    """
+    Streaming drift statistics for one model version.
+
+    Memory does not grow with traffic: counters per class and aspect, a
+    fixed histogram, a count-min sketch plus a bounded candidate set for
+    unseen tokens, and a reservoir sample. `update()` is thread-safe, so
+    one monitor can be shared by every dashboard session.
+    """
+
+    def __init__(self, vocabulary, tokenize, classes, analyzer=None, top_oov_tokens=TOP_OOV_TOKENS,
+                 sample_size=SAMPLE_SIZE, seed=0):
+        self.vocabulary = vocabulary
+        self.tokenize = tokenize
+        self.classes = list(classes)
+        self.analyzer = analyzer
+        self.top_oov_tokens = top_oov_tokens
+
+        self.documents = 0
+        self.tokens = 0
+        self.oov_tokens = 0
+        self.overrides = 0
+        self.class_counts = dict.fromkeys(self.classes, 0)
+        self.rule_score_counts = np.zeros(RULE_SCORE_BINS, dtype=np.int64)
+        self.aspect_mentions = {}
+        self.oov_sketch = CountMinSketch(seed=seed)
+        self._oov_candidates = set()
+        self.sample = ReservoirSample(sample_size, seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_context(cls, context, **kwargs):
+        vectorizer = context.vectorizer
+        return cls(vectorizer.vocabulary_, vectorizer.build_analyzer(), context.label_encoder.classes_,
+                   analyzer=context.analyzer, **kwargs)
+
+    def update(self, texts, ml_labels, rule_scores, override_reasons=None, categories=None):
+        """
+        Add a batch of scored reviews.
+
+        Args:
+            texts: review texts
+            ml_labels: the model's labels (before the hybrid override)
+            rule_scores: rule-based overall scores in [0, 1]
+            override_reasons: optional hybrid override reasons ('' or None when not overridden)
+            categories: optional product categories (select the aspect lexicon pack)
+        """
+        texts = ['' if pd.isna(text) else str(text) for text in texts]
+        if categories is None:
+            categories = [None] * len(texts)
+
+        oov_counts = {}
+        batch_tokens = 0
+        doc_oov = []
+        for text in texts:
+            tokens = self.tokenize(text)
+            unseen = [token for token in tokens if token not in self.vocabulary]
+            for token in unseen:
+                oov_counts[token] = oov_counts.get(token, 0) + 1
+            batch_tokens += len(tokens)
+            doc_oov.append(len(unseen) / len(tokens) if tokens else 0.0)
+
+        mentions = {}
+        if self.analyzer is not None:
+            for text, category in zip(texts, categories):
+                lexicon = self.analyzer.lexicon_for(None if pd.isna(category) else category)
+                lowered = text.lower()
+                for aspect in lexicon.aspects:
+                    if lexicon.mentions(aspect, lowered):
+                        mentions[aspect] = mentions.get(aspect, 0) + 1
+
+        rule_scores = np.clip(np.asarray(rule_scores, dtype=float), 0.0, 1.0)
+        histogram, _ = np.histogram(rule_scores, bins=RULE_SCORE_BINS, range=(0.0, 1.0))
+        overrides = sum(1 for reason in override_reasons if reason) if override_reasons is not None else 0
+
+        with self._lock:
+            self.documents += len(texts)
+            self.tokens += batch_tokens
+            self.oov_tokens += sum(oov_counts.values())
+            self.overrides += overrides
+            self.rule_score_counts += histogram
+            for label in ml_labels:
+                self.class_counts[label] = self.class_counts.get(label, 0) + 1
+            for aspect, count in mentions.items():
+                self.aspect_mentions[aspect] = self.aspect_mentions.get(aspect, 0) + count
+
+            if oov_counts:
+                self.oov_sketch.add(list(oov_counts), list(oov_counts.values()))
+                self._oov_candidates.update(oov_counts)
+                self._prune_candidates()
+
+            for text, oov_rate in zip(texts, doc_oov):
+                self.sample.add({'review_text': text, 'oov_rate': round(oov_rate, 4)})
+
+    def update_scored(self, texts, scored, categories=None):
+        """update() from a frame returned by utils.batch_scoring.score_reviews()"""
+        self.update(texts, scored['ml_sentiment'], scored['rule_score'], scored['override_reason'], categories)
+
+    def _prune_candidates(self):
+        # Keep a bounded candidate set: the current heaviest tokens by sketch estimate
+        limit = 4 * self.top_oov_tokens
+        if len(self._oov_candidates) <= limit:
+            return
+        candidates = list(self._oov_candidates)
+        keep = np.argsort(-self.oov_sketch.estimate(candidates), kind='stable')[:limit]
+        self._oov_candidates = {candidates[i] for i in keep}
+
+    def snapshot(self):
+        """
+        JSON-serializable summary of everything seen so far.
+
+        Returns:
+            dict: documents, oov_rate, top_oov_tokens, class_share,
+            override_rate, rule_score_histogram, aspect_mention_rate and sample
+        """
+        with self._lock:
+            documents = self.documents
+            candidates = list(self._oov_candidates)
+            estimates = self.oov_sketch.estimate(candidates)
+            top = sorted(zip(candidates, estimates.tolist()), key=lambda item: (-item[1], item[0]))
+            class_total = sum(self.class_counts.values())
+            return {
+                'documents': documents,
+                'tokens': self.tokens,
+                'oov_rate': self.oov_tokens / self.tokens if self.tokens else 0.0,
+                'top_oov_tokens': top[:self.top_oov_tokens],
+                'class_share': {
+                    label: count / class_total if class_total else 0.0 for label, count in self.class_counts.items()
+                },
+                'override_rate': self.overrides / documents if documents else 0.0,
+                'rule_score_histogram': self.rule_score_counts.tolist(),
+                'aspect_mention_rate': {
+                    aspect: count / documents for aspect, count in sorted(self.aspect_mentions.items())
+                } if documents else {},
+                'sample': list(self.sample.items),
+            }
+
+
+def compare(baseline, current, thresholds=None):
+    """
+    Compare a live snapshot against the training baseline.
+
+    Args:
+        baseline, current: DriftMonitor.snapshot() dicts
+        thresholds: overrides for config.DRIFT_THRESHOLDS
+
+    Returns:
+        dict: per-signal baseline/current values and drift measures, plus
+        'alerts' (human-readable) and 'retrain_recommended'
+    """
+    thresholds = {**DRIFT_THRESHOLDS, **(thresholds or {})}
+    labels = sorted(set(baseline['class_share']) | set(current['class_share']))
+    aspects = sorted(set(baseline['aspect_mention_rate']) | set(current['aspect_mention_rate']))
+
+    def shares(snapshot, key, names):
+        return [snapshot[key].get(name, 0.0) for name in names]
+
+    report = {
+        'documents': current['documents'],
+        'oov_rate': {'baseline': baseline['oov_rate'], 'current': current['oov_rate'],
+                     'change': current['oov_rate'] - baseline['oov_rate']},
+        'override_rate': {'baseline': baseline['override_rate'], 'current': current['override_rate'],
+                          'change': current['override_rate'] - baseline['override_rate']},
+        'class_psi': population_stability_index(shares(baseline, 'class_share', labels),
+                                                 shares(current, 'class_share', labels)),
+        'rule_score_psi': population_stability_index(baseline['rule_score_histogram'],
+                                                     current['rule_score_histogram']),
+        'aspect_mention_change': {
+            aspect: current['aspect_mention_rate'].get(aspect, 0.0) - baseline['aspect_mention_rate'].get(aspect, 0.0)
+            for aspect in aspects
+        },
+        'class_share': {'baseline': baseline['class_share'], 'current': current['class_share']},
+        'top_oov_tokens': current['top_oov_tokens'],
+    }
+
+    # Too little traffic makes every distribution look shifted; report but don't alert
+    enough_data = current['documents'] >= thresholds['min_documents']
+    alerts = []
+    if enough_data:
+        for key in ('class_psi', 'rule_score_psi'):
+            if report[key] > thresholds[key]:
+                alerts.append(f"{key} {report[key]:.3f} exceeds {thresholds[key]}")
+        for aspect, change in report['aspect_mention_change'].items():
+            if abs(change) > thresholds['aspect_rate_change']:
+                alerts.append(f"'{aspect}' mention rate changed by {change:+.3f} (limit {thresholds['aspect_rate_change']})")
+        for key in ('oov_rate', 'override_rate'):
+            limit = thresholds[f'{key}_increase']
+            if report[key]['change'] > limit:
+                alerts.append(f"{key} rose by {report[key]['change']:.3f} (limit {limit})")
+
+    report['alerts'] = alerts
+    report['enough_data'] = enough_data
+    report['retrain_recommended'] = bool(alerts)
+    return report
+
+
+def build_baseline(context, df, text_column='review_text', category_column='product_category'):
+    """
+    Baseline snapshot: the monitor's view of the training data as the model scores it.
+
+    Returns:
+        dict: DriftMonitor.snapshot()
+    """
+    from utils.batch_scoring import score_reviews
+
+    categories = df[category_column] if category_column in df.columns else None
+    scored = score_reviews(df[text_column], context, categories, dedup='exact')
+    monitor = DriftMonitor.from_context(context)
+    monitor.update_scored(df[text_column], scored, categories)
+    return monitor.snapshot()
+
+
+def _load_model(data_path, registry_dir, model_path=None, version=None):
+    """
+    The model to monitor: the artifacts at `model_path`, else registry
+    `version`, else the active registry version, else one trained on
+    `data_path` (only when the registry is empty).
+
+    Returns:
+        tuple: (InferenceContext, registry version or None)
+    """
+    import sentiment
+    from utils.inference_context import InferenceContext
+    from utils.model_registry import ModelRegistry, load_version
+
+    if model_path:
+        return InferenceContext(*sentiment.load_artifacts(model_path)), None
+    if version:
+        return load_version(version, registry_dir).context, version
+
+    registry = ModelRegistry(registry_dir)
+    registry.check_for_updates()
+    if registry.active is not None:
+        return registry.active.context, registry.active.version
+    return InferenceContext.from_dataframe(sentiment.load_data(data_path)), None
+
+
+def main():
+    import argparse
+    import contextlib
+    import sys
+
+    import sentiment
+    from config import MODEL_REGISTRY_DIR
+    from utils.model_registry import load_drift_baseline
+    from utils.streaming import read_jsonl, score_stream
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='Customer_Sentiment_filtered_amazon.csv', help='training CSV')
+    parser.add_argument('--registry', default=MODEL_REGISTRY_DIR,
+                        help='model registry to load from; a model is trained on --data only if it is empty')
+    parser.add_argument('--version', help='registry version to monitor (default: the active one)')
+    parser.add_argument('--model', help='artifacts written by sentiment.save_artifacts() instead of a registry version')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    baseline_parser = subparsers.add_parser('baseline', help='write the baseline snapshot of the training data')
+    baseline_parser.add_argument('-o', '--output', default='-')
+    compare_parser = subparsers.add_parser('compare', help='score a JSONL file and compare it with a baseline')
+    compare_parser.add_argument('input', help="JSONL reviews ('-' for stdin)")
+    compare_parser.add_argument('--baseline', help="baseline JSON (default: the one stored with the model version)")
+    args = parser.parse_args()
+
+    # Loading and training progress goes to stderr so stdout carries only JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        context, version = _load_model(args.data, args.registry, args.model, args.version)
+
+    if args.command == 'baseline':
+        with contextlib.redirect_stdout(sys.stderr):
+            df = sentiment.load_data(args.data)
+        payload = json.dumps(build_baseline(context, df), indent=2)
+        if args.output == '-':
+            print(payload)
+        else:
+            with open(args.output, 'w') as f:
+                f.write(payload + '\n')
+        return
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        baseline = load_drift_baseline(version, args.registry) if version else None
+        if baseline is None:
+            parser.error("the model has no stored drift baseline; pass --baseline")
+    monitor = DriftMonitor.from_context(context)
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    try:
+        for _ in score_stream(read_jsonl(source), context, monitor=monitor):
+            pass
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(json.dumps(compare(baseline, monitor.snapshot()), indent=2))
+
+
+if __name__ == '__main__':
+    main()
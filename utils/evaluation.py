@@ -0,0 +1,314 @@
+"""
+Evaluation harness: k-fold metrics for the sentiment model and the hybrid safety net.
+
+Featurized folds (TF-IDF + scaling fitted on each training split) are cached
+on disk, keyed by the data and the fold settings, so evaluating another model
+variant only pays for fitting the classifier. Folds run in parallel worker
+processes.
+
+Usage:
+    python -m utils.evaluation [--folds 5] [--jobs 4] [--C 0.1 1.0] [--rule-scorer clause] [--output report.json]
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from config import CACHE_DIR, SENTIMENT_THRESHOLDS
+
+# Bump when the featurization changes so old fold files are ignored
+FOLD_CACHE_VERSION = 2
+DEFAULT_FOLDS = 5
+SEGMENT_COLUMNS = ['product_category', 'region']
+
+
+def default_model_factory(C=0.1):
+    """The production classifier: linear SVC with the tuned C"""
+    from sklearn.svm import SVC
+
+    return SVC(kernel='linear', C=C, random_state=42)
+
+
+def folds_fingerprint(df, n_splits, seed):
+    """Hash of the texts, labels and fold settings that the cached features depend on"""
+    from config import TEXT_NORMALIZATION
+    from utils.text_normalizer import NORMALIZER_VERSION
+
+    normalizer = NORMALIZER_VERSION if TEXT_NORMALIZATION else 0
+    digest = hashlib.sha1(f"v{FOLD_CACHE_VERSION}:{n_splits}:{seed}:{normalizer}".encode())
+    digest.update(pd.util.hash_pandas_object(df[['review_text', 'sentiment']], index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _featurize_fold(texts, train_index, test_index):
+    """Fit TF-IDF and the scaler on the training split only, then transform both splits"""
+    from sklearn.preprocessing import StandardScaler
+    from sentiment import build_vectorizer
+
+    vectorizer = build_vectorizer()
+    X_train = vectorizer.fit_transform(texts[train_index])
+    X_test = vectorizer.transform(texts[test_index])
+
+    # with_mean=False keeps the matrices sparse; the scaling matches fit_artifacts()
+    scaler = StandardScaler(with_mean=False)
+    return scaler.fit_transform(X_train).tocsr(), scaler.transform(X_test).tocsr()
+
+
+def prepare_folds(df, n_splits=DEFAULT_FOLDS, seed=42, cache_dir=CACHE_DIR):
+    """
+    Build (or load from cache) stratified, featurized folds.
+
+    Returns:
+        list: one path per fold to an .npz file holding X_train, X_test,
+        y_train, y_test and test_index
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    fold_dir = os.path.join(cache_dir, 'eval_folds', folds_fingerprint(df, n_splits, seed))
+    paths = [os.path.join(fold_dir, f"fold_{k}.npz") for k in range(n_splits)]
+    if all(os.path.isfile(path) for path in paths):
+        return paths
+
+    os.makedirs(fold_dir, exist_ok=True)
+    texts = df['review_text'].fillna('').astype(str).to_numpy()
+    labels = df['sentiment'].to_numpy()
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+
+    for path, (train_index, test_index) in zip(paths, splitter.split(texts, labels)):
+        X_train, X_test = _featurize_fold(texts, train_index, test_index)
+        arrays = {'y_train': labels[train_index].astype(str), 'y_test': labels[test_index].astype(str),
+                  'test_index': test_index}
+        for name, matrix in (('X_train', X_train), ('X_test', X_test)):
+            arrays[f'{name}_data'] = matrix.data
+            arrays[f'{name}_indices'] = matrix.indices
+            arrays[f'{name}_indptr'] = matrix.indptr
+            arrays[f'{name}_shape'] = np.array(matrix.shape)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    return paths
+
+
+def _load_matrix(arrays, name):
+    import scipy.sparse as sp
+
+    return sp.csr_matrix(
+        (arrays[f'{name}_data'], arrays[f'{name}_indices'], arrays[f'{name}_indptr']),
+        shape=tuple(arrays[f'{name}_shape']),
+    )
+
+
+def _run_fold(path, model_factory):
+    """Fit one model on a cached fold; runs in a worker process"""
+    with np.load(path, allow_pickle=False) as arrays:
+        X_train, X_test = _load_matrix(arrays, 'X_train'), _load_matrix(arrays, 'X_test')
+        y_train, y_test, test_index = arrays['y_train'], arrays['y_test'], arrays['test_index']
+
+    start = time.perf_counter()
+    model = model_factory()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    return test_index, model.predict(X_test), fit_seconds
+
+
+def rule_labels(rule_scores, thresholds=SENTIMENT_THRESHOLDS):
+    """Map rule-based scores to labels with the configured thresholds"""
+    rule_scores = np.asarray(rule_scores, dtype=float)
+    return np.where(
+        rule_scores >= thresholds['positive'], 'positive',
+        np.where(rule_scores <= thresholds['negative'], 'negative', 'neutral'),
+    ).astype(object)
+
+
+def compute_rule_scores(df, analyzer=None):
+    """Rule-based overall score per row, computed once per distinct (text, category)"""
+    from utils.aspect_analyzer import AspectAnalyzer
+
+    analyzer = analyzer or AspectAnalyzer()
+    texts = df['review_text'].fillna('').astype(str)
+    categories = df['product_category'] if 'product_category' in df.columns else pd.Series([None] * len(df))
+    cache = {}
+    scores = np.empty(len(df))
+    for row, key in enumerate(zip(texts, categories)):
+        if key not in cache:
+            cache[key] = analyzer.analyze_overall_sentiment(key[0], category=key[1])
+        scores[row] = cache[key]
+    return scores
+
+
+def classification_metrics(y_true, y_pred, labels):
+    """Accuracy, per-class precision/recall/F1 and the confusion matrix"""
+    from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
+
+    precision, recall, f1, support = precision_recall_fscore_support(
+        y_true, y_pred, labels=labels, zero_division=0
+    )
+    return {
+        'accuracy': float(np.mean(np.asarray(y_true) == np.asarray(y_pred))),
+        'per_class': {
+            label: {'precision': float(p), 'recall': float(r), 'f1': float(f), 'support': int(s)}
+            for label, p, r, f, s in zip(labels, precision, recall, f1, support)
+        },
+        'confusion_matrix': {
+            'labels': list(labels),
+            'matrix': confusion_matrix(y_true, y_pred, labels=labels).tolist(),
+        },
+    }
+
+
+def segment_accuracy(df, y_true, predictions, columns=SEGMENT_COLUMNS):
+    """Accuracy of each prediction set within every value of the segment columns"""
+    segments = {}
+    for column in columns:
+        if column not in df.columns:
+            continue
+        values = df[column].fillna('(missing)').astype(str).to_numpy()
+        segments[column] = {
+            value: {
+                'rows': int(mask.sum()),
+                **{f'{name}_accuracy': float(np.mean(y_true[mask] == predicted[mask]))
+                   for name, predicted in predictions.items()},
+            }
+            for value in sorted(set(values))
+            for mask in [values == value]
+        }
+    return segments
+
+
+def evaluate(df, model_factory=default_model_factory, n_splits=DEFAULT_FOLDS, n_jobs=None,
+             seed=42, cache_dir=CACHE_DIR, rule_scores=None):
+    """
+    k-fold evaluation of the ML model, the rules and the hybrid combination.
+
+    Every row gets an out-of-fold ML prediction. The rule-based label comes
+    from SENTIMENT_THRESHOLDS, and the hybrid label applies the dashboard's
+    safety-net override to the ML label.
+
+    Args:
+        df: DataFrame with review_text and sentiment (segments use product_category and region)
+        model_factory: picklable callable returning an unfitted classifier
+        n_splits: number of stratified folds
+        n_jobs: worker processes (None = one per fold up to the CPU count, 1 = run inline)
+        rule_scores: optional precomputed compute_rule_scores(df), reused across variants
+
+    Returns:
+        dict: JSON-serializable report
+    """
+    from utils.hybrid import apply_hybrid_override, override_counts
+
+    df = df.reset_index(drop=True)
+    started = time.perf_counter()
+    paths = prepare_folds(df, n_splits, seed, cache_dir)
+    featurize_seconds = time.perf_counter() - started
+
+    if n_jobs is None:
+        n_jobs = min(n_splits, os.cpu_count() or 1)
+    run = partial(_run_fold, model_factory=model_factory)
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            fold_results = list(pool.map(run, paths))
+    else:
+        fold_results = [run(path) for path in paths]
+
+    y_true = df['sentiment'].astype(str).to_numpy(dtype=object)
+    ml_pred = np.empty(len(df), dtype=object)
+    for test_index, predicted, _ in fold_results:
+        ml_pred[test_index] = predicted
+
+    if rule_scores is None:
+        rule_scores = compute_rule_scores(df)
+    rules_pred = rule_labels(rule_scores)
+
+    labels = sorted(set(y_true))
+    # Probabilities are irrelevant for the label; pass a uniform placeholder
+    placeholder = np.full((len(df), len(labels)), 1.0 / len(labels))
+    hybrid_pred, _, _, reasons = apply_hybrid_override(ml_pred, placeholder, labels, rule_scores)
+    overridden = hybrid_pred != ml_pred
+
+    predictions = {'ml': ml_pred, 'rules': rules_pred, 'hybrid': hybrid_pred}
+    return {
+        'rows': len(df),
+        'n_splits': n_splits,
+        'model': repr(model_factory()),
+        'metrics': {name: classification_metrics(y_true, predicted, labels) for name, predicted in predictions.items()},
+        'hybrid_overrides': {
+            **override_counts(reasons),
+            'count': int(overridden.sum()),
+            'fixed': int((overridden & (hybrid_pred == y_true) & (ml_pred != y_true)).sum()),
+            'broke': int((overridden & (hybrid_pred != y_true) & (ml_pred == y_true)).sum()),
+        },
+        'segments': segment_accuracy(df, y_true, predictions),
+        'folds': [
+            {'fold': k, 'rows': len(test_index), 'ml_accuracy': float(np.mean(y_true[test_index] == predicted)),
+             'fit_seconds': round(fit_seconds, 4)}
+            for k, (test_index, predicted, fit_seconds) in enumerate(fold_results)
+        ],
+        'timing': {
+            'featurize_seconds': round(featurize_seconds, 4),
+            'total_seconds': round(time.perf_counter() - started, 4),
+        },
+    }
+
+
+def compare_variants(df, variants, **kwargs):
+    """
+    Evaluate several model variants on the same cached folds.
+
+    Args:
+        variants: dict of name -> picklable model factory
+
+    Returns:
+        dict: name -> report from evaluate()
+    """
+    rule_scores = kwargs.pop('rule_scores', None)
+    if rule_scores is None:
+        rule_scores = compute_rule_scores(df.reset_index(drop=True))
+    return {name: evaluate(df, factory, rule_scores=rule_scores, **kwargs) for name, factory in variants.items()}
+
+
+def main():
+    import argparse
+    import sentiment
+    from config import RULE_SCORER
+    from utils.aspect_analyzer import AspectAnalyzer
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='Customer_Sentiment_filtered_amazon.csv')
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per fold)')
+    parser.add_argument('--C', type=float, nargs='+', default=[0.1], help='SVC C values to compare')
+    parser.add_argument('--rule-scorer', choices=AspectAnalyzer.SCORERS, default=RULE_SCORER,
+                        help='rule-based scorer for the rules and hybrid metrics')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    df = sentiment.load_data(args.data)
+    variants = {f"svc-linear-C{C:g}": partial(default_model_factory, C=C) for C in args.C}
+    rule_scores = compute_rule_scores(df, AspectAnalyzer(scorer=args.rule_scorer))
+    reports = compare_variants(df, variants, n_splits=args.folds, n_jobs=args.jobs, rule_scores=rule_scores)
+
+    for name, report in reports.items():
+        metrics = report['metrics']
+        print(f"{name:<24} ml={metrics['ml']['accuracy']:.4f} rules={metrics['rules']['accuracy']:.4f} "
+              f"hybrid={metrics['hybrid']['accuracy']:.4f} ({report['timing']['total_seconds']:.2f}s)",
+              file=sys.stdout if args.output else sys.stderr)
+
+    payload = json.dumps(reports, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(payload + '\n')
+    else:
+        print(payload)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from utils.compact_model import collapse_linear_svc
+
+DEFAULT_TOP_K = 5
+
+
+def pair_sign_matrix(pairs, n_classes):
+    """
+    (n_pairs, n_classes) matrix mapping one-vs-one decisions to class evidence.
+
+    Pair (i, j) votes for i when its decision is positive and for j
+    otherwise, so its decision counts +1 towards class i and -1 towards j
+    (the same signed sum sklearn's 'ovr' decision shape uses for confidences).
+    """
+    signs = np.zeros((len(pairs), n_classes))
+    rows = np.arange(len(pairs))
+    signs[rows, [i for i, _ in pairs]] = 1.0
+    signs[rows, [j for _, j in pairs]] = -1.0
+    return signs
+
+
+def _top_k_per_row(rows, indices, values, k):
+    """
+    For each row, the `k` entries with the largest `values` (all vectorized).
+
+    Args:
+        rows, indices, values: parallel arrays of sparse entries (row, feature, value)
+
+    Returns:
+        tuple: (rows, features, values) of the kept entries, grouped by row, largest first
+    """
+    order = np.lexsort((-values, rows))
+    sorted_rows = rows[order]
+    # Rank within the row = position minus the row's first position
+    rank = np.arange(order.size) - np.searchsorted(sorted_rows, sorted_rows, side='left')
+    keep = order[rank < k]
+    return rows[keep], indices[keep], values[keep]
+
+
+class LinearExplainer:
+    """
+    Exact per-review explanations for the linear SVM.
+
+    The scaler is folded into the one-vs-one weights (see
+    compact_model.collapse_linear_svc) and the pairwise weights are summed
+    into one weight column per class. A review's evidence for a class is then
+    `x @ class_weights[:, c] + class_bias[c]`, and each term contributes
+    `tfidf(term) * class_weights[term, c]` - a sum, so the contributions
+    explain the score exactly. For a binary model the second class's
+    evidence equals sklearn's `decision_function` and the other class gets
+    its negation.
+    """
+
+    def __init__(self, model, vectorizer, scaler, label_encoder):
+        weights, intercepts, pairs = collapse_linear_svc(model, scaler)
+        signs = pair_sign_matrix(pairs, len(model.classes_))
+
+        self.vectorizer = vectorizer
+        self.classes = list(label_encoder.classes_)
+        self.class_weights = np.ascontiguousarray(weights @ signs)
+        self.class_bias = intercepts @ signs
+        self.terms = np.asarray(vectorizer.get_feature_names_out(), dtype=object)
+
+    @classmethod
+    def from_context(cls, context):
+        return cls(*context.artifacts)
+
+    def evidence(self, texts):
+        """(n_texts, n_classes) class evidence: the sum of contributions plus the class bias"""
+        X = self.vectorizer.transform(list(texts))
+        return np.asarray(X @ self.class_weights) + self.class_bias
+
+    def contributions(self, X, class_index):
+        """
+        Per-term contributions to one class as a CSR matrix shaped like `X`.
+
+        Computed on the sparse data arrays only: data * weight[indices].
+        """
+        X = X.tocsr()
+        result = X.copy()
+        result.data = X.data * self.class_weights[X.indices, class_index]
+        return result
+
+    def explain_batch(self, texts, top_k=DEFAULT_TOP_K):
+        """
+        Top contributing terms per class for many reviews.
+
+        Returns:
+            list: one dict per text mapping class -> {'evidence': float,
+            'supporting': [(term, contribution), ...], 'opposing': [...]},
+            strongest first
+        """
+        texts = ['' if pd.isna(text) else str(text) for text in texts]
+        X = self.vectorizer.transform(texts).tocsr()
+        evidence = np.asarray(X @ self.class_weights) + self.class_bias
+        explanations = [{} for _ in texts]
+
+        entry_rows = np.repeat(np.arange(len(texts)), np.diff(X.indptr))
+
+        for c, label in enumerate(self.classes):
+            contrib = self.contributions(X, c).data
+            for key, sign in (('supporting', 1.0), ('opposing', -1.0)):
+                # Only terms that actually push in this direction
+                mask = contrib * sign > 0
+                rows, features, values = _top_k_per_row(entry_rows[mask], X.indices[mask], contrib[mask] * sign, top_k)
+
+                grouped = [[] for _ in texts]
+                for row, term, value in zip(rows.tolist(), self.terms[features].tolist(), (values * sign).tolist()):
+                    grouped[row].append((term, value))
+                for row in range(len(texts)):
+                    explanations[row].setdefault(label, {'evidence': float(evidence[row, c])})[key] = grouped[row]
+
+        return explanations
+
+    def explain(self, text, top_k=DEFAULT_TOP_K):
+        """Single-review form of explain_batch()"""
+        return self.explain_batch([text], top_k)[0]
+
+
+def explain_frame(scored, explainer, text_column='review_text', label_column='ml_sentiment',
+                  top_k=DEFAULT_TOP_K):
+    """
+    Explanation strings for a scored frame, e.g. to review hybrid overrides.
+
+    Returns:
+        pd.Series: "term (+0.42), term (+0.10)" of the strongest supporting
+        terms for each row's `label_column` class, indexed like `scored`
+    """
+    explanations = explainer.explain_batch(scored[text_column], top_k)
+    return pd.Series(
+        [
+            ', '.join(f"{term} ({value:+.2f})" for term, value in explanation[label]['supporting'])
+            for explanation, label in zip(explanations, scored[label_column])
+        ],
+        index=scored.index,
+        name='explanation',
+    )
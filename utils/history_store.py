@@ -0,0 +1,227 @@
+import datetime
+import queue
+import sqlite3
+import threading
+
+from config import HISTORY_DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS review_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    session_id TEXT,
+    review_text TEXT NOT NULL,
+    product_category TEXT,
+    sentiment TEXT NOT NULL,
+    score REAL,
+    ml_sentiment TEXT,
+    rule_score REAL,
+    override_reason TEXT,
+    model_version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_created_at ON review_history (created_at);
+CREATE INDEX IF NOT EXISTS idx_history_sentiment ON review_history (sentiment, created_at);
+CREATE INDEX IF NOT EXISTS idx_history_score ON review_history (score);
+CREATE INDEX IF NOT EXISTS idx_history_session ON review_history (session_id, created_at);
+"""
+
+COLUMNS = [
+    'created_at', 'session_id', 'review_text', 'product_category', 'sentiment', 'score',
+    'ml_sentiment', 'rule_score', 'override_reason', 'model_version',
+]
+
+_STOP = object()
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute('PRAGMA journal_mode=WAL')
+    # WAL + NORMAL: durable across app crashes, only an OS crash can lose the last commits
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+class HistoryStore:
+    """
+    Persistent audit trail of analyzed reviews (SQLite in WAL mode).
+
+    `record()` only enqueues the row; a background writer thread commits
+    everything queued in one transaction (up to `batch_size` rows), so the
+    interactive path never waits on disk. If the queue is
+    full the row is dropped and counted in `dropped` rather than blocking;
+    rows lost to a failed commit are counted in `failed` (see `stats()`).
+    Reads open their own connection, which WAL lets run alongside the writer,
+    so a row recorded a moment ago may not be visible yet; see `with_pending_row()`.
+    """
+
+    def __init__(self, path=HISTORY_DB_PATH, batch_size=500, max_queue_size=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+        # Guards the counters, which the writer thread and the callers update
+        self._lock = threading.Lock()
+
+        with _connect(path) as connection:
+            connection.executescript(SCHEMA)
+        connection.close()
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._writer = threading.Thread(target=self._run_writer, name='history-writer', daemon=True)
+        self._writer.start()
+
+    def record(self, review_text, sentiment, score=None, session_id=None, product_category=None,
+               ml_sentiment=None, rule_score=None, override_reason=None, model_version=None, created_at=None):
+        """
+        Queue one analyzed review for writing. Never blocks.
+
+        Returns:
+            bool: False if the row was dropped because the write queue is full
+        """
+        row = (
+            created_at or datetime.datetime.now().isoformat(timespec='milliseconds'),
+            session_id, review_text, product_category, sentiment,
+            None if score is None else float(score),
+            ml_sentiment,
+            None if rule_score is None else float(rule_score),
+            override_reason or None,
+            model_version,
+        )
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def _run_writer(self):
+        connection = _connect(self.path)
+        insert = f"INSERT INTO review_history ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        stopping = False
+        try:
+            while not stopping:
+                batch = [self._queue.get()]
+                # Take whatever else is already queued, up to batch_size: a single
+                # review commits at once, and under load rows pile up while the
+                # previous commit runs, so batches grow by themselves
+                while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                rows = [row for row in batch if row is not _STOP]
+                stopping = len(rows) != len(batch)
+                if rows:
+                    try:
+                        with connection:
+                            connection.executemany(insert, rows)
+                        with self._lock:
+                            self.written += len(rows)
+                    except sqlite3.Error:
+                        # Keep the writer alive (e.g. disk full); the rows are counted as lost
+                        with self._lock:
+                            self.failed += len(rows)
+                for _ in batch:
+                    self._queue.task_done()
+        finally:
+            connection.close()
+
+    def flush(self, timeout=None):
+        """
+        Block until every queued row is committed, or `timeout` seconds pass.
+
+        Returns:
+            bool: True if the queue was drained
+        """
+        # Queue.join() with a timeout: join() waits on this same condition
+        done = self._queue.all_tasks_done
+        with done:
+            return done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def stats(self):
+        """
+        Returns:
+            dict: rows 'written', 'failed' and 'dropped' so far, and 'queued' rows not yet committed
+        """
+        with self._lock:
+            return {
+                'written': self.written,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'queued': self._queue.qsize(),
+            }
+
+    def close(self):
+        """Commit queued rows and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def query(self, page=1, page_size=10, sentiment=None, session_id=None, since=None):
+        """
+        One page of history, newest first.
+
+        Args:
+            page: 1-based page number
+            sentiment: optional label filter
+            session_id: optional session filter
+            since: optional ISO timestamp; only rows at or after it
+
+        Returns:
+            tuple: (list of row dicts, total matching rows)
+        """
+        clauses, params = [], []
+        for column, value, operator in (
+            ('sentiment', sentiment, '='),
+            ('session_id', session_id, '='),
+            ('created_at', since, '>='),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        page_size = max(int(page_size), 1)
+        offset = (max(int(page), 1) - 1) * page_size
+        connection = _connect(self.path)
+        try:
+            total = connection.execute(f"SELECT COUNT(*) FROM review_history {where}", params).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT id, {', '.join(COLUMNS)} FROM review_history {where} "
+                f"ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + [page_size, offset],
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(row) for row in rows], total
+
+
+
+def with_pending_row(rows, total, pending, page, page_size):
+    """
+    Show a just-recorded row in a query() page before the writer commits it,
+    so the interactive path never waits on disk.
+
+    Args:
+        rows, total: the result of HistoryStore.query()
+        pending: dict with the recorded 'created_at' and 'review_text' (plus
+            the columns to display), or None
+        page, page_size: the page `rows` belongs to. The pending row is the
+            newest, so only page 1 changes; later pages may lag by one row.
+
+    Returns:
+        tuple: (rows, total)
+    """
+    if pending is None or page != 1:
+        return rows, total
+    committed = any(
+        row['created_at'] == pending['created_at'] and row['review_text'] == pending['review_text']
+        for row in rows
+    )
+    if committed:
+        return rows, total
+    return ([pending] + rows)[:page_size], total + 1
@@ -0,0 +1,105 @@
+import numpy as np
+
+from config import HYBRID_OVERRIDE
+
+# Override reasons (an empty string means the ML label was kept)
+NO_OVERRIDE = ''
+RULES_NEGATIVE = 'rules_negative'
+RULES_POSITIVE = 'rules_positive'
+
+OVERRIDE_DESCRIPTIONS = {
+    RULES_NEGATIVE: "ML said positive but the rule-based score is strongly negative",
+    RULES_POSITIVE: "ML said negative but the rule-based score is strongly positive",
+}
+
+
+def apply_hybrid_override(labels, probabilities, classes, rule_scores, settings=None):
+    """
+    Hybrid safety net over a batch: combine ML predictions with rule scores.
+
+    - ML positive and rule score < settings['negative_below'] -> negative
+    - ML negative and rule score > settings['positive_above'] -> positive
+
+    An overridden review takes the rule score as its sentiment score and the
+    configured display probabilities; every other review keeps the ML label
+    and the probability of that label as its score.
+
+    Args:
+        labels: (n,) ML labels
+        probabilities: (n, n_classes) ML probabilities, columns ordered as `classes`
+        classes: class names
+        rule_scores: (n,) rule-based overall scores
+        settings: thresholds and probabilities (defaults to config.HYBRID_OVERRIDE)
+
+    Returns:
+        tuple: (final labels, sentiment scores, final probabilities, override reasons)
+    """
+    settings = settings or HYBRID_OVERRIDE
+    labels = np.asarray(labels, dtype=object)
+    probabilities = np.array(probabilities, dtype=float).reshape(len(labels), len(classes))
+    rule_scores = np.asarray(rule_scores, dtype=float)
+    class_index = {label: i for i, label in enumerate(classes)}
+
+    # Score of the predicted class
+    label_columns = np.array([class_index[label] for label in labels], dtype=int)
+    scores = probabilities[np.arange(len(labels)), label_columns]
+
+    to_negative = (rule_scores < settings['negative_below']) & (labels == 'positive')
+    to_positive = (rule_scores > settings['positive_above']) & (labels == 'negative') & ~to_negative
+
+    final_labels = labels.copy()
+    final_labels[to_negative] = 'negative'
+    final_labels[to_positive] = 'positive'
+    scores = np.where(to_negative | to_positive, rule_scores, scores)
+
+    reasons = np.full(len(labels), NO_OVERRIDE, dtype=object)
+    for mask, reason, overridden in (
+        (to_negative, RULES_NEGATIVE, settings['negative_probabilities']),
+        (to_positive, RULES_POSITIVE, settings['positive_probabilities']),
+    ):
+        if mask.any():
+            probabilities[mask] = [overridden.get(label, 0.0) for label in classes]
+            reasons[mask] = reason
+
+    return final_labels, scores, probabilities, reasons
+
+
+def apply_hybrid_override_single(label, probabilities, rule_score, settings=None):
+    """
+    Single-review form of apply_hybrid_override(), for the dashboard.
+
+    Args:
+        label: ML label
+        probabilities: dict of class -> probability
+        rule_score: rule-based overall score
+
+    Returns:
+        tuple: (final label, sentiment score, probabilities dict, override reason)
+    """
+    classes = list(probabilities)
+    if label not in probabilities:
+        classes.append(label)
+    row = [[probabilities.get(name, 0.5 if name == label else 0.0) for name in classes]]
+
+    labels, scores, final_probabilities, reasons = apply_hybrid_override(
+        [label], row, classes, [rule_score], settings
+    )
+    return (
+        labels[0],
+        float(scores[0]),
+        {name: float(value) for name, value in zip(classes, final_probabilities[0]) if name in probabilities},
+        reasons[0],
+    )
+
+
+def override_counts(reasons):
+    """
+    Count overrides by reason.
+
+    Returns:
+        dict: 'total' plus one count per reason
+    """
+    reasons = np.asarray(reasons, dtype=object)
+    counts = {reason: int((reasons == reason).sum()) for reason in (RULES_NEGATIVE, RULES_POSITIVE)}
+    counts['total'] = sum(counts.values())
+    return counts
@@ -0,0 +1,70 @@
+import sentiment
+from utils.aspect_analyzer import AspectAnalyzer
+
+
+class InferenceContext:
+    """
+    Immutable bundle of the trained artifacts and the aspect analyzer.
+
+    One instance is built per process (e.g. via `st.cache_resource`) and shared
+    by every session and thread. Prediction only reads the fitted sklearn
+    objects and the compiled lexicons, so no locking is needed, and nothing is
+    written back into the `sentiment` module globals.
+    """
+
+    __slots__ = ('model', 'vectorizer', 'scaler', 'label_encoder', 'accuracy', 'analyzer')
+
+    def __init__(self, model, vectorizer, scaler, label_encoder, accuracy=None, analyzer=None):
+        for name, value in (
+            ('model', model),
+            ('vectorizer', vectorizer),
+            ('scaler', scaler),
+            ('label_encoder', label_encoder),
+            ('accuracy', accuracy),
+            ('analyzer', analyzer or AspectAnalyzer()),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable; build a new context instead.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable; build a new context instead.")
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Train on `df` and wrap the resulting artifacts"""
+        model, vectorizer, scaler, label_encoder, accuracy = sentiment.fit_artifacts(df)
+        return cls(model, vectorizer, scaler, label_encoder, accuracy)
+
+    @property
+    def artifacts(self):
+        """(model, vectorizer, scaler, label_encoder), in the order `sentiment` uses"""
+        return self.model, self.vectorizer, self.scaler, self.label_encoder
+
+    def predict_sentiment(self, text_input):
+        """Predicts sentiment for a single text input."""
+        return sentiment.predict_with_artifacts(text_input, *self.artifacts)
+
+    def predict_sentiment_with_probabilities(self, text_input):
+        """
+        Returns:
+            tuple: (predicted_label, probabilities_dict)
+        """
+        return sentiment.predict_with_probabilities_from_artifacts(text_input, *self.artifacts)
+
+    def predict_sentiment_batch(self, texts, chunk_size=512):
+        """
+        Returns:
+            tuple: (labels array, probabilities array of shape (n, n_classes), class names)
+        """
+        return sentiment.predict_batch_from_artifacts(texts, *self.artifacts, chunk_size=chunk_size)
+
+    def analyze_aspects(self, review_text, category=None):
+        return self.analyzer.analyze_aspects(review_text, category=category)
+
+    def analyze_overall_sentiment(self, review_text, category=None):
+        return self.analyzer.analyze_overall_sentiment(review_text, category=category)
+
+    def extract_key_phrases(self, review_text, aspect, category=None):
+        return self.analyzer.extract_key_phrases(review_text, aspect, category=category)
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+from config import LEXICON_DIR, DEFAULT_LEXICON
+
+SENTIMENT_GROUPS = (
+    'strong_positive', 'positive', 'neutral', 'critical',
+    'negative', 'negation_words', 'qualifiers'
+)
+
+PACK_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+# In-process cache: (lexicon_dir, name) -> (source signature, CompiledLexicon)
+_compiled_cache = {}
+_cache_lock = threading.Lock()
+
+
+class CompiledLexicon:
+    """
+    Immutable, precompiled matcher form of a lexicon pack.
+
+    Every keyword group is folded into a single regex alternation, so checking
+    whether any keyword occurs in a sentence is one C-level scan instead of a
+    Python loop over substrings. Matching keeps the original substring
+    semantics of `any(word in text for word in words)`.
+    """
+
+    def __init__(self, name, aspect_keywords, sentiment_words, source_hash=''):
+        self.name = name
+        self.source_hash = source_hash
+        self.source_files = []
+        self.aspect_keywords = {
+            aspect: tuple(keywords) for aspect, keywords in aspect_keywords.items()
+        }
+        self.sentiment_words = {
+            group: tuple(sentiment_words.get(group, ())) for group in SENTIMENT_GROUPS
+        }
+        self._aspect_patterns = {
+            aspect: _compile_any(keywords) for aspect, keywords in self.aspect_keywords.items()
+        }
+        self._group_patterns = {
+            group: _compile_any(words) for group, words in self.sentiment_words.items()
+        }
+
+    @property
+    def aspects(self):
+        """Aspect names in pack order"""
+        return list(self.aspect_keywords)
+
+    def mentions(self, aspect, text):
+        """True if any keyword of `aspect` occurs in `text` (already lowercased)"""
+        pattern = self._aspect_patterns.get(aspect)
+        return pattern is not None and pattern.search(text) is not None
+
+    def matches(self, group, text):
+        """True if any word of sentiment `group` occurs in `text` (already lowercased)"""
+        pattern = self._group_patterns.get(group)
+        return pattern is not None and pattern.search(text) is not None
+
+
+def _compile_any(words):
+    """Compile a word list into one substring-matching alternation (None if empty)"""
+    unique_words = sorted(set(word.lower() for word in words if word), key=len, reverse=True)
+    if not unique_words:
+        return None
+    return re.compile('|'.join(re.escape(word) for word in unique_words))
+
+
+def category_to_pack_name(category):
+    """Map a `product_category` value (e.g. 'home & kitchen') to a pack name ('home_kitchen')"""
+    if not category:
+        return DEFAULT_LEXICON
+    return re.sub(r'[^a-z0-9]+', '_', str(category).strip().lower()).strip('_') or DEFAULT_LEXICON
+
+
+def find_pack_file(name, lexicon_dir=LEXICON_DIR):
+    """Return the path of the pack file for `name`, or None if there is no such pack"""
+    for extension in PACK_EXTENSIONS:
+        path = os.path.join(lexicon_dir, name + extension)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def available_packs(lexicon_dir=LEXICON_DIR):
+    """List pack names available in `lexicon_dir`"""
+    if not os.path.isdir(lexicon_dir):
+        return []
+    names = {
+        os.path.splitext(filename)[0]
+        for filename in os.listdir(lexicon_dir)
+        if filename.endswith(PACK_EXTENSIONS)
+    }
+    return sorted(names)
+
+
+def _read_pack_file(path):
+    """Parse a single JSON or YAML pack file"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    if path.endswith('.json'):
+        data = json.loads(raw.decode('utf-8'))
+    else:
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError(f"PyYAML is required to load YAML lexicon pack '{path}'. Install it with `pip install pyyaml`.")
+        data = yaml.safe_load(raw)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Lexicon pack '{path}' must contain a mapping at the top level.")
+    return data, raw
+
+
+def _resolve_pack(name, lexicon_dir, seen=None):
+    """
+    Read a pack and its `extends` chain.
+
+    Returns:
+        tuple: (aspect_keywords, sentiment_words, list of (path, raw file bytes))
+    """
+    seen = seen or []
+    if name in seen:
+        raise ValueError(f"Circular 'extends' in lexicon packs: {' -> '.join(seen + [name])}")
+
+    path = find_pack_file(name, lexicon_dir)
+    if path is None:
+        raise FileNotFoundError(f"Lexicon pack '{name}' not found in '{lexicon_dir}'.")
+
+    data, raw = _read_pack_file(path)
+    parent = data.get('extends')
+
+    if parent:
+        aspect_keywords, sentiment_words, sources = _resolve_pack(parent, lexicon_dir, seen + [name])
+    else:
+        aspect_keywords, sentiment_words, sources = {}, {group: [] for group in SENTIMENT_GROUPS}, []
+
+    # Aspects replace the parent's set wholesale - categories need their own aspects
+    if 'aspects' in data:
+        aspect_keywords = {
+            aspect: list(keywords) for aspect, keywords in data['aspects'].items()
+        }
+
+    # Sentiment words are additive on top of the parent's lists
+    for group, words in (data.get('sentiment') or {}).items():
+        if group not in SENTIMENT_GROUPS:
+            raise ValueError(f"Unknown sentiment group '{group}' in lexicon pack '{path}'.")
+        sentiment_words[group] = sentiment_words.get(group, []) + [
+            word for word in words if word not in sentiment_words.get(group, [])
+        ]
+
+    return aspect_keywords, sentiment_words, sources + [(path, raw)]
+
+
+def _stat_signature(paths):
+    """Cheap signature (path, mtime, size) of the pack files, used to detect edits"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def compile_pack(name, lexicon_dir=LEXICON_DIR):
+    """
+    Read a lexicon pack and its `extends` chain and compile it.
+
+    `source_hash` is a hash of the pack and all of its parents, so it changes
+    whenever any file in the chain is edited.
+    """
+    aspect_keywords, sentiment_words, sources = _resolve_pack(name, lexicon_dir)
+    source_hash = hashlib.sha1(b'\0'.join(raw for _, raw in sources)).hexdigest()
+
+    compiled = CompiledLexicon(name, aspect_keywords, sentiment_words, source_hash)
+    compiled.source_files = [path for path, _ in sources]
+    return compiled
+
+
+def load_lexicon(category=None, lexicon_dir=LEXICON_DIR):
+    """
+    Get the compiled lexicon for a product category.
+
+    Falls back to the default pack when the category has no pack of its own.
+    Results are memoized per process, so repeated calls (e.g. one
+    AspectAnalyzer per Streamlit session) cost a stat() per pack file; a
+    pack is only read and compiled again after one of its files changes.
+    """
+    name = category_to_pack_name(category)
+    if find_pack_file(name, lexicon_dir) is None:
+        name = DEFAULT_LEXICON
+
+    key = (os.path.abspath(lexicon_dir), name)
+
+    cached = _compiled_cache.get(key)
+    if cached is not None and _stat_signature(cached[1].source_files) == cached[0]:
+        return cached[1]
+
+    with _cache_lock:
+        cached = _compiled_cache.get(key)
+        if cached is not None and _stat_signature(cached[1].source_files) == cached[0]:
+            return cached[1]
+        compiled = compile_pack(name, lexicon_dir)
+        _compiled_cache[key] = (_stat_signature(compiled.source_files), compiled)
+        return compiled
+
+
+def clear_cache():
+    """Drop the in-process compiled lexicon cache"""
+    with _cache_lock:
+        _compiled_cache.clear()
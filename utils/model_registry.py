@@ -0,0 +1,235 @@
+"""
+Versioned model registry with background hot-reload.
+
+Layout: one directory per version under the registry directory,
+    models/<version>/artifacts.pkl   pickled (model, vectorizer, scaler, label_encoder)
+    models/<version>/metadata.json   version, accuracy, created_at, sha256 of artifacts.pkl
+    models/<version>/drift_baseline.json   optional training-data snapshot (utils.drift_monitor)
+
+A version is published by writing it to a temporary directory and renaming
+it into place, so the registry never sees a half-written version.
+
+Usage:
+    python -m utils.model_registry [--registry models] publish [--data reviews.csv] [--version 20240601-0900]
+    python -m utils.model_registry list
+"""
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+import sentiment
+from config import MODEL_REGISTRY_DIR, MODEL_POLL_INTERVAL_SECONDS, MODEL_MIN_ACCURACY
+from utils.inference_context import InferenceContext
+
+ARTIFACTS_FILE = 'artifacts.pkl'
+METADATA_FILE = 'metadata.json'
+DRIFT_BASELINE_FILE = 'drift_baseline.json'
+
+# Smoke-test reviews every new version must score before it is swapped in
+VALIDATION_TEXTS = [
+    "excellent product! exceeded expectations.",
+    "product stopped working after few days.",
+    "average experience overall.",
+    "",
+]
+
+# Immutable snapshot of the active model; sessions read it once per request
+ActiveModel = namedtuple('ActiveModel', ['version', 'context', 'metadata'])
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def publish_version(context, registry_dir=MODEL_REGISTRY_DIR, version=None, extra_metadata=None,
+                    drift_baseline=None):
+    """
+    Persist `context` as a new model version.
+
+    Args:
+        drift_baseline: optional utils.drift_monitor baseline snapshot stored with the version
+
+    Returns:
+        str: the version name
+    """
+    version = version or datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    final_dir = os.path.join(registry_dir, version)
+    if os.path.exists(final_dir):
+        raise FileExistsError(f"Model version '{version}' already exists.")
+
+    tmp_dir = os.path.join(registry_dir, f".{version}.{os.getpid()}.tmp")
+    os.makedirs(tmp_dir)
+    try:
+        artifacts_path = os.path.join(tmp_dir, ARTIFACTS_FILE)
+        sentiment.save_artifacts(artifacts_path, *context.artifacts)
+        metadata = {
+            'version': version,
+            'accuracy': context.accuracy,
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'sha256': _sha256(artifacts_path),
+            **(extra_metadata or {}),
+        }
+        with open(os.path.join(tmp_dir, METADATA_FILE), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        if drift_baseline is not None:
+            with open(os.path.join(tmp_dir, DRIFT_BASELINE_FILE), 'w') as f:
+                json.dump(drift_baseline, f)
+        os.rename(tmp_dir, final_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return version
+
+
+def list_versions(registry_dir=MODEL_REGISTRY_DIR):
+    """Published versions, oldest first (version names sort chronologically)"""
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(registry_dir)
+        if not name.startswith('.') and os.path.isfile(os.path.join(registry_dir, name, METADATA_FILE))
+    )
+
+
+def load_version(version, registry_dir=MODEL_REGISTRY_DIR, min_accuracy=MODEL_MIN_ACCURACY):
+    """
+    Load and validate one version.
+
+    Checks the artifact checksum, the recorded accuracy and that the model
+    scores VALIDATION_TEXTS with valid labels and probabilities.
+
+    Returns:
+        ActiveModel
+
+    Raises:
+        ValueError: if the version fails validation
+    """
+    version_dir = os.path.join(registry_dir, version)
+    with open(os.path.join(version_dir, METADATA_FILE)) as f:
+        metadata = json.load(f)
+
+    artifacts_path = os.path.join(version_dir, ARTIFACTS_FILE)
+    if _sha256(artifacts_path) != metadata.get('sha256'):
+        raise ValueError(f"Model version '{version}': artifacts checksum does not match its metadata.")
+
+    accuracy = metadata.get('accuracy')
+    if min_accuracy is not None and (accuracy is None or accuracy < min_accuracy):
+        raise ValueError(f"Model version '{version}': accuracy {accuracy} is below {min_accuracy}.")
+
+    context = InferenceContext(*sentiment.load_artifacts(artifacts_path), accuracy=accuracy)
+    labels, probabilities, classes = context.predict_sentiment_batch(VALIDATION_TEXTS)
+    if not set(labels) <= set(classes) or not np.allclose(probabilities.sum(axis=1), 1.0):
+        raise ValueError(f"Model version '{version}' failed the validation predictions.")
+
+    return ActiveModel(version, context, metadata)
+
+
+def load_drift_baseline(version, registry_dir=MODEL_REGISTRY_DIR):
+    """The drift baseline stored with a version, or None if it was published without one"""
+    path = os.path.join(registry_dir, version, DRIFT_BASELINE_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+class ModelRegistry:
+    """
+    Watches a registry directory and hot-swaps the active model.
+
+    New versions are loaded and validated on a background thread; the swap
+    is a single reference assignment, so a request that already read
+    `registry.active` keeps using its version until it finishes. Versions
+    that fail validation are remembered and not retried.
+    """
+
+    def __init__(self, registry_dir=MODEL_REGISTRY_DIR, poll_interval=MODEL_POLL_INTERVAL_SECONDS,
+                 min_accuracy=MODEL_MIN_ACCURACY):
+        self.registry_dir = registry_dir
+        self.poll_interval = poll_interval
+        self.min_accuracy = min_accuracy
+
+        self.active = None
+        self.failed = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check_for_updates(self):
+        """
+        Load the newest version if it is not active yet. Safe to call from any thread.
+
+        Returns:
+            bool: True if a new version was swapped in
+        """
+        with self._lock:
+            candidates = [version for version in list_versions(self.registry_dir) if version not in self.failed]
+            if not candidates or (self.active is not None and candidates[-1] <= self.active.version):
+                return False
+
+            version = candidates[-1]
+            try:
+                loaded = load_version(version, self.registry_dir, self.min_accuracy)
+            except Exception as e:
+                self.failed[version] = str(e)
+                return False
+
+            self.active = loaded
+            return True
+
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check_for_updates()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--registry', default=MODEL_REGISTRY_DIR)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    publish_parser = subparsers.add_parser('publish', help='train on a CSV and publish a new version')
+    publish_parser.add_argument('--data', default='Customer_Sentiment_filtered_amazon.csv')
+    publish_parser.add_argument('--version', help='version name (default: current timestamp)')
+    subparsers.add_parser('list', help='list published versions')
+    args = parser.parse_args()
+
+    if args.command == 'publish':
+        from utils.drift_monitor import build_baseline
+
+        df = sentiment.load_data(args.data)
+        context = InferenceContext.from_dataframe(df)
+        version = publish_version(context, args.registry, args.version, {'training_data': os.path.basename(args.data)},
+                                  drift_baseline=build_baseline(context, df))
+        print(f"Published model version {version} (accuracy {context.accuracy:.4f}).")
+    else:
+        for version in list_versions(args.registry):
+            print(version)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Data-parallel training: fit linear SVMs on shards of the training split in
+worker processes and average their parameters into one model.
+
+The featurization is the same as fit_artifacts() (TF-IDF on the corpus,
+the same 80/20 split, StandardScaler(with_mean=False) on the training
+split), so the sharded model and the single-model baseline are compared on
+identical test rows.
+
+Usage:
+    python -m utils.parallel_training [--shards 4] [--jobs 4] [--C 0.1] [--output report.json]
+    python -m utils.parallel_training --shards 4 --publish    # publish the averaged model to the registry
+"""
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.compact_model import ovo_votes_and_ovr
+
+DEFAULT_SHARDS = 4
+DEFAULT_C = 0.1
+
+FeaturizedSplit = namedtuple(
+    'FeaturizedSplit', ['vectorizer', 'scaler', 'label_encoder', 'X_train', 'X_test', 'y_train', 'y_test']
+)
+
+
+class AveragedLinearSVC:
+    """
+    Linear one-vs-one SVM built from averaged shard parameters.
+
+    Exposes what the rest of the code reads from a fitted linear SVC
+    (`kernel`, `classes_`, `coef_`, `intercept_`, `predict`,
+    `decision_function` with the 'ovr' shape), so it drops into
+    InferenceContext, the compact export and the explainer unchanged.
+    """
+
+    kernel = 'linear'
+
+    def __init__(self, coef, intercept, classes, n_shards=1):
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.n_shards = n_shards
+        n_classes = len(self.classes_)
+        self._pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+
+    @classmethod
+    def from_models(cls, models):
+        """Average the coefficients and intercepts of fitted linear SVCs with the same classes"""
+        classes = models[0].classes_
+        for model in models[1:]:
+            if not np.array_equal(model.classes_, classes):
+                raise ValueError("Every shard model must be fitted on the same classes.")
+        coef = np.mean([_dense(model.coef_) for model in models], axis=0)
+        intercept = np.mean([model.intercept_ for model in models], axis=0)
+        return cls(coef, intercept, classes, n_shards=len(models))
+
+    def _pair_decision(self, X):
+        return np.asarray(X @ self.coef_.T) + self.intercept_
+
+    def decision_function(self, X):
+        decision = self._pair_decision(X)
+        if len(self.classes_) == 2:
+            return decision.ravel()
+        _, ovr = ovo_votes_and_ovr(decision, self._pairs, len(self.classes_))
+        return ovr
+
+    def predict(self, X):
+        decision = self._pair_decision(X)
+        if len(self.classes_) == 2:
+            return self.classes_[(decision.ravel() > 0).astype(int)]
+        votes, _ = ovo_votes_and_ovr(decision, self._pairs, len(self.classes_))
+        return self.classes_[np.argmax(votes, axis=1)]
+
+    def __repr__(self):
+        return f"AveragedLinearSVC(n_shards={self.n_shards})"
+
+
+def _dense(matrix):
+    return matrix.toarray() if hasattr(matrix, 'toarray') else np.asarray(matrix)
+
+
+def featurize_split(df, test_size=0.2, seed=42):
+    """
+    The featurization and split of fit_artifacts(), kept sparse.
+
+    Returns:
+        FeaturizedSplit
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+    from sentiment import build_vectorizer
+
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(df['sentiment'])
+    vectorizer = build_vectorizer()
+    X = vectorizer.fit_transform(df['review_text'])
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=seed)
+
+    # Scaling sparse rows gives the same values as fit_artifacts' dense path
+    scaler = StandardScaler(with_mean=False)
+    X_train = scaler.fit_transform(X_train).tocsr()
+    X_test = scaler.transform(X_test).tocsr()
+    return FeaturizedSplit(vectorizer, scaler, label_encoder, X_train, X_test, y_train, y_test)
+
+
+def shard_indices(y, n_shards, seed=42):
+    """Split row positions into `n_shards` stratified shards, so every shard sees every class"""
+    from sklearn.model_selection import StratifiedKFold
+
+    splitter = StratifiedKFold(n_splits=n_shards, shuffle=True, random_state=seed)
+    return [shard for _, shard in splitter.split(np.zeros(len(y)), y)]
+
+
+def _fit_shard(X, y, C):
+    """Fit one shard model; runs in a worker process"""
+    from sklearn.svm import SVC
+
+    start = time.perf_counter()
+    model = SVC(kernel='linear', C=C, random_state=42)
+    model.fit(X, y)
+    return model, time.perf_counter() - start
+
+
+def train_sharded(X_train, y_train, n_shards=DEFAULT_SHARDS, n_jobs=None, C=DEFAULT_C, seed=42):
+    """
+    Fit one linear SVC per shard in parallel and average them.
+
+    Each shard is fitted with `C * n_shards`: the SVM objective sums the
+    hinge loss over samples, so a shard with 1/n of the rows needs n times
+    the C to keep the full-data balance between loss and regularization.
+    For linear models the averaged parameters give exactly the mean of the
+    shard decision functions, i.e. a soft-vote ensemble at the cost of one
+    model.
+
+    Args:
+        n_jobs: worker processes (None = one per shard up to the CPU count, 1 = run inline)
+
+    Returns:
+        tuple: (AveragedLinearSVC, timing dict)
+    """
+    if n_jobs is None:
+        n_jobs = min(n_shards, os.cpu_count() or 1)
+    shards = shard_indices(y_train, n_shards, seed)
+    shard_C = C * n_shards
+
+    start = time.perf_counter()
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(_fit_shard, X_train[shard], y_train[shard], shard_C) for shard in shards]
+            results = [future.result() for future in futures]
+    else:
+        results = [_fit_shard(X_train[shard], y_train[shard], shard_C) for shard in shards]
+    wall_seconds = time.perf_counter() - start
+
+    model = AveragedLinearSVC.from_models([shard_model for shard_model, _ in results])
+    return model, {
+        'n_shards': n_shards,
+        'n_jobs': n_jobs,
+        'shard_rows': [len(shard) for shard in shards],
+        'shard_fit_seconds': [round(seconds, 4) for _, seconds in results],
+        'wall_seconds': round(wall_seconds, 4),
+    }
+
+
+def fit_sharded_artifacts(df, n_shards=DEFAULT_SHARDS, n_jobs=None, C=DEFAULT_C):
+    """
+    Sharded counterpart of sentiment.fit_artifacts().
+
+    Returns:
+        tuple: (model, vectorizer, scaler, label_encoder, accuracy)
+    """
+    split = featurize_split(df)
+    model, _ = train_sharded(split.X_train, split.y_train, n_shards, n_jobs, C)
+    accuracy = float(np.mean(model.predict(split.X_test) == split.y_test))
+    return model, split.vectorizer, split.scaler, split.label_encoder, accuracy
+
+
+def compare_with_baseline(df, n_shards=DEFAULT_SHARDS, n_jobs=None, C=DEFAULT_C):
+    """
+    Train the sharded model and the single-SVC baseline on the same split.
+
+    Returns:
+        dict: JSON-serializable report with accuracy, label agreement and timings
+    """
+    from sklearn.svm import SVC
+
+    split = featurize_split(df)
+
+    start = time.perf_counter()
+    baseline = SVC(kernel='linear', C=C, random_state=42).fit(split.X_train, split.y_train)
+    baseline_seconds = time.perf_counter() - start
+
+    sharded, timing = train_sharded(split.X_train, split.y_train, n_shards, n_jobs, C)
+
+    baseline_pred = baseline.predict(split.X_test)
+    sharded_pred = sharded.predict(split.X_test)
+    return {
+        'train_rows': int(split.X_train.shape[0]),
+        'test_rows': int(split.X_test.shape[0]),
+        'C': C,
+        'baseline': {
+            'accuracy': float(np.mean(baseline_pred == split.y_test)),
+            'fit_seconds': round(baseline_seconds, 4),
+        },
+        'sharded': {
+            'accuracy': float(np.mean(sharded_pred == split.y_test)),
+            **timing,
+        },
+        'label_agreement': float(np.mean(baseline_pred == sharded_pred)),
+        'speedup': round(baseline_seconds / timing['wall_seconds'], 2) if timing['wall_seconds'] else None,
+    }
+
+
+def main():
+    import argparse
+    import sentiment
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='Customer_Sentiment_filtered_amazon.csv')
+    parser.add_argument('--shards', type=int, default=DEFAULT_SHARDS)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per shard)')
+    parser.add_argument('--C', type=float, default=DEFAULT_C)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--publish', action='store_true', help='publish the averaged model to the model registry')
+    parser.add_argument('--registry', help='registry directory for --publish (default: config.MODEL_REGISTRY_DIR)')
+    args = parser.parse_args()
+
+    df = sentiment.load_data(args.data)
+    if args.publish:
+        from config import MODEL_REGISTRY_DIR
+        from utils.drift_monitor import build_baseline
+        from utils.inference_context import InferenceContext
+        from utils.model_registry import publish_version
+
+        *artifacts, accuracy = fit_sharded_artifacts(df, args.shards, args.jobs, args.C)
+        context = InferenceContext(*artifacts, accuracy=accuracy)
+        version = publish_version(context, args.registry or MODEL_REGISTRY_DIR, extra_metadata={
+            'training_data': os.path.basename(args.data), 'training_mode': f'sharded-{args.shards}',
+        }, drift_baseline=build_baseline(context, df))
+        print(f"Published model version {version} (accuracy {accuracy:.4f}).")
+        return
+
+    report = compare_with_baseline(df, args.shards, args.jobs, args.C)
+    print(f"baseline={report['baseline']['accuracy']:.4f} ({report['baseline']['fit_seconds']:.2f}s) "
+          f"sharded={report['sharded']['accuracy']:.4f} ({report['sharded']['wall_seconds']:.2f}s, "
+          f"{args.shards} shards) agreement={report['label_agreement']:.4f}",
+          file=sys.stdout if args.output else sys.stderr)
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(payload + '\n')
+    else:
+        print(payload)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Resource limits and load shedding for scoring one review.
+
+A single pathological request (a pasted multi-megabyte review, a stuck
+prediction) must not stall everyone else sharing the process. RequestBudget
+wraps the single-review path with the limits of config.REQUEST_BUDGET:
+
+- the text is truncated to `max_chars` characters and `max_tokens`
+  whitespace-separated tokens, at a word boundary
+- the ML prediction runs on a small thread pool while the rules are scored
+  on the calling thread; if it misses its `ml_seconds` deadline the cheap
+  rule-only result is used instead. When every worker is still busy (a
+  timed-out prediction keeps running until it finishes) the ML stage is
+  shed at once rather than queued into a certain timeout
+- the rule stage cannot be interrupted: it is bounded only by the
+  truncation above, and its time counts against `total_seconds`
+- aspect scoring is skipped (all aspects neutral) once the request has used
+  up `total_seconds`
+
+Every truncation, timeout and skipped stage is recorded as shed, and
+`report()` summarizes them for the dashboard.
+"""
+import itertools
+import re
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from config import REQUEST_BUDGET, HYBRID_OVERRIDE, SENTIMENT_THRESHOLDS
+from utils.hybrid import apply_hybrid_override_single, NO_OVERRIDE
+
+# Shed reasons
+TRUNCATED_CHARS = 'truncated_chars'
+TRUNCATED_TOKENS = 'truncated_tokens'
+ML_TIMEOUT = 'ml_timeout'
+ML_BUSY = 'ml_busy'
+ASPECTS_SKIPPED = 'aspects_skipped'
+
+SHED_DESCRIPTIONS = {
+    TRUNCATED_CHARS: "The review was shortened to the maximum length",
+    TRUNCATED_TOKENS: "The review was shortened to the maximum number of words",
+    ML_TIMEOUT: "The ML model took too long; the rule-based score was used",
+    ML_BUSY: "The ML model was busy with other reviews; the rule-based score was used",
+    ASPECTS_SKIPPED: "The request ran out of time before the aspect analysis",
+}
+
+_WORD_RE = re.compile(r'\S+')
+
+BudgetedResult = namedtuple('BudgetedResult', [
+    'label', 'score', 'probabilities', 'ml_label', 'rule_score', 'override_reason',
+    'aspects', 'text', 'shed', 'timings',
+])
+
+
+def truncate_review(text, max_chars=None, max_tokens=None):
+    """
+    Shorten `text` to the character and token limits, cutting at a word boundary.
+
+    Work is bounded by `max_chars`: the token limit only scans the already
+    shortened text.
+
+    Returns:
+        tuple: (text, list of shed reasons)
+    """
+    max_chars = REQUEST_BUDGET['max_chars'] if max_chars is None else max_chars
+    max_tokens = REQUEST_BUDGET['max_tokens'] if max_tokens is None else max_tokens
+    reasons = []
+
+    if max_chars and len(text) > max_chars:
+        cut = text.rfind(' ', 0, max_chars + 1)
+        # One huge "word": cut mid-word rather than dropping most of the text
+        text = text[:cut if cut > max_chars // 2 else max_chars].rstrip()
+        reasons.append(TRUNCATED_CHARS)
+
+    if max_tokens:
+        extra = next(itertools.islice(_WORD_RE.finditer(text), max_tokens, None), None)
+        if extra is not None:
+            text = text[:extra.start()].rstrip()
+            reasons.append(TRUNCATED_TOKENS)
+
+    return text, reasons
+
+
+def rule_only_result(rule_score, classes=('negative', 'neutral', 'positive'), thresholds=SENTIMENT_THRESHOLDS):
+    """
+    Label and display probabilities from the rule score alone (the ML fallback).
+
+    Returns:
+        tuple: (label, probabilities dict)
+    """
+    if rule_score >= thresholds['positive']:
+        label, probabilities = 'positive', HYBRID_OVERRIDE['positive_probabilities']
+    elif rule_score <= thresholds['negative']:
+        label, probabilities = 'negative', HYBRID_OVERRIDE['negative_probabilities']
+    else:
+        label, probabilities = 'neutral', REQUEST_BUDGET['neutral_probabilities']
+    return label, {name: float(probabilities.get(name, 0.0)) for name in classes}
+
+
+class ShedLog:
+    """Thread-safe counts of requests and shed reasons, plus the most recent shed requests"""
+
+    def __init__(self, recent=None):
+        self.requests = 0
+        self.shed_requests = 0
+        self.reasons = Counter()
+        self.recent = deque(maxlen=REQUEST_BUDGET['recent_events'] if recent is None else recent)
+        self._lock = threading.Lock()
+
+    def record(self, shed, chars, elapsed):
+        with self._lock:
+            self.requests += 1
+            if shed:
+                self.shed_requests += 1
+                self.reasons.update(shed)
+                self.recent.append({
+                    'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'reasons': list(shed),
+                    'chars': chars,
+                    'seconds': round(elapsed, 4),
+                })
+
+    def report(self):
+        """
+        Returns:
+            dict: 'requests', 'shed_requests', 'shed_rate', 'reasons' (reason -> count)
+            and 'recent' (latest shed requests, oldest first)
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'shed_requests': self.shed_requests,
+                'shed_rate': self.shed_requests / self.requests if self.requests else 0.0,
+                'reasons': dict(self.reasons),
+                'recent': list(self.recent),
+            }
+
+
+class RequestBudget:
+    """
+    Scores single reviews within the configured limits; one instance is
+    shared by every session of the process.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = {**REQUEST_BUDGET, **(settings or {})}
+        self.log = ShedLog(self.settings['recent_events'])
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # Predictions submitted and not finished, including timed-out ones still running
+        self._ml_in_flight = 0
+        self._ml_lock = threading.Lock()
+
+    def executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.settings['ml_workers'], thread_name_prefix='ml-budget'
+                )
+            return self._executor
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _submit_ml(self, context, text):
+        """Start the ML prediction, or return None when every worker is taken"""
+        with self._ml_lock:
+            if self._ml_in_flight >= self.settings['ml_workers']:
+                return None
+            self._ml_in_flight += 1
+        try:
+            future = self.executor().submit(context.predict_sentiment_with_probabilities, text)
+        except BaseException:
+            self._ml_finished(None)
+            raise
+        future.add_done_callback(self._ml_finished)
+        return future
+
+    def _ml_finished(self, future):
+        with self._ml_lock:
+            self._ml_in_flight -= 1
+
+    def prepare(self, text):
+        """truncate_review() with this budget's limits"""
+        return truncate_review(text, self.settings['max_chars'], self.settings['max_tokens'])
+
+    def score(self, context, text, category=None, record=True):
+        """
+        Score one review like the dashboard does (ML + hybrid safety net + aspects), within budget.
+        With record=False the request is left out of report().
+
+        Returns:
+            BudgetedResult: final label, score and probabilities, the ML label
+            (None if the ML stage was shed), rule score, override reason,
+            aspect scores, the text actually scored, shed reasons and
+            per-stage timings in seconds
+        """
+        started = time.perf_counter()
+        original_chars = len(text)
+        text, shed = self.prepare(text)
+        timings = {}
+
+        ml_future = self._submit_ml(context, text)
+
+        stage = time.perf_counter()
+        rule_score = context.analyze_overall_sentiment(text, category=category)
+        timings['rules'] = time.perf_counter() - stage
+
+        ml_label = None
+        if ml_future is None:
+            shed.append(ML_BUSY)
+        else:
+            try:
+                remaining = self.settings['ml_seconds'] - (time.perf_counter() - stage)
+                ml_label, probabilities = ml_future.result(timeout=max(remaining, 0.0))
+            except TimeoutError:
+                # It keeps its worker until it finishes; later requests see ML_BUSY meanwhile
+                shed.append(ML_TIMEOUT)
+        timings['ml'] = time.perf_counter() - stage
+
+        if ml_label is None:
+            label, probabilities = rule_only_result(rule_score, classes=list(context.label_encoder.classes_))
+            score, override_reason = rule_score, NO_OVERRIDE
+        else:
+            label, score, probabilities, override_reason = apply_hybrid_override_single(
+                ml_label, probabilities, rule_score
+            )
+
+        stage = time.perf_counter()
+        if stage - started > self.settings['total_seconds']:
+            shed.append(ASPECTS_SKIPPED)
+            aspects = {aspect: 0.5 for aspect in context.analyzer.lexicon_for(category).aspects}
+        else:
+            aspects = context.analyze_aspects(text, category=category)
+        timings['aspects'] = time.perf_counter() - stage
+
+        timings['total'] = time.perf_counter() - started
+        if record:
+            self.log.record(shed, original_chars, timings['total'])
+        return BudgetedResult(
+            label, score, probabilities, ml_label, rule_score, override_reason, aspects, text, tuple(shed), timings
+        )
+
+    def report(self):
+        """Shed statistics of every request scored so far (see ShedLog.report)"""
+        return self.log.report()
@@ -0,0 +1,222 @@
+import numpy as np
+import pandas as pd
+
+from utils.dedup import plan_dedup
+
+DEFAULT_BLOCK_SIZE = 4096
+# Approximate mode: random-hyperplane LSH over the TF-IDF vectors. With 16
+# tables of 8 bits a neighbour at cosine 0.8 is found with ~94% probability,
+# while each table only scans ~1/256 of the corpus.
+LSH_TABLES = 16
+LSH_BITS = 8
+# Candidate (query, entry) pairs scored per sparse product in approximate mode
+LSH_PAIR_CHUNK = 1 << 18
+
+
+def _normalize_rows(matrix):
+    """L2-normalize the rows of a CSR matrix so dot products are cosines"""
+    matrix = matrix.tocsr().astype(np.float64)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    scale = np.repeat(1.0 / norms, np.diff(matrix.indptr))
+    matrix.data = matrix.data * scale
+    return matrix
+
+
+def _merge_top_k(best_scores, best_ids, scores, ids, k):
+    """Merge a block of candidate scores into the running top-k per query row"""
+    all_scores = np.hstack([best_scores, scores])
+    all_ids = np.hstack([best_ids, ids])
+    if all_scores.shape[1] > k:
+        keep = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+        all_scores = np.take_along_axis(all_scores, keep, axis=1)
+        all_ids = np.take_along_axis(all_ids, keep, axis=1)
+    return all_scores, all_ids
+
+
+class SimilarityIndex:
+    """
+    Top-k cosine nearest neighbours over TF-IDF vectors.
+
+    Identical texts are indexed once (see utils.dedup), so a template review
+    repeated a hundred times is one entry; `rows_of()` maps an entry back to
+    its corpus rows.
+
+    - Exact mode multiplies query blocks against corpus blocks of
+      `block_size` rows (sparse x sparse), keeping a running top-k, so
+      memory stays bounded by block_size^2 scores.
+    - Approximate mode hashes vectors with random hyperplanes into
+      `n_tables` LSH tables and scores only the colliding candidates;
+      close neighbours are found reliably, weak matches may be missed.
+      The hyperplanes are one sparse random projection
+      (sklearn.random_projection.SparseRandomProjection) of density
+      1/sqrt(n_features): about sqrt(n_features) * n_tables * n_bits
+      non-zeros, e.g. ~0.4 MB for a 50k-term vocabulary with 16 x 8 bits.
+      The tables are sorted code arrays, so a query batch is looked up,
+      scored and ranked with array operations.
+    """
+
+    def __init__(self, vectorizer, texts, approximate=False, block_size=DEFAULT_BLOCK_SIZE,
+                 n_tables=LSH_TABLES, n_bits=LSH_BITS, seed=0):
+        texts = ['' if pd.isna(text) else str(text) for text in texts]
+        self.vectorizer = vectorizer
+        self.block_size = block_size
+        self.approximate = approximate
+
+        representatives, self.assignment, _ = plan_dedup(texts)
+        self.texts = [texts[i] for i in representatives]
+        self.matrix = _normalize_rows(vectorizer.transform(self.texts))
+
+        # Rows of each entry, grouped once via a stable sort of the assignment
+        order = np.argsort(self.assignment, kind='stable')
+        bounds = np.searchsorted(self.assignment[order], np.arange(len(self.texts) + 1))
+        self._rows = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.texts))]
+
+        self._projections = None
+        self._table_keys = None
+        self._table_entries = None
+        if approximate:
+            from sklearn.random_projection import SparseRandomProjection
+
+            self.n_tables, self.n_bits = n_tables, n_bits
+            projection = SparseRandomProjection(n_components=n_tables * n_bits, random_state=seed)
+            # (n_features, n_tables * n_bits) sparse hyperplanes
+            self._projections = projection.fit(self.matrix).components_.T.tocsr()
+            # All tables in one sorted array of keys (table, code) -> entry
+            keys = self._keys(self.matrix).ravel()
+            entries = np.repeat(np.arange(self.matrix.shape[0]), n_tables)
+            order = np.argsort(keys, kind='stable')
+            self._table_keys, self._table_entries = keys[order], entries[order]
+
+    def __len__(self):
+        return len(self.texts)
+
+    def rows_of(self, entry):
+        """Corpus row positions whose text is index entry `entry`"""
+        return self._rows[entry]
+
+    @property
+    def projection_bytes(self):
+        """Memory held by the LSH hyperplanes (0 in exact mode)"""
+        if self._projections is None:
+            return 0
+        return sum(array.nbytes for array in (
+            self._projections.data, self._projections.indices, self._projections.indptr
+        ))
+
+    def _keys(self, matrix):
+        """(n_rows, n_tables) bucket keys: table * 2**n_bits + the row's code in that table"""
+        bits = (matrix @ self._projections).toarray() > 0
+        codes = bits.reshape(bits.shape[0], self.n_tables, self.n_bits).dot(1 << np.arange(self.n_bits))
+        return codes + (np.arange(self.n_tables) << self.n_bits)
+
+    def _query_exact(self, queries, k):
+        n_queries = queries.shape[0]
+        best_scores = np.full((n_queries, 0), -np.inf)
+        best_ids = np.full((n_queries, 0), -1, dtype=np.intp)
+
+        for start in range(0, self.matrix.shape[0], self.block_size):
+            block = self.matrix[start:start + self.block_size]
+            scores = (queries @ block.T).toarray()
+            ids = np.broadcast_to(np.arange(start, start + block.shape[0]), scores.shape)
+            best_scores, best_ids = _merge_top_k(best_scores, best_ids, scores, ids, k)
+        return best_scores, best_ids
+
+    def _query_approximate(self, queries, k):
+        n_queries = queries.shape[0]
+        best_scores = np.full((n_queries, k), -np.inf)
+        best_ids = np.full((n_queries, k), -1, dtype=np.intp)
+
+        # Bucket ranges of every (query, table) in the sorted key array
+        keys = self._keys(queries).ravel()
+        starts = np.searchsorted(self._table_keys, keys, side='left')
+        lengths = np.searchsorted(self._table_keys, keys, side='right') - starts
+        if not lengths.sum():
+            return best_scores, best_ids
+
+        # Expand the ranges into (query, entry) candidate pairs, each pair once
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        pair_queries = np.repeat(np.arange(keys.size) // self.n_tables, lengths)
+        pairs = np.unique(pair_queries * len(self) + self._table_entries[positions])
+        pair_queries, pair_entries = pairs // len(self), pairs % len(self)
+
+        scores = np.concatenate([
+            np.asarray(
+                queries[pair_queries[start:start + LSH_PAIR_CHUNK]]
+                .multiply(self.matrix[pair_entries[start:start + LSH_PAIR_CHUNK]]).sum(axis=1)
+            ).ravel()
+            for start in range(0, pairs.size, LSH_PAIR_CHUNK)
+        ])
+
+        # Top-k per query: rank within each query's candidates, best first
+        order = np.lexsort((-scores, pair_queries))
+        sorted_queries = pair_queries[order]
+        rank = np.arange(order.size) - np.searchsorted(sorted_queries, sorted_queries, side='left')
+        keep = order[rank < k]
+        best_scores[pair_queries[keep], rank[rank < k]] = scores[keep]
+        best_ids[pair_queries[keep], rank[rank < k]] = pair_entries[keep]
+        return best_scores, best_ids
+
+    def query(self, texts, k=5):
+        """
+        Find the `k` most similar index entries for each query text.
+
+        Returns:
+            tuple: (entries (n_queries, k), cosine scores (n_queries, k)),
+            sorted by descending score; missing neighbours (possible in
+            approximate mode) are -1 with score -inf
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        k = max(min(k, len(self)), 1)
+        queries = _normalize_rows(self.vectorizer.transform(list(texts)))
+
+        search = self._query_approximate if self.approximate else self._query_exact
+        # Queries are blocked too, so a large batch never builds a huge score matrix
+        results = [
+            search(queries[start:start + self.block_size], k)
+            for start in range(0, queries.shape[0], self.block_size)
+        ]
+        scores = np.vstack([block_scores for block_scores, _ in results])
+        entries = np.vstack([block_entries for _, block_entries in results])
+
+        order = np.argsort(-scores, axis=1, kind='stable')
+        return np.take_along_axis(entries, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def similar_reviews(index, corpus, text, k=5, exclude_same_text=True):
+    """
+    "Reviews like this one" for the dashboard.
+
+    Args:
+        index: SimilarityIndex built over corpus['review_text']
+        corpus: the indexed DataFrame (optionally scored, with predicted_sentiment)
+        text: query review
+        k: number of distinct similar texts to return
+        exclude_same_text: skip the entry identical to `text`
+
+    Returns:
+        pd.DataFrame: review_text, similarity, reviews (rows sharing that text),
+        sentiment (most common label) and resolved_share (share of
+        issue_resolved == 'yes'), best match first
+    """
+    entries, scores = index.query([text], k + 1 if exclude_same_text else k)
+    label_column = 'predicted_sentiment' if 'predicted_sentiment' in corpus.columns else 'sentiment'
+
+    records = []
+    for entry, score in zip(entries[0], scores[0]):
+        if entry < 0 or (exclude_same_text and index.texts[entry] == text):
+            continue
+        rows = corpus.iloc[index.rows_of(entry)]
+        record = {
+            'review_text': index.texts[entry],
+            'similarity': float(score),
+            'reviews': len(rows),
+            'sentiment': rows[label_column].mode().iloc[0] if label_column in rows else None,
+        }
+        if 'issue_resolved' in rows:
+            record['resolved_share'] = float((rows['issue_resolved'].astype(str).str.lower() == 'yes').mean())
+        records.append(record)
+
+    return pd.DataFrame.from_records(records[:k])
@@ -0,0 +1,188 @@
+"""
+Static dashboard snapshot of the bundled dataset.
+
+Scores the review CSV once, offline, and writes the aggregate results and
+the overview charts (as serialized Plotly JSON) to one JSON file. The app
+shows it on the landing page straight from disk, so the first paint needs
+neither the model nor any scoring; the live model is only loaded when a
+visitor opens the analyzer.
+
+    python -m utils.snapshot                # newest registry model (or train one)
+    python -m utils.snapshot --output snapshot.json --data reviews.csv
+
+A snapshot is tied to the exact CSV it was built from (SHA-256 of the
+file) and is ignored once the CSV changes.
+"""
+import hashlib
+import json
+import os
+import time
+
+from config import SNAPSHOT_PATH, MODEL_REGISTRY_DIR
+
+# Bump when the snapshot layout changes so old files are ignored
+SNAPSHOT_VERSION = 1
+
+DEFAULT_DATA_PATH = 'Customer_Sentiment_filtered_amazon.csv'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_snapshot(scored, data_sha256, model_version=None, accuracy=None):
+    """
+    Aggregate a scored corpus into a snapshot.
+
+    Args:
+        scored: frame from utils.corpus.score_corpus()
+        data_sha256: checksum of the CSV the corpus was read from
+        model_version: registry version that scored it, if any
+        accuracy: that model's test accuracy
+
+    Returns:
+        dict: metadata, 'summary' (see batch_scoring.summarize_scores),
+        per-category 'categories' summaries and 'figures' (name -> Plotly JSON)
+    """
+    from utils.batch_scoring import summarize_scores
+    from utils.visualizations import create_sentiment_distribution, create_aspect_analysis_chart
+
+    summary = summarize_scores(scored)
+    categories = {}
+    if 'product_category' in scored.columns:
+        for category, rows in scored.groupby('product_category', sort=True):
+            category_summary = summarize_scores(rows)
+            categories[str(category)] = {
+                'count': category_summary['count'],
+                'sentiment_share': category_summary['sentiment_share'],
+            }
+
+    shares = summary['sentiment_share']
+    figures = {
+        'sentiment_distribution': create_sentiment_distribution(
+            shares['positive'], shares['neutral'], shares['negative']
+        ).to_json(),
+    }
+    if summary['aspect_means']:
+        figures['aspect_analysis'] = create_aspect_analysis_chart(summary['aspect_means']).to_json()
+
+    return {
+        'snapshot_version': SNAPSHOT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'data_sha256': data_sha256,
+        'model_version': model_version,
+        'accuracy': accuracy,
+        'summary': summary,
+        'categories': categories,
+        'figures': figures,
+    }
+
+
+def write_snapshot(snapshot, path=SNAPSHOT_PATH):
+    """Write a snapshot atomically, so the app never reads a half-written file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot(path=SNAPSHOT_PATH, data_path=DEFAULT_DATA_PATH):
+    """
+    Read a snapshot written by write_snapshot().
+
+    Returns:
+        dict or None: None if there is no snapshot, it has an old layout or
+        was built from a different CSV than `data_path` (skip that check with
+        data_path=None)
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if snapshot.get('snapshot_version') != SNAPSHOT_VERSION:
+        return None
+    if data_path is not None:
+        if not os.path.isfile(data_path) or file_sha256(data_path) != snapshot.get('data_sha256'):
+            return None
+    return snapshot
+
+
+def snapshot_signature(path=SNAPSHOT_PATH, data_path=DEFAULT_DATA_PATH):
+    """
+    (mtime, size) of the snapshot and the CSV, None for a missing file.
+    Changes whenever load_snapshot() could return something else, so callers
+    can cache its result under this key.
+    """
+    signature = []
+    for file_path in (path, data_path):
+        try:
+            stat = os.stat(file_path)
+        except (OSError, TypeError):
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def snapshot_figures(snapshot):
+    """Rebuild the stored Plotly figures (name -> go.Figure)"""
+    import plotly.io as pio
+
+    return {name: pio.from_json(figure) for name, figure in snapshot['figures'].items()}
+
+
+def export_snapshot(data_path=DEFAULT_DATA_PATH, output=SNAPSHOT_PATH, registry_dir=MODEL_REGISTRY_DIR):
+    """
+    Score `data_path` with the newest valid registry model (training one if
+    the registry is empty) and write the snapshot.
+
+    Returns:
+        dict: the snapshot
+    """
+    import sentiment
+    from utils.corpus import score_corpus
+    from utils.inference_context import InferenceContext
+    from utils.model_registry import ModelRegistry
+
+    df = sentiment.load_data(data_path)
+    registry = ModelRegistry(registry_dir)
+    registry.check_for_updates()
+    if registry.active is not None:
+        context, model_version = registry.active.context, registry.active.version
+    else:
+        context, model_version = InferenceContext.from_dataframe(df), None
+
+    snapshot = build_snapshot(score_corpus(df, context), file_sha256(data_path), model_version, context.accuracy)
+    write_snapshot(snapshot, output)
+    return snapshot
+
+
+def main():
+    import argparse
+    import contextlib
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help='review CSV to score')
+    parser.add_argument('-o', '--output', default=SNAPSHOT_PATH)
+    parser.add_argument('--registry', default=MODEL_REGISTRY_DIR)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        snapshot = export_snapshot(args.data, args.output, args.registry)
+    summary = snapshot['summary']
+    print(f"Wrote snapshot of {summary['count']:,} reviews "
+          f"(model {snapshot['model_version'] or 'trained ad hoc'}) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
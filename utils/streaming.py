@@ -0,0 +1,121 @@
+import json
+import math
+import sys
+from itertools import islice
+
+from utils.batch_scoring import score_reviews, ASPECT_PREFIX, PROBABILITY_PREFIX
+
+DEFAULT_STREAM_BATCH_SIZE = 256
+
+
+def read_jsonl(lines, skip_invalid=False):
+    """
+    Parse JSON lines lazily.
+
+    Each line is either an object (the review record) or a bare JSON string
+    (the review text). Blank lines are ignored.
+
+    Args:
+        lines: any iterable of strings, e.g. sys.stdin or an open file
+        skip_invalid: log malformed lines to stderr and continue instead of raising
+
+    Yields:
+        dict: one record per line
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {'review_text': record}
+            elif not isinstance(record, dict):
+                raise ValueError(f"expected an object or a string, got {type(record).__name__}")
+        except ValueError as e:
+            if not skip_invalid:
+                raise ValueError(f"Line {line_number}: {e}") from e
+            print(f"Skipping line {line_number}: {e}", file=sys.stderr)
+            continue
+        yield record
+
+
+def batched(iterable, size):
+    """Yield lists of at most `size` items without materializing the input"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _enrich(record, row):
+    """Merge one scored row into its input record (NaN aspects are left out)"""
+    enriched = dict(record)
+    enriched['predicted_sentiment'] = row['predicted_sentiment']
+    enriched['sentiment_score'] = float(row['sentiment_score'])
+    enriched['ml_sentiment'] = row['ml_sentiment']
+    enriched['rule_score'] = float(row['rule_score'])
+    enriched['override'] = bool(row['override_reason'])
+    enriched['override_reason'] = row['override_reason'] or None
+    enriched['probabilities'] = {
+        column[len(PROBABILITY_PREFIX):]: float(value)
+        for column, value in row.items() if column.startswith(PROBABILITY_PREFIX)
+    }
+    enriched['aspects'] = {
+        column[len(ASPECT_PREFIX):]: float(value)
+        for column, value in row.items()
+        if column.startswith(ASPECT_PREFIX) and not (isinstance(value, float) and math.isnan(value))
+    }
+    return enriched
+
+
+def score_stream(records, context, text_field='review_text', category_field='product_category',
+                 batch_size=DEFAULT_STREAM_BATCH_SIZE, monitor=None):
+    """
+    Generator pipeline: score records in fixed-size batches.
+
+    Only one batch is held in memory at a time, so memory stays flat no
+    matter how long the input stream is.
+
+    Args:
+        records: iterable of dicts (see read_jsonl)
+        context: InferenceContext holding the trained artifacts
+        text_field: record key holding the review text
+        category_field: record key holding the product category (optional per record)
+        batch_size: records scored per batch
+        monitor: optional utils.drift_monitor.DriftMonitor updated with every batch
+
+    Yields:
+        dict: the input record plus predicted_sentiment, sentiment_score,
+        ml_sentiment, rule_score, override, override_reason, probabilities
+        and aspects
+    """
+    for batch in batched(records, batch_size):
+        texts = [record.get(text_field) for record in batch]
+        categories = [record.get(category_field) for record in batch]
+        scored = score_reviews(texts, context, categories, chunk_size=len(batch))
+        if monitor is not None:
+            monitor.update_scored(texts, scored, categories)
+        for record, (_, row) in zip(batch, scored.iterrows()):
+            yield _enrich(record, row)
+
+
+def write_jsonl(records, stream, flush_every=DEFAULT_STREAM_BATCH_SIZE):
+    """
+    Write records as JSON lines, flushing periodically so downstream
+    consumers see output while the input is still streaming.
+
+    Returns:
+        int: number of records written
+    """
+    count = 0
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False, default=str))
+        stream.write('\n')
+        count += 1
+        if count % flush_every == 0:
+            stream.flush()
+    stream.flush()
+    return count
@@ -0,0 +1,114 @@
+"""
+Text normalization shared by the ML model and the rule-based analyzer.
+
+normalize_text() maps noisy review text to a canonical lowercase form:
+- Unicode NFKC (full-width letters, ligatures, compatibility forms)
+- typographic apostrophes and quotes to ASCII, variation selectors dropped
+- emoji to the sentiment tokens `emoji_positive`, `emoji_negative`, `emoji_neutral`
+- contractions expanded ("doesn't" -> "does not", "it's" -> "it is"), so
+  negations are seen as "not" by both the TF-IDF model and the rules
+- letters repeated three or more times squashed to two ("soooo" -> "soo")
+
+Character mapping is one str.translate() over a precompiled table, the
+rewrites are two precompiled regexes, and results of reviews up to
+TEXT_NORMALIZER_CACHE_MAX_CHARS characters are memoized, so repeated reviews
+(templates, retries) cost a dict lookup; longer texts are not cached, which
+bounds the cache's memory. Pure-ASCII text skips the Unicode steps entirely.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+from config import TEXT_NORMALIZER_CACHE_SIZE, TEXT_NORMALIZER_CACHE_MAX_CHARS
+
+# Bump when the normalization output changes; stored with exported models
+NORMALIZER_VERSION = 1
+
+EMOJI_SENTIMENT = {
+    'emoji_positive': '😀😃😄😁😆😊🙂😉😍🥰😘😋😎🤩🥳👍👌👏🙌💯🔥⭐🌟✨🎉❤♥💖💕💗💙💚💜🧡💛😻✅',
+    'emoji_negative': '😞😟😠😡🤬😢😭😤😒🙄😩😫😖😣😔☹🙁😕💔🤮🤢💩👎😾❌🚫😬😰😱',
+    'emoji_neutral': '😐😑😶🤔🤷😮😯',
+}
+
+_CHARACTER_MAP = {
+    # Apostrophe and quote variants
+    '’': "'", '‘': "'", 'ʼ': "'", '´': "'", '`': "'",
+    '“': '"', '”': '"',
+    # Variation selectors and zero-width joiners inside emoji sequences
+    '\ufe0f': None, '\ufe0e': None, '\u200d': None,
+}
+for _token, _emoji in EMOJI_SENTIMENT.items():
+    for _char in _emoji:
+        _CHARACTER_MAP[_char] = f' {_token} '
+
+_TRANSLATION_TABLE = str.maketrans(_CHARACTER_MAP)
+
+_CONTRACTION_RE = re.compile(r"\b(\w+)'(t|s|re|ve|ll|m|d)\b")
+# Letters only: digits ("1000") and punctuation keep their runs. The ASCII
+# pattern is about twice as fast and covers almost all reviews.
+_ELONGATION_RE = re.compile(r'([^\W\d_])\1{2,}')
+_ASCII_ELONGATION_RE = re.compile(r'([a-z])\1\1+')
+
+_NEGATED_STEMS = {'won': 'will', 'can': 'can', 'shan': 'shall', 'ain': 'is'}
+_IS_STEMS = frozenset(['it', 'that', 'there', 'here', 'what', 'who', 'where', 'how', 'he', 'she'])
+_SUFFIXES = {'re': 'are', 've': 'have', 'll': 'will', 'm': 'am', 'd': 'would'}
+
+
+def _expand(match):
+    stem, suffix = match.group(1), match.group(2)
+    if suffix == 't':
+        if stem in _NEGATED_STEMS:
+            return f'{_NEGATED_STEMS[stem]} not'
+        if stem.endswith('n'):
+            return f'{stem[:-1]} not'
+        return match.group(0)
+    if suffix == 's':
+        if stem == 'let':
+            return 'let us'
+        # Otherwise "'s" is usually possessive ("battery's")
+        return f'{stem} is' if stem in _IS_STEMS else match.group(0)
+    return f'{stem} {_SUFFIXES[suffix]}'
+
+
+def normalize_text(text):
+    """
+    Canonical lowercase form of a review (see the module docstring).
+
+    Also the TfidfVectorizer `preprocessor`, which replaces the vectorizer's
+    own lowercasing.
+
+    Returns:
+        str
+    """
+    if not text:
+        return ''
+    if len(text) > TEXT_NORMALIZER_CACHE_MAX_CHARS:
+        return _normalize(text)
+    return _normalize_cached(text)
+
+
+def clear_normalizer_cache():
+    """Drop all memoized normalizations"""
+    _normalize_cached.cache_clear()
+
+
+def _normalize(text):
+    ascii_text = text.isascii()
+    if not ascii_text:
+        # Map first: NFKC would decompose some of the mapped characters (e.g. the acute accent)
+        text = unicodedata.normalize('NFKC', text.translate(_TRANSLATION_TABLE))
+    else:
+        # Only the backtick needs mapping on pure-ASCII text
+        text = text.replace('`', "'")
+    text = text.lower()
+    if "'" in text:
+        text = _CONTRACTION_RE.sub(_expand, text)
+
+    # Most reviews have no elongation, and search() is ~3x cheaper than a no-op sub() with a template
+    elongation = _ASCII_ELONGATION_RE if ascii_text else _ELONGATION_RE
+    if elongation.search(text) is None:
+        return text
+    return elongation.sub(r'\1\1', text)
+
+
+_normalize_cached = lru_cache(maxsize=TEXT_NORMALIZER_CACHE_SIZE)(_normalize)
@@ -0,0 +1,250 @@
+"""
+Pre-aggregated sentiment trends over minute, hour and day windows.
+
+Every scored review is added to one bucket per window. A window is a ring
+buffer of fixed capacity (e.g. 1440 minute buckets = the last 24 hours)
+holding per-bucket counts per sentiment, the polarity sum and per-aspect
+score sums, so a trend chart reads at most `capacity` rows no matter how much
+traffic was recorded. A slot is reset when its bucket comes around again.
+
+Polarity is where a review sits between negative (0) and positive (1),
+(P(positive) - P(negative) + 1) / 2 - unlike the sentiment score, which is the
+confidence in whichever label won, so confident negatives score high.
+
+The buffers are plain NumPy arrays, saved as one columnar .npz file.
+Buckets are aligned to UTC.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import TREND_STORE_PATH, TREND_WINDOWS
+
+
+def polarity(probabilities):
+    """
+    Polarity of a review from its displayed probabilities.
+
+    Returns:
+        float: (P(positive) - P(negative) + 1) / 2, 0.0 = negative to 1.0 = positive
+    """
+    return (probabilities.get('positive', 0.0) - probabilities.get('negative', 0.0) + 1.0) / 2.0
+
+
+class RingWindow:
+    """Fixed-capacity ring of time buckets of `resolution` seconds"""
+
+    ARRAYS = ('bucket_ids', 'counts', 'polarity_sums', 'aspect_sums', 'aspect_counts')
+
+    def __init__(self, resolution, capacity, n_labels=0, n_aspects=0):
+        self.resolution = int(resolution)
+        self.capacity = int(capacity)
+        self.bucket_ids = np.full(self.capacity, -1, dtype=np.int64)
+        self.counts = np.zeros((self.capacity, n_labels), dtype=np.int64)
+        self.polarity_sums = np.zeros(self.capacity)
+        self.aspect_sums = np.zeros((self.capacity, n_aspects))
+        self.aspect_counts = np.zeros((self.capacity, n_aspects), dtype=np.int64)
+
+    def grow(self, n_labels, n_aspects):
+        """Add zero columns for newly seen labels or aspects"""
+        def pad(array, columns):
+            return np.pad(array, ((0, 0), (0, columns - array.shape[1])))
+
+        self.counts = pad(self.counts, n_labels)
+        self.aspect_sums = pad(self.aspect_sums, n_aspects)
+        self.aspect_counts = pad(self.aspect_counts, n_aspects)
+
+    def add(self, timestamps, label_indices, polarities, aspect_values):
+        """
+        Add rows to their buckets (vectorized).
+
+        Args:
+            timestamps: epoch seconds
+            label_indices: column of each row's sentiment
+            polarities: review polarities (see polarity())
+            aspect_values: (n_rows, n_aspects) aspect scores, NaN where the row has none
+        """
+        ids = np.asarray(timestamps, dtype=np.float64) // self.resolution
+        ids = ids.astype(np.int64)
+        slots = ids % self.capacity
+
+        # Claim slots for buckets newer than what they hold; rows for buckets
+        # that were already overwritten by newer ones are dropped
+        for bucket in np.unique(ids):
+            slot = bucket % self.capacity
+            if self.bucket_ids[slot] < bucket:
+                self.bucket_ids[slot] = bucket
+                self.counts[slot] = 0
+                self.polarity_sums[slot] = 0.0
+                self.aspect_sums[slot] = 0.0
+                self.aspect_counts[slot] = 0
+        live = self.bucket_ids[slots] == ids
+        slots = slots[live]
+
+        np.add.at(self.counts, (slots, np.asarray(label_indices)[live]), 1)
+        np.add.at(self.polarity_sums, slots, np.asarray(polarities, dtype=np.float64)[live])
+        values = np.asarray(aspect_values, dtype=np.float64)[live]
+        present = ~np.isnan(values)
+        np.add.at(self.aspect_sums, slots, np.where(present, values, 0.0))
+        np.add.at(self.aspect_counts, slots, present.astype(np.int64))
+
+    def rows(self, periods, now):
+        """
+        The last `periods` buckets up to the one containing `now`, oldest first.
+
+        Returns:
+            tuple: (bucket ids, slots, mask of buckets that hold data)
+        """
+        periods = min(int(periods), self.capacity)
+        current = int(now // self.resolution)
+        ids = np.arange(current - periods + 1, current + 1, dtype=np.int64)
+        slots = ids % self.capacity
+        return ids, slots, self.bucket_ids[slots] == ids
+
+
+class TrendStore:
+    """
+    Minute/hour/day ring buffers of scored reviews, shared by all sessions.
+
+    `record()` and `series()` are thread-safe. Labels and aspects are
+    columns added on first sight, so any lexicon pack's aspects can be tracked.
+    """
+
+    def __init__(self, windows=None, path=TREND_STORE_PATH):
+        self.path = path
+        self.labels = []
+        self.aspects = []
+        self.windows = {
+            name: RingWindow(resolution, capacity)
+            for name, (resolution, capacity) in (windows or TREND_WINDOWS).items()
+        }
+        self.last_saved = None
+        self._lock = threading.Lock()
+
+    def _columns(self, names, known):
+        for name in names:
+            if name not in known:
+                known.append(name)
+        index = {name: i for i, name in enumerate(known)}
+        return [index[name] for name in names]
+
+    def record_batch(self, labels, polarities, aspects=None, timestamps=None):
+        """
+        Add scored reviews.
+
+        Args:
+            labels: final sentiment labels
+            polarities: review polarities, 0 = negative to 1 = positive (see polarity())
+            aspects: optional list of {aspect: score} dicts; leave out aspects with no opinion
+            timestamps: optional epoch seconds per review (default: now)
+        """
+        labels = [str(label) for label in labels]
+        if not labels:
+            return
+        if timestamps is None:
+            timestamps = np.full(len(labels), time.time())
+        aspects = aspects if aspects is not None else [{}] * len(labels)
+
+        with self._lock:
+            label_indices = self._columns(labels, self.labels)
+            self._columns(sorted({name for row in aspects for name in row}), self.aspects)
+            aspect_values = np.full((len(labels), len(self.aspects)), np.nan)
+            column = {name: i for i, name in enumerate(self.aspects)}
+            for row, values in enumerate(aspects):
+                for name, score in values.items():
+                    aspect_values[row, column[name]] = score
+
+            for window in self.windows.values():
+                window.grow(len(self.labels), len(self.aspects))
+                window.add(timestamps, label_indices, polarities, aspect_values)
+
+    def record(self, label, polarity, aspects=None, timestamp=None):
+        """Add one scored review (see record_batch)"""
+        self.record_batch([label], [polarity], [aspects or {}], None if timestamp is None else [timestamp])
+
+    def series(self, window, periods=None, now=None):
+        """
+        Trend table for the last `periods` buckets of a window (default: all of them).
+
+        Returns:
+            pd.DataFrame: indexed by bucket start (UTC), oldest first, with
+            'reviews', one count column per sentiment, 'share_<label>',
+            'mean_polarity' and 'aspect_<name>' mean scores (NaN where empty)
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            ring = self.windows[window]
+            ids, slots, live = ring.rows(periods or ring.capacity, now)
+            counts = np.where(live[:, None], ring.counts[slots], 0)
+            polarity_sums = np.where(live, ring.polarity_sums[slots], 0.0)
+            aspect_sums = np.where(live[:, None], ring.aspect_sums[slots], 0.0)
+            aspect_counts = np.where(live[:, None], ring.aspect_counts[slots], 0)
+            labels, aspects = list(self.labels), list(self.aspects)
+
+        totals = counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frame = pd.DataFrame({'reviews': totals}, index=pd.to_datetime(ids * ring.resolution, unit='s'))
+            for i, label in enumerate(labels):
+                frame[label] = counts[:, i]
+            for i, label in enumerate(labels):
+                frame[f'share_{label}'] = np.where(totals > 0, counts[:, i] / totals, np.nan)
+            frame['mean_polarity'] = np.where(totals > 0, polarity_sums / totals, np.nan)
+            for i, aspect in enumerate(aspects):
+                frame[f'aspect_{aspect}'] = np.where(
+                    aspect_counts[:, i] > 0, aspect_sums[:, i] / aspect_counts[:, i], np.nan
+                )
+        frame.index.name = 'bucket_start'
+        return frame
+
+    def save(self, path=None):
+        """Write all windows to one columnar .npz file (atomically)"""
+        path = path or self.path
+        with self._lock:
+            arrays = {
+                'labels': np.array(self.labels, dtype=str),
+                'aspects': np.array(self.aspects, dtype=str),
+            }
+            for name, ring in self.windows.items():
+                arrays[f'{name}.shape'] = np.array([ring.resolution, ring.capacity])
+                for array in RingWindow.ARRAYS:
+                    arrays[f'{name}.{array}'] = getattr(ring, array)
+
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+            self.last_saved = time.time()
+
+    def save_if_due(self, interval):
+        """save() unless the last save was less than `interval` seconds ago"""
+        if self.last_saved is None or time.time() - self.last_saved >= interval:
+            self.save()
+            return True
+        return False
+
+    @classmethod
+    def load(cls, path=TREND_STORE_PATH, windows=None):
+        """
+        Load a saved store, or start an empty one if there is no file.
+        Windows whose resolution or capacity changed in the config (or saved
+        in an older layout) start empty.
+        """
+        store = cls(windows, path)
+        if not os.path.isfile(path):
+            return store
+
+        with np.load(path, allow_pickle=False) as arrays:
+            store.labels = arrays['labels'].tolist()
+            store.aspects = arrays['aspects'].tolist()
+            for name, ring in store.windows.items():
+                ring.grow(len(store.labels), len(store.aspects))
+                shape_key = f'{name}.shape'
+                saved = shape_key in arrays and tuple(arrays[shape_key]) == (ring.resolution, ring.capacity)
+                if saved and all(f'{name}.{array}' in arrays for array in RingWindow.ARRAYS):
+                    for array in RingWindow.ARRAYS:
+                        setattr(ring, array, arrays[f'{name}.{array}'].copy())
+        return store
@@ -1,7 +1,50 @@
-import plotly.graph_objects as go
-import plotly.express as px
+import functools
 from config import COLORS
-import pandas as pd
+
+# plotly is imported inside the builders: it is only needed once a chart is
+# actually drawn, and importing it eagerly delays the first paint of the app.
+
+# Figures are cached on their (rounded) input values, so a Streamlit rerun that
+# redraws the same result (expander click, widget change) reuses the figure
+# instead of rebuilding and re-validating it. The cached figures are shared:
+# callers must treat them as read-only (st.plotly_chart does).
+FIGURE_CACHE_SIZE = 256
+SCORE_PRECISION = 3
+
+# Static theme built once from COLORS and reused by every chart
+THEME_LAYOUT = dict(
+    paper_bgcolor=COLORS['primary_bg'],
+    font={'color': COLORS['text'], 'family': 'Inter'},
+    margin=dict(l=20, r=20, t=50, b=20)
+)
+
+SENTIMENT_COLORSCALE = [
+    [0, COLORS['negative']],
+    [0.5, COLORS['neutral']],
+    [1, COLORS['positive']]
+]
+
+GAUGE_STYLE = {
+    'axis': {'range': [None, 100], 'tickwidth': 2, 'tickcolor': COLORS['text']},
+    'bar': {'color': COLORS['accent']},
+    'bgcolor': COLORS['secondary_bg'],
+    'borderwidth': 2,
+    'bordercolor': COLORS['text'],
+    'steps': [
+        {'range': [0, 40], 'color': COLORS['negative']},
+        {'range': [40, 60], 'color': COLORS['neutral']},
+        {'range': [60, 100], 'color': COLORS['positive']}
+    ]
+}
+
+def _round(value):
+    return round(float(value), SCORE_PRECISION)
+
+def clear_figure_cache():
+    """Drop all cached figures (e.g. after changing COLORS at runtime)"""
+    _build_sentiment_gauge.cache_clear()
+    _build_aspect_analysis_chart.cache_clear()
+    _build_sentiment_distribution.cache_clear()
 
 def create_sentiment_gauge(sentiment_score):
     """
@@ -10,38 +53,31 @@ def create_sentiment_gauge(sentiment_score):
     Args:
         sentiment_score: float between 0-1
     """
+    return _build_sentiment_gauge(_round(sentiment_score))
+
+@functools.lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def _build_sentiment_gauge(sentiment_score):
+    import plotly.graph_objects as go
+
     fig = go.Figure(go.Indicator(
         mode="gauge+number+delta",
         value=sentiment_score * 100,
         domain={'x': [0, 1], 'y': [0, 1]},
         title={'text': "Sentiment Score", 'font': {'size': 24, 'color': COLORS['text']}},
         delta={'reference': 50, 'increasing': {'color': COLORS['positive']}},
-        gauge={
-            'axis': {'range': [None, 100], 'tickwidth': 2, 'tickcolor': COLORS['text']},
-            'bar': {'color': COLORS['accent']},
-            'bgcolor': COLORS['secondary_bg'],
-            'borderwidth': 2,
-            'bordercolor': COLORS['text'],
-            'steps': [
-                {'range': [0, 40], 'color': COLORS['negative']},
-                {'range': [40, 60], 'color': COLORS['neutral']},
-                {'range': [60, 100], 'color': COLORS['positive']}
-            ],
-            'threshold': {
+        gauge=dict(
+            GAUGE_STYLE,
+            threshold={
                 'line': {'color': COLORS['text'], 'width': 4},
                 'thickness': 0.75,
                 'value': sentiment_score * 100
             }
-        }
-    ))
-    
-    fig.update_layout(
-        paper_bgcolor=COLORS['primary_bg'],
+        )
+    ), layout=dict(
+        THEME_LAYOUT,
         plot_bgcolor=COLORS['primary_bg'],
-        font={'color': COLORS['text'], 'family': 'Inter'},
-        height=300,
-        margin=dict(l=20, r=20, t=50, b=20)
-    )
+        height=300
+    ))
     
     return fig
 
@@ -52,43 +88,50 @@ def create_aspect_analysis_chart(aspects_data):
     Args:
         aspects_data: dict with aspect names as keys and sentiment scores as values
     """
-    df = pd.DataFrame(list(aspects_data.items()), columns=['Aspect', 'Score'])
-    df['Color'] = df['Score'].apply(lambda x: 
-        COLORS['positive'] if x > 0.6 else 
-        COLORS['negative'] if x < 0.4 else 
-        COLORS['neutral']
+    return _build_aspect_analysis_chart(
+        tuple((aspect, _round(score)) for aspect, score in aspects_data.items())
     )
+
+@functools.lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def _build_aspect_analysis_chart(aspect_items):
+    import plotly.graph_objects as go
+
+    aspects = [aspect for aspect, _ in aspect_items]
+    scores = [score for _, score in aspect_items]
     
-    fig = px.bar(
-        df,
-        x='Score',
-        y='Aspect',
+    fig = go.Figure(go.Bar(
+        x=scores,
+        y=aspects,
         orientation='h',
-        color='Score',
-        color_continuous_scale=[
-            [0, COLORS['negative']],
-            [0.5, COLORS['neutral']],
-            [1, COLORS['positive']]
-        ],
-        title="Product Aspects Analysis"
-    )
-    
-    fig.update_layout(
-        paper_bgcolor=COLORS['primary_bg'],
+        marker=dict(color=scores, coloraxis='coloraxis'),
+        hovertemplate='Score=%{x}<br>Aspect=%{y}<extra></extra>'
+    ), layout=dict(
+        THEME_LAYOUT,
         plot_bgcolor=COLORS['secondary_bg'],
-        font={'color': COLORS['text'], 'family': 'Inter'},
+        title="Product Aspects Analysis",
         title_font_size=20,
         showlegend=False,
         height=400,
+        coloraxis=dict(
+            colorscale=SENTIMENT_COLORSCALE,
+            cmin=0,
+            cmax=1,
+            colorbar=dict(title="Score")
+        ),
         xaxis=dict(range=[0, 1], title="Sentiment Score"),
-        yaxis=dict(title=""),
-        margin=dict(l=20, r=20, t=50, b=20)
-    )
+        yaxis=dict(title="")
+    ))
     
     return fig
 
 def create_sentiment_distribution(positive_prob, neutral_prob, negative_prob):
     """Create donut chart for sentiment distribution"""
+    return _build_sentiment_distribution(_round(positive_prob), _round(neutral_prob), _round(negative_prob))
+
+@functools.lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def _build_sentiment_distribution(positive_prob, neutral_prob, negative_prob):
+    import plotly.graph_objects as go
+
     labels = ['Positive', 'Neutral', 'Negative']
     values = [positive_prob, neutral_prob, negative_prob]
     colors = [COLORS['positive'], COLORS['neutral'], COLORS['negative']]
@@ -100,14 +143,11 @@ def create_sentiment_distribution(positive_prob, neutral_prob, negative_prob):
         marker_colors=colors,
         textinfo='label+percent',
         textfont_size=14
-    )])
-    
-    fig.update_layout(
+    )], layout=dict(
+        THEME_LAYOUT,
         title="Sentiment Distribution",
         title_font_size=20,
-        paper_bgcolor=COLORS['primary_bg'],
         plot_bgcolor=COLORS['primary_bg'],
-        font={'color': COLORS['text'], 'family': 'Inter'},
         height=350,
         showlegend=True,
         legend=dict(
@@ -118,6 +158,65 @@ def create_sentiment_distribution(positive_prob, neutral_prob, negative_prob):
             x=0.5
         ),
         margin=dict(l=20, r=20, t=50, b=50)
-    )
+    ))
     
     return fig
+
+# Trend charts are built from utils.trends pre-aggregates (at most one row per
+# bucket), so they are cheap to rebuild and are not cached like the charts above.
+TREND_SENTIMENTS = [('positive', 'Positive'), ('neutral', 'Neutral'), ('negative', 'Negative')]
+
+def create_sentiment_trend_chart(series, title="Sentiment Over Time"):
+    """
+    Stacked review counts per sentiment with the mean polarity (0 = negative, 1 = positive)
+    
+    Args:
+        series: DataFrame from TrendStore.series()
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(layout=dict(
+        THEME_LAYOUT,
+        plot_bgcolor=COLORS['secondary_bg'],
+        title=title,
+        title_font_size=20,
+        barmode='stack',
+        height=400,
+        xaxis=dict(title="Time (UTC)"),
+        yaxis=dict(title="Reviews"),
+        yaxis2=dict(title="Mean Polarity (0 = negative, 1 = positive)", range=[0, 1], overlaying='y', side='right', showgrid=False),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    ))
+    for label, name in TREND_SENTIMENTS:
+        if label in series:
+            fig.add_trace(go.Bar(x=series.index, y=series[label], name=name, marker_color=COLORS[label]))
+    fig.add_trace(go.Scatter(
+        x=series.index, y=series['mean_polarity'], name="Mean Polarity", yaxis='y2',
+        mode='lines+markers', connectgaps=False, line=dict(color=COLORS['text'], width=2)
+    ))
+    return fig
+
+def create_aspect_trend_chart(series, title="Aspect Scores Over Time"):
+    """
+    One line per aspect with its mean score in each bucket
+    
+    Args:
+        series: DataFrame from TrendStore.series()
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(layout=dict(
+        THEME_LAYOUT,
+        plot_bgcolor=COLORS['secondary_bg'],
+        title=title,
+        title_font_size=20,
+        height=400,
+        xaxis=dict(title="Time (UTC)"),
+        yaxis=dict(title="Sentiment Score", range=[0, 1])
+    ))
+    for column in series.columns:
+        if column.startswith('aspect_') and series[column].notna().any():
+            fig.add_trace(go.Scatter(
+                x=series.index, y=series[column], name=column[len('aspect_'):], mode='lines+markers'
+            ))
+    return fig